@@ -1,11 +1,13 @@
 from __future__ import annotations
 
+from collections import deque
 import re
 from datetime import UTC, datetime
+from typing import NamedTuple
 
 from config import MAJOR_DAMAGE_THRESHOLD
 from .database import Database
-from .log_parser import ParsedLogLine
+from .log_parser import LogEvent, LogInterest, ParsedLogLine
 
 FIRST_BED_RE = re.compile(r"^(?P<seconds>\d+(?:\.\d+)?)s 1st Bed Placed$")
 DAMAGE_RE = re.compile(r"^Damage:\s*(?P<damage>\d+)$")
@@ -17,13 +19,73 @@ TYPE_RE = re.compile(r"^Type:\s*(?P<zero_type>.+)$")
 HEIGHT_RE = re.compile(r"^Standing Height:\s*(?P<height>\d+)$")
 ZDASH_TOWER_RE = re.compile(r"^\[ZDASH\]\s*Tower:\s*(?P<tower>.+)$")
 ZDASH_TYPE_RE = re.compile(r"^\[ZDASH\]\s*Type:\s*(?P<zero_type>.+)$")
+# How many recent ZDASH Tower/Type messages a 1st-bed line may look back through
+# for context.
+ZDASH_CONTEXT_WINDOW = 40
+# SQL twin of ZDASH_TOWER_RE / ZDASH_TYPE_RE (GLOB is case-sensitive like the regexes).
+_ZDASH_CONTEXT_BODY = "LTRIM(SUBSTR(chat_message, 8), ' ' || char(9, 10, 11, 12, 13))"
+ZDASH_CONTEXT_SQL = (
+    f"chat_message GLOB '[[]ZDASH]*' "
+    f"AND ({_ZDASH_CONTEXT_BODY} GLOB 'Tower:?*' OR {_ZDASH_CONTEXT_BODY} GLOB 'Type:?*')"
+)
+
+
+class ZdashContext(NamedTuple):
+    event_id: int
+    tower_name: str | None = None
+    tower_code: str | None = None
+    zero_type: str | None = None
+
+    @property
+    def has_context(self) -> bool:
+        return self.tower_name is not None or self.zero_type is not None
 
 
 def utc_now() -> str:
     return datetime.now(UTC).isoformat(timespec="seconds")
 
 
+def _split_tower_text(tower_text: str) -> tuple[str, str | None]:
+    prefixed_match = TOWER_RE.match(f"Tower: {tower_text}")
+    if prefixed_match:
+        return prefixed_match.group("tower").strip(), prefixed_match.group("code")
+    return tower_text, None
+
+
+def parse_zdash_context(event_id: int, message: str) -> ZdashContext:
+    m_tower = ZDASH_TOWER_RE.match(message)
+    if m_tower:
+        tower_name, tower_code = _split_tower_text(m_tower.group("tower").strip())
+        return ZdashContext(event_id, tower_name=tower_name, tower_code=tower_code)
+    m_type = ZDASH_TYPE_RE.match(message)
+    if m_type:
+        return ZdashContext(event_id, zero_type=m_type.group("zero_type").strip())
+    return ZdashContext(event_id)
+
+
 class AttemptTracker:
+    # Superset of every line handle_chat_event / handle_log_event acts on.
+    LOG_INTEREST = LogInterest(
+        chat_prefixes=(
+            "[ZDASH]",
+            "Damage:",
+            "Explosives:",
+            "Time:",
+            "Tower:",
+            "Type:",
+            "Standing Height:",
+            *"0123456789",
+        ),
+        chat_contains_lower=("dragon killed!", "crystal destroyed"),
+        chat_empty=True,
+        body_contains_lower=(
+            "stateoutput state: title",
+            "stateoutput state: waiting",
+            "disconnecting from server",
+            "stopping!",
+        ),
+    )
+
     def __init__(self, db: Database, require_pending_context: bool = True) -> None:
         self.db = db
         self.require_pending_context = require_pending_context
@@ -35,7 +97,13 @@ class AttemptTracker:
         self.pending_zero_type: str | None = None
         self.pending_context_event_id: int | None = None
         self.pending_context_ttl_events = 300
+        # Recent ZDASH Tower/Type messages, newest last, so 1st-bed hydration
+        # never scans raw_log_events. Seeded once from the DB, then fed by
+        # handle_chat_event.
+        self.recent_zdash: deque[ZdashContext] = deque(maxlen=ZDASH_CONTEXT_WINDOW)
+        self._current_event: LogEvent | None = None
         self._bootstrap_in_progress_attempt()
+        self._bootstrap_recent_zdash()
 
     def _bootstrap_in_progress_attempt(self) -> None:
         row = self.db.query_one(
@@ -58,34 +126,59 @@ class AttemptTracker:
         self.current_status = "in_progress"
         self.current_bed_index = int(bed_row["max_bed"]) + 1 if bed_row else 0
 
+    def _bootstrap_recent_zdash(self) -> None:
+        rows = self.db.query_all(
+            f"""
+            SELECT id, chat_message
+            FROM raw_log_events
+            WHERE is_chat = 1
+              AND {ZDASH_CONTEXT_SQL}
+            ORDER BY id DESC
+            LIMIT ?
+            """,
+            (ZDASH_CONTEXT_WINDOW,),
+        )
+        for row in reversed(rows):
+            context = parse_zdash_context(int(row["id"]), (row["chat_message"] or "").strip())
+            if context.has_context:
+                self.recent_zdash.append(context)
+
+    def handle_event(self, event: LogEvent) -> None:
+        """Entry point for the log watcher; the envelope spares any raw_log_events lookup."""
+        self._current_event = event
+        try:
+            parsed = event.parsed
+            if parsed.is_chat and parsed.chat_message is not None:
+                self.handle_chat_event(event.event_id, parsed.chat_message, parsed.clock_time)
+            else:
+                self.handle_log_event(event.event_id, parsed)
+        finally:
+            self._current_event = None
+
     def handle_chat_event(self, event_id: int, chat_message: str, clock_time: str | None) -> None:
         message = chat_message.strip()
         lower_message = message.lower()
 
-        zdash_tower_match = ZDASH_TOWER_RE.match(message)
-        if zdash_tower_match:
-            self._finalize_open_attempt_if_needed(
-                reason="new_attempt_started", clock_time=clock_time, event_id=event_id
-            )
-            tower_text = zdash_tower_match.group("tower").strip()
-            prefixed_match = TOWER_RE.match(f"Tower: {tower_text}")
-            if prefixed_match:
-                self.pending_tower_name = prefixed_match.group("tower").strip()
-                self.pending_tower_code = prefixed_match.group("code")
-            else:
-                self.pending_tower_name = tower_text
-                self.pending_tower_code = None
-            self.pending_context_event_id = event_id
-            return
-
-        zdash_type_match = ZDASH_TYPE_RE.match(message)
-        if zdash_type_match:
-            self._finalize_open_attempt_if_needed(
-                reason="new_attempt_started", clock_time=clock_time, event_id=event_id
-            )
-            self.pending_zero_type = zdash_type_match.group("zero_type").strip()
-            self.pending_context_event_id = event_id
-            return
+        if message.startswith("[ZDASH]"):
+            context = parse_zdash_context(event_id, message)
+            # Other [ZDASH] chatter must not push Tower/Type lines out of the window.
+            if context.has_context:
+                self.recent_zdash.append(context)
+            if context.tower_name is not None:
+                self._finalize_open_attempt_if_needed(
+                    reason="new_attempt_started", clock_time=clock_time, event_id=event_id
+                )
+                self.pending_tower_name = context.tower_name
+                self.pending_tower_code = context.tower_code
+                self.pending_context_event_id = event_id
+                return
+            if context.zero_type is not None:
+                self._finalize_open_attempt_if_needed(
+                    reason="new_attempt_started", clock_time=clock_time, event_id=event_id
+                )
+                self.pending_zero_type = context.zero_type
+                self.pending_context_event_id = event_id
+                return
 
         first_bed_match = FIRST_BED_RE.match(message)
         if first_bed_match:
@@ -237,35 +330,14 @@ class AttemptTracker:
     def _hydrate_pending_from_recent_zdash(self, event_id: int) -> None:
         if self.pending_tower_name is not None and self.pending_zero_type is not None:
             return
-        rows = self.db.query_all(
-            """
-            SELECT chat_message
-            FROM raw_log_events
-            WHERE is_chat = 1
-              AND id < ?
-              AND chat_message LIKE '[ZDASH] %'
-            ORDER BY id DESC
-            LIMIT 40
-            """,
-            (event_id,),
-        )
-        for row in rows:
-            message = (row["chat_message"] or "").strip()
-            if self.pending_tower_name is None:
-                m_tower = ZDASH_TOWER_RE.match(message)
-                if m_tower:
-                    tower_text = m_tower.group("tower").strip()
-                    prefixed_match = TOWER_RE.match(f"Tower: {tower_text}")
-                    if prefixed_match:
-                        self.pending_tower_name = prefixed_match.group("tower").strip()
-                        self.pending_tower_code = prefixed_match.group("code")
-                    else:
-                        self.pending_tower_name = tower_text
-                        self.pending_tower_code = None
-            if self.pending_zero_type is None:
-                m_type = ZDASH_TYPE_RE.match(message)
-                if m_type:
-                    self.pending_zero_type = m_type.group("zero_type").strip()
+        for context in reversed(self.recent_zdash):
+            if context.event_id >= event_id:
+                continue
+            if self.pending_tower_name is None and context.tower_name is not None:
+                self.pending_tower_name = context.tower_name
+                self.pending_tower_code = context.tower_code
+            if self.pending_zero_type is None and context.zero_type is not None:
+                self.pending_zero_type = context.zero_type
             if self.pending_tower_name is not None and self.pending_zero_type is not None:
                 self.pending_context_event_id = event_id
                 return
@@ -385,6 +457,10 @@ class AttemptTracker:
         self._clear_current()
 
     def _event_ingested_at_utc(self, event_id: int) -> str | None:
+        event = self._current_event
+        if event is not None and event.event_id == event_id:
+            return event.ingested_at_utc
+        # Direct handle_*_event callers (rebuild/recovery scripts) replay stored rows by id.
         row = self.db.query_one(
             "SELECT ingested_at_utc FROM raw_log_events WHERE id = ?",
             (event_id,),
@@ -1,21 +1,414 @@
 from __future__ import annotations
 
+from concurrent.futures import Future
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+import json
+import queue
 import sqlite3
 import threading
+import time
 from pathlib import Path
-from typing import Any, Iterable
+from typing import Any, Callable, Iterable, Iterator, Mapping, Sequence, TypeVar
+import zlib
+
+from config import DB_READ_POOL_SIZE, DB_STATEMENT_CACHE_SIZE
+
+from .state_store import StateStore
+
+RAW_EVENT_COLUMNS = (
+    "ingested_at_utc",
+    "clock_time",
+    "thread_name",
+    "level",
+    "source",
+    "is_chat",
+    "chat_message",
+    "raw_line",
+    "file_offset",
+)
+
+
+# target_stats is one row per distinct value of these attempts columns (NULLs
+# included), kept current by triggers so dashboard widgets aggregate a few
+# hundred rows instead of the whole attempts history.
+TARGET_STATS_KEY_COLUMNS = (
+    "attempt_source",
+    "attempt_seed_mode",
+    "tower_name",
+    "side",
+    "rotation",
+    "is_straight",
+    "o_level",
+    "standing_height",
+)
+_TARGET_STATS_TRACKED_COLUMNS = (
+    "status",
+    "success_time_seconds",
+    "zero_type",
+    "tower_name",
+    "o_level",
+    "standing_height",
+    "attempt_source",
+    "attempt_seed_mode",
+)
+
+
+def _target_stats_key_match(row: str) -> str:
+    return " AND ".join(f"{col} IS {row}.{col}" for col in TARGET_STATS_KEY_COLUMNS)
+
+
+_TARGET_STATS_ADD = f"""
+    INSERT INTO target_stats ({", ".join(TARGET_STATS_KEY_COLUMNS)})
+    SELECT {", ".join(f"NEW.{col}" for col in TARGET_STATS_KEY_COLUMNS)}
+    WHERE NOT EXISTS (SELECT 1 FROM target_stats WHERE {_target_stats_key_match("NEW")});
+    UPDATE target_stats
+    SET
+        attempts = attempts + 1,
+        successes = successes + (NEW.status = 'success'),
+        failures = failures + (NEW.status = 'fail'),
+        success_time_sum = success_time_sum
+            + CASE WHEN NEW.status = 'success' THEN COALESCE(NEW.success_time_seconds, 0) ELSE 0 END,
+        success_time_count = success_time_count
+            + (NEW.status = 'success' AND NEW.success_time_seconds IS NOT NULL),
+        last_attempt_id = CASE
+            WHEN NEW.status IN ('success', 'fail') THEN MAX(last_attempt_id, NEW.id)
+            ELSE last_attempt_id
+        END
+    WHERE {_target_stats_key_match("NEW")};
+"""
+# Runs after the row changed, so the fallback MAX(id) already sees the new state.
+_TARGET_STATS_REMOVE = f"""
+    UPDATE target_stats
+    SET
+        attempts = attempts - 1,
+        successes = successes - (OLD.status = 'success'),
+        failures = failures - (OLD.status = 'fail'),
+        success_time_sum = success_time_sum
+            - CASE WHEN OLD.status = 'success' THEN COALESCE(OLD.success_time_seconds, 0) ELSE 0 END,
+        success_time_count = success_time_count
+            - (OLD.status = 'success' AND OLD.success_time_seconds IS NOT NULL),
+        last_attempt_id = CASE
+            WHEN OLD.status IN ('success', 'fail') AND last_attempt_id = OLD.id THEN COALESCE(
+                (
+                    SELECT MAX(id)
+                    FROM attempts
+                    WHERE status IN ('success', 'fail') AND {_target_stats_key_match("OLD")}
+                ),
+                0
+            )
+            ELSE last_attempt_id
+        END
+    WHERE {_target_stats_key_match("OLD")};
+    DELETE FROM target_stats WHERE attempts <= 0 AND {_target_stats_key_match("OLD")};
+"""
+_TARGET_STATS_TRIGGERS = (
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_attempts_target_stats_insert
+    AFTER INSERT ON attempts
+    BEGIN
+    {_TARGET_STATS_ADD}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_attempts_target_stats_delete
+    AFTER DELETE ON attempts
+    BEGIN
+    {_TARGET_STATS_REMOVE}
+    END
+    """,
+    # Normalization passes rewrite columns to the same values; only real
+    # changes move counts between rows.
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_attempts_target_stats_update
+    AFTER UPDATE OF {", ".join(_TARGET_STATS_TRACKED_COLUMNS)} ON attempts
+    WHEN {" OR ".join(f"OLD.{col} IS NOT NEW.{col}" for col in _TARGET_STATS_TRACKED_COLUMNS)}
+    BEGIN
+    {_TARGET_STATS_REMOVE}
+    {_TARGET_STATS_ADD}
+    END
+    """,
+)
+_TARGET_STATS_REBUILD = f"""
+    INSERT INTO target_stats (
+        {", ".join(TARGET_STATS_KEY_COLUMNS)},
+        attempts,
+        successes,
+        failures,
+        success_time_sum,
+        success_time_count,
+        last_attempt_id
+    )
+    SELECT
+        {", ".join(TARGET_STATS_KEY_COLUMNS)},
+        COUNT(*),
+        SUM(status = 'success'),
+        SUM(status = 'fail'),
+        TOTAL(CASE WHEN status = 'success' THEN success_time_seconds END),
+        COUNT(CASE WHEN status = 'success' THEN success_time_seconds END),
+        COALESCE(MAX(CASE WHEN status IN ('success', 'fail') THEN id END), 0)
+    FROM attempts
+    GROUP BY {", ".join(TARGET_STATS_KEY_COLUMNS)}
+"""
+
+
+# Finished attempts more than this far apart (by start time) are in different
+# sessions.
+SESSION_GAP_SECONDS = 3600.0
+
+# Sessions rows with this attempt_source segment finished attempts of every
+# source together (attempts.combined_session_id); the other rows segment each
+# source on its own (attempts.session_id).
+COMBINED_SESSION_SOURCE = "*"
+
+_SESSION_FINISHED = "('success', 'fail')"
+
+
+def _session_for_new(source: str) -> str:
+    # The session a finished attempt joins is the latest one of its
+    # segmentation that started at or before it.
+    return f"""
+        SELECT id
+        FROM sessions
+        WHERE attempt_source = {source} AND started_at_utc <= NEW.started_at_utc
+        ORDER BY started_at_utc DESC, id DESC
+        LIMIT 1
+    """
+
+
+def _session_join(column: str, source: str) -> str:
+    return f"""
+        INSERT INTO sessions (attempt_source, started_at_utc, last_started_at_utc)
+        SELECT {source}, NEW.started_at_utc, NEW.started_at_utc
+        WHERE NOT EXISTS (
+            SELECT 1
+            FROM sessions
+            WHERE id = ({_session_for_new(source)})
+              AND CAST(strftime('%s', NEW.started_at_utc) AS INTEGER)
+                  - CAST(strftime('%s', last_started_at_utc) AS INTEGER) <= {int(SESSION_GAP_SECONDS)}
+        );
+        UPDATE attempts SET {column} = ({_session_for_new(source)}) WHERE id = NEW.id;
+        UPDATE sessions
+        SET last_started_at_utc = MAX(last_started_at_utc, NEW.started_at_utc)
+        WHERE id = (SELECT {column} FROM attempts WHERE id = NEW.id);
+    """
+
+
+# Runs once the attempt no longer points at OLD.<column>.
+def _session_leave(column: str) -> str:
+    return f"""
+        UPDATE sessions
+        SET
+            started_at_utc = COALESCE(
+                (SELECT MIN(started_at_utc) FROM attempts WHERE {column} = OLD.{column}),
+                started_at_utc
+            ),
+            last_started_at_utc = COALESCE(
+                (SELECT MAX(started_at_utc) FROM attempts WHERE {column} = OLD.{column}),
+                last_started_at_utc
+            )
+        WHERE id = OLD.{column};
+        DELETE FROM sessions
+        WHERE id = OLD.{column}
+          AND NOT EXISTS (SELECT 1 FROM attempts WHERE {column} = OLD.{column});
+    """
+
+
+_SESSION_JOIN = (
+    _session_join("session_id", "NEW.attempt_source")
+    + _session_join("combined_session_id", f"'{COMBINED_SESSION_SOURCE}'")
+)
+_SESSION_LEAVE = _session_leave("session_id") + _session_leave("combined_session_id")
+_SESSION_TRIGGER_NAMES = (
+    "trg_attempts_session_insert",
+    "trg_attempts_session_finish",
+    "trg_attempts_session_unfinish",
+    "trg_attempts_session_delete",
+)
+# Only finished attempts belong to a session: an in_progress attempt joins one
+# when its status becomes success or fail, like the old LAG() segmentation
+# over finished attempts.
+_SESSION_TRIGGERS = (
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_attempts_session_insert
+    AFTER INSERT ON attempts
+    WHEN NEW.status IN {_SESSION_FINISHED}
+    BEGIN
+    {_SESSION_JOIN}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_attempts_session_finish
+    AFTER UPDATE OF status ON attempts
+    WHEN NEW.status IN {_SESSION_FINISHED} AND NEW.session_id IS NULL
+    BEGIN
+    {_SESSION_JOIN}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_attempts_session_unfinish
+    AFTER UPDATE OF status ON attempts
+    WHEN COALESCE(NEW.status, '') NOT IN {_SESSION_FINISHED} AND OLD.session_id IS NOT NULL
+    BEGIN
+        UPDATE attempts SET session_id = NULL, combined_session_id = NULL WHERE id = NEW.id;
+    {_SESSION_LEAVE}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_attempts_session_delete
+    AFTER DELETE ON attempts
+    WHEN OLD.session_id IS NOT NULL
+    BEGIN
+    {_SESSION_LEAVE}
+    END
+    """,
+)
+
+
+# Connection-local (TEMP) triggers on the write connection that report every
+# ingest_state row change to StateStore.note_change.
+_STATE_CACHE_TRIGGERS = """
+    CREATE TEMP TRIGGER IF NOT EXISTS trg_ingest_state_cache_insert
+    AFTER INSERT ON main.ingest_state
+    BEGIN
+        SELECT zdash_state_changed(NEW.key, NEW.value);
+    END;
+
+    CREATE TEMP TRIGGER IF NOT EXISTS trg_ingest_state_cache_update
+    AFTER UPDATE ON main.ingest_state
+    BEGIN
+        SELECT zdash_state_changed(OLD.key, NULL) WHERE OLD.key <> NEW.key;
+        SELECT zdash_state_changed(NEW.key, NEW.value);
+    END;
+
+    CREATE TEMP TRIGGER IF NOT EXISTS trg_ingest_state_cache_delete
+    AFTER DELETE ON main.ingest_state
+    BEGIN
+        SELECT zdash_state_changed(OLD.key, NULL);
+    END;
+"""
+
+
+def _parse_utc(value: Any) -> datetime | None:
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+
+
+# Upper bound on queued writes folded into one group commit.
+WRITE_GROUP_MAX_JOBS = 256
+
+T = TypeVar("T")
+
+
+@dataclass(slots=True)
+class _WriteJob:
+    fn: Callable[[sqlite3.Connection], Any]
+    future: Future[Any]
+    # Runs outside any transaction (VACUUM and friends).
+    raw: bool = False
+
+
+@dataclass(slots=True)
+class _WriteSession:
+    granted: threading.Event = field(default_factory=threading.Event)
+    released: threading.Event = field(default_factory=threading.Event)
+
+
+_STOP = object()
+
+
+class _ReaderPool:
+    """Bounded pool of read-only connections (WAL lets them run in parallel)."""
+
+    def __init__(self, db_path: Path, size: int, cached_statements: int) -> None:
+        self._uri = f"{db_path.resolve().as_uri()}?mode=ro"
+        self._size = max(1, int(size))
+        self._cached_statements = max(0, int(cached_statements))
+        self._idle: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._all: list[sqlite3.Connection] = []
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self._uri,
+            uri=True,
+            check_same_thread=False,
+            cached_statements=self._cached_statements,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self._size:
+                self._created += 1
+                conn = self._connect()
+                self._all.append(conn)
+                return conn
+        # Pool exhausted: wait for another reader to hand one back.
+        return self._idle.get()
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        self._idle.put(conn)
+
+    def close(self) -> None:
+        with self._lock:
+            for conn in self._all:
+                conn.close()
+            self._all.clear()
 
 
 class Database:
-    def __init__(self, db_path: Path) -> None:
+    """SQLite access with a single writer thread and a pool of read connections.
+
+    All mutations are queued to one writer thread that owns the write
+    connection and folds whatever is queued into one group commit; callers
+    block on (or keep) the returned future. Reads are served by a bounded pool
+    of read-only connections, so dashboard queries, the SSE stream and log
+    ingest run side by side instead of queueing on one connection (WAL mode).
+    ``ingest_state`` is served from memory through ``self.state`` (StateStore).
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        *,
+        read_pool_size: int = DB_READ_POOL_SIZE,
+        statement_cache_size: int = DB_STATEMENT_CACHE_SIZE,
+    ) -> None:
         db_path.parent.mkdir(parents=True, exist_ok=True)
-        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.db_path = db_path
+        self._conn = sqlite3.connect(
+            db_path,
+            check_same_thread=False,
+            isolation_level=None,
+            cached_statements=max(0, int(statement_cache_size)),
+        )
         self._conn.row_factory = sqlite3.Row
-        self._lock = threading.RLock()
         self._init_schema()
+        self._readers = _ReaderPool(db_path, read_pool_size, statement_cache_size)
+        self._local = threading.local()
+        self.state = StateStore(self._load_state, owns_writer=self._owns_writer)
+        self._conn.create_function("zdash_state_changed", 2, self.state.note_change)
+        self._conn.executescript(_STATE_CACHE_TRIGGERS)
+        # Keeps write-behind state updates queued in the order they were assumed.
+        self._state_write_lock = threading.Lock()
+        self._queue: queue.SimpleQueue[Any] = queue.SimpleQueue()
+        self._writer = threading.Thread(target=self._writer_loop, daemon=True, name="zero-cycle-db-writer")
+        self._writer.start()
 
     def _init_schema(self) -> None:
         schema = """
+        PRAGMA auto_vacuum = INCREMENTAL;
         PRAGMA journal_mode = WAL;
         PRAGMA synchronous = NORMAL;
         PRAGMA foreign_keys = ON;
@@ -126,18 +519,73 @@ class Database:
             key TEXT PRIMARY KEY,
             value TEXT NOT NULL
         );
+
+        CREATE TABLE IF NOT EXISTS raw_log_archive (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            first_event_id INTEGER NOT NULL,
+            last_event_id INTEGER NOT NULL,
+            first_ingested_at_utc TEXT,
+            last_ingested_at_utc TEXT,
+            line_count INTEGER NOT NULL,
+            payload BLOB NOT NULL,
+            created_at TEXT NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS mpk_tower_heights (
+            seed TEXT NOT NULL,
+            radius INTEGER NOT NULL,
+            back_diag INTEGER,
+            front_diag INTEGER,
+            back_straight INTEGER,
+            front_straight INTEGER,
+            source_world TEXT,
+            created_at TEXT NOT NULL,
+            PRIMARY KEY (seed, radius)
+        );
         """
-        with self._lock:
-            self._conn.executescript(schema)
-            self._migrate_schema()
-            self._conn.commit()
+        started = time.perf_counter()
+        self._conn.executescript(schema)
+        self._conn.execute("BEGIN")
+        try:
+            report = self._migrate_schema()
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+        # Reported by /api/health.
+        self.schema_report = {**report, "seconds": round(time.perf_counter() - started, 3)}
 
     def _has_column(self, table: str, column: str) -> bool:
-        cur = self._conn.execute(f"PRAGMA table_info({table})")
+        # table_xinfo also lists generated columns.
+        cur = self._conn.execute(f"PRAGMA table_xinfo({table})")
         columns = [str(row[1]) for row in cur.fetchall()]
         return column in columns
 
-    def _migrate_schema(self) -> None:
+    def _migrate_schema(self) -> dict[str, Any]:
+        # Each step runs once per database; PRAGMA user_version counts the steps
+        # already applied. Append new steps, never reorder or edit applied ones.
+        steps: tuple[Callable[[], None], ...] = (
+            self._migrate_columns,
+            self._backfill_damage_split,
+            self._create_indexes,
+            self._normalize_attempts,
+            self._migrate_target_stats,
+            self._migrate_sessions,
+            self._name_unknown_mpk_towers,
+            self._segment_finished_sessions,
+        )
+        version = int(self._conn.execute("PRAGMA user_version").fetchone()[0])
+        applied: list[str] = []
+        for number, step in enumerate(steps, start=1):
+            if number <= version:
+                continue
+            step()
+            applied.append(step.__name__.lstrip("_"))
+        if applied:
+            self._conn.execute(f"PRAGMA user_version = {len(steps)}")
+        return {"version": max(version, len(steps)), "applied": applied}
+
+    def _migrate_columns(self) -> None:
         migrations: list[tuple[str, str, str]] = [
             ("attempts", "major_damage_total", "INTEGER NOT NULL DEFAULT 0"),
             ("attempts", "major_hit_count", "INTEGER NOT NULL DEFAULT 0"),
@@ -158,10 +606,43 @@ class Database:
             ("attempts", "crossbow_shots", "INTEGER NOT NULL DEFAULT 0"),
             ("attempt_beds", "damage_kind", "TEXT NOT NULL DEFAULT 'unknown'"),
             ("attempt_beds", "is_major", "INTEGER NOT NULL DEFAULT 0"),
+            # Dashboard dimensions derived from zero_type, so filters and
+            # GROUP BYs compare plain values and can use the indexes below.
+            (
+                "attempts",
+                "side",
+                """TEXT GENERATED ALWAYS AS (
+                    CASE
+                        WHEN COALESCE(zero_type, '') LIKE 'Front %' THEN 'Front'
+                        WHEN COALESCE(zero_type, '') LIKE 'Back %' THEN 'Back'
+                        ELSE 'Unknown'
+                    END
+                ) VIRTUAL""",
+            ),
+            (
+                "attempts",
+                "rotation",
+                """TEXT GENERATED ALWAYS AS (
+                    CASE
+                        WHEN UPPER(COALESCE(zero_type, '')) LIKE '%CCW' THEN 'ccw'
+                        WHEN UPPER(COALESCE(zero_type, '')) LIKE '%CW' THEN 'cw'
+                        ELSE 'unknown'
+                    END
+                ) VIRTUAL""",
+            ),
+            (
+                "attempts",
+                "is_straight",
+                """INTEGER GENERATED ALWAYS AS (
+                    CASE WHEN COALESCE(zero_type, '') LIKE '%Straight%' THEN 1 ELSE 0 END
+                ) VIRTUAL""",
+            ),
         ]
         for table, column, definition in migrations:
             if not self._has_column(table, column):
                 self._conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+    def _backfill_damage_split(self) -> None:
         # Backfill old rows when new fields were introduced.
         self._conn.execute(
             """
@@ -218,6 +699,18 @@ class Database:
                 )
             """
         )
+
+    def _create_indexes(self) -> None:
+        # Retention needs to find rows still referenced by attempts quickly.
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_attempts_started_event ON attempts (started_event_id)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_attempt_beds_event ON attempt_beds (event_id)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_attempt_events_event ON attempt_events (event_id)"
+        )
         self._conn.execute(
             """
             CREATE INDEX IF NOT EXISTS idx_attempt_beds_kind
@@ -236,6 +729,21 @@ class Database:
             ON attempts (attempt_source, attempt_seed_mode, started_at_utc)
             """
         )
+        self._conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_attempts_dims
+            ON attempts (attempt_source, attempt_seed_mode, is_straight, side, rotation, started_at_utc)
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_attempts_mpk_target
+            ON attempts (attempt_source, side, o_level, tower_name)
+            """
+        )
+
+    def _normalize_attempts(self) -> None:
+        # Both trackers write normalized values; this only fixes legacy rows.
         self._conn.execute(
             """
             UPDATE attempts
@@ -266,38 +774,554 @@ class Database:
             """
         )
 
+    def _name_unknown_mpk_towers(self) -> None:
+        # MpkAttemptTracker names towers from standing_height when the bedrock
+        # lookup fails; repair rows stored as Unknown before it did.
+        self._conn.execute(
+            """
+            UPDATE attempts
+            SET tower_name = CASE standing_height
+                WHEN 76 THEN 'Small Boy'
+                WHEN 79 THEN 'Small Cage'
+                WHEN 82 THEN 'Tall Cage'
+                WHEN 85 THEN 'M-85'
+                WHEN 88 THEN 'M-88'
+                WHEN 91 THEN 'M-91'
+                WHEN 94 THEN 'T-94'
+                WHEN 97 THEN 'T-97'
+                WHEN 100 THEN 'T-100'
+                WHEN 103 THEN 'Tall Boy'
+                ELSE tower_name
+            END
+            WHERE attempt_source = 'mpk'
+              AND tower_code IS NULL
+              AND COALESCE(tower_name, 'Unknown') = 'Unknown'
+              AND standing_height IN (76, 79, 82, 85, 88, 91, 94, 97, 100, 103)
+            """
+        )
+
+    def _migrate_target_stats(self) -> None:
+        created = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'target_stats'"
+        ).fetchone() is None
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS target_stats (
+                attempt_source TEXT,
+                attempt_seed_mode TEXT,
+                tower_name TEXT,
+                side TEXT,
+                rotation TEXT,
+                is_straight INTEGER,
+                o_level INTEGER,
+                standing_height INTEGER,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                successes INTEGER NOT NULL DEFAULT 0,
+                failures INTEGER NOT NULL DEFAULT 0,
+                success_time_sum REAL NOT NULL DEFAULT 0,
+                success_time_count INTEGER NOT NULL DEFAULT 0,
+                last_attempt_id INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        self._conn.execute(
+            f"""
+            CREATE INDEX IF NOT EXISTS idx_target_stats_key
+            ON target_stats ({", ".join(TARGET_STATS_KEY_COLUMNS)})
+            """
+        )
+        for trigger in _TARGET_STATS_TRIGGERS:
+            self._conn.execute(trigger)
+        if created:
+            self._conn.execute(_TARGET_STATS_REBUILD)
+
+    def _migrate_sessions(self) -> None:
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS sessions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                attempt_source TEXT NOT NULL,
+                started_at_utc TEXT NOT NULL,
+                last_started_at_utc TEXT NOT NULL
+            )
+            """
+        )
+        if not self._has_column("attempts", "session_id"):
+            self._conn.execute("ALTER TABLE attempts ADD COLUMN session_id INTEGER")
+        self._conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_sessions_source_started
+            ON sessions (attempt_source, started_at_utc)
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_attempts_session
+            ON attempts (session_id, started_at_utc)
+            """
+        )
+        # The triggers and the split itself are installed by
+        # _segment_finished_sessions, which replaced this step's versions.
+
+    def _segment_finished_sessions(self) -> None:
+        if not self._has_column("attempts", "combined_session_id"):
+            self._conn.execute("ALTER TABLE attempts ADD COLUMN combined_session_id INTEGER")
+        self._conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_attempts_combined_session
+            ON attempts (combined_session_id, started_at_utc)
+            """
+        )
+        for name in _SESSION_TRIGGER_NAMES:
+            self._conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+        for trigger in _SESSION_TRIGGERS:
+            self._conn.execute(trigger)
+        self._assign_sessions(self._conn)
+
+    @staticmethod
+    def _assign_sessions(conn: sqlite3.Connection) -> dict[str, int]:
+        """Split every finished attempt into sessions from scratch (the triggers extend them)."""
+        conn.execute("DELETE FROM sessions")
+        conn.execute(
+            """
+            UPDATE attempts
+            SET session_id = NULL, combined_session_id = NULL
+            WHERE session_id IS NOT NULL OR combined_session_id IS NOT NULL
+            """
+        )
+        rows = conn.execute(
+            f"""
+            SELECT id, attempt_source, started_at_utc
+            FROM attempts
+            WHERE status IN {_SESSION_FINISHED}
+            ORDER BY started_at_utc ASC, id ASC
+            """
+        ).fetchall()
+        assignments: list[tuple[int, int, int]] = []
+        # Open session per segmentation (each source, plus all sources combined).
+        current: dict[str, tuple[int, datetime | None]] = {}
+        bounds: dict[int, str] = {}
+        for row in rows:
+            started_dt = _parse_utc(row["started_at_utc"])
+            session_ids: list[int] = []
+            for source in (str(row["attempt_source"]), COMBINED_SESSION_SOURCE):
+                session_id, last_dt = current.get(source, (0, None))
+                new_session = session_id == 0
+                if not new_session and started_dt is not None and last_dt is not None:
+                    new_session = (started_dt - last_dt).total_seconds() > SESSION_GAP_SECONDS
+                if new_session:
+                    session_id = int(
+                        conn.execute(
+                            """
+                            INSERT INTO sessions (attempt_source, started_at_utc, last_started_at_utc)
+                            VALUES (?, ?, ?)
+                            """,
+                            (source, row["started_at_utc"], row["started_at_utc"]),
+                        ).lastrowid
+                    )
+                current[source] = (session_id, started_dt if started_dt is not None else last_dt)
+                bounds[session_id] = row["started_at_utc"]
+                session_ids.append(session_id)
+            assignments.append((session_ids[0], session_ids[1], int(row["id"])))
+        conn.executemany(
+            "UPDATE attempts SET session_id = ?, combined_session_id = ? WHERE id = ?",
+            assignments,
+        )
+        conn.executemany(
+            "UPDATE sessions SET last_started_at_utc = ? WHERE id = ?",
+            [(last, sid) for sid, last in bounds.items()],
+        )
+        return {
+            "sessions": len({session_id for session_id, _, _ in assignments}),
+            "combined_sessions": len({session_id for _, session_id, _ in assignments}),
+            "attempts": len(assignments),
+        }
+
+    def rebuild_sessions(self) -> dict[str, int]:
+        """Re-split all attempts into sessions, e.g. after out-of-order imports."""
+        return self.run_write(self._assign_sessions)
+
+    def rebuild_target_stats(self) -> dict[str, int]:
+        """Recompute target_stats from attempts (the triggers keep it current)."""
+
+        def _rebuild(conn: sqlite3.Connection) -> dict[str, int]:
+            conn.execute("DELETE FROM target_stats")
+            conn.execute(_TARGET_STATS_REBUILD)
+            row = conn.execute("SELECT COUNT(*), COALESCE(SUM(attempts), 0) FROM target_stats").fetchone()
+            return {"rows": int(row[0]), "attempts": int(row[1])}
+
+        return self.run_write(_rebuild)
+
+    def _writer_loop(self) -> None:
+        while True:
+            item = self._queue.get()
+            batch: list[_WriteJob] = []
+            while isinstance(item, _WriteJob) and not item.raw:
+                batch.append(item)
+                if len(batch) >= WRITE_GROUP_MAX_JOBS:
+                    item = None
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    item = None
+            if batch:
+                self._run_group(batch)
+            if item is _STOP:
+                return
+            if isinstance(item, _WriteSession):
+                # The requesting thread drives the write connection directly
+                # until it releases the session; this thread just parks.
+                item.granted.set()
+                item.released.wait()
+            elif isinstance(item, _WriteJob):
+                self._run_raw(item)
+
+    def _run_group(self, batch: list[_WriteJob]) -> None:
+        results: list[tuple[_WriteJob, Any, BaseException | None]] = []
+        conn = self._conn
+        try:
+            conn.execute("BEGIN")
+            for job in batch:
+                # One savepoint per job so a failing statement only fails its caller.
+                conn.execute("SAVEPOINT job")
+                mark = self.state.staged_mark()
+                try:
+                    value = job.fn(conn)
+                except BaseException as exc:
+                    conn.execute("ROLLBACK TO job")
+                    conn.execute("RELEASE job")
+                    self.state.discard_staged(mark)
+                    results.append((job, None, exc))
+                    continue
+                conn.execute("RELEASE job")
+                results.append((job, value, None))
+            conn.execute("COMMIT")
+        except BaseException as exc:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            self.state.discard_staged()
+            for job in batch:
+                if not job.future.done():
+                    job.future.set_exception(exc)
+            return
+        self.state.publish_staged()
+        for job, value, error in results:
+            if error is not None:
+                job.future.set_exception(error)
+            else:
+                job.future.set_result(value)
+
+    def _run_raw(self, job: _WriteJob) -> None:
+        try:
+            value = job.fn(self._conn)
+        except BaseException as exc:
+            self.state.publish_staged()
+            job.future.set_exception(exc)
+            return
+        self.state.publish_staged()
+        job.future.set_result(value)
+
+    def _owns_writer(self) -> bool:
+        return getattr(self._local, "session", None) is not None or threading.current_thread() is self._writer
+
+    def submit_write(self, fn: Callable[[sqlite3.Connection], T], *, raw: bool = False) -> Future[T]:
+        """Queue ``fn(write_conn)`` on the writer thread; the future resolves after commit."""
+        session = getattr(self._local, "session", None)
+        future: Future[T] = Future()
+        if session is not None:
+            # Inside transaction(): this thread already owns the write connection.
+            try:
+                future.set_result(fn(self._conn))
+            except BaseException as exc:
+                future.set_exception(exc)
+            return future
+        self._queue.put(_WriteJob(fn=fn, future=future, raw=raw))
+        return future
+
+    def run_write(self, fn: Callable[[sqlite3.Connection], T], *, raw: bool = False) -> T:
+        return self.submit_write(fn, raw=raw).result()
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        # Everything written from this thread inside the block is committed once
+        # at the end; nested blocks join the outer one.
+        if getattr(self._local, "session", None) is not None:
+            yield
+            return
+        session = _WriteSession()
+        self._queue.put(session)
+        session.granted.wait()
+        self._local.session = session
+        try:
+            self._conn.execute("BEGIN")
+            try:
+                yield
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                self.state.discard_staged()
+                raise
+            try:
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self.state.discard_staged()
+                raise
+            self.state.publish_staged()
+        finally:
+            self._local.session = None
+            session.released.set()
+
+    def submit(self, sql: str, params: Iterable[Any] = ()) -> Future[int]:
+        """Queue a single write statement; the future yields its lastrowid."""
+        args = tuple(params)
+        return self.submit_write(lambda conn: int(conn.execute(sql, args).lastrowid or 0))
+
     def execute(self, sql: str, params: Iterable[Any] = ()) -> int:
-        with self._lock:
-            cur = self._conn.execute(sql, tuple(params))
-            self._conn.commit()
-            return int(cur.lastrowid)
+        return self.submit(sql, params).result()
+
+    def insert_raw_events(self, rows: Sequence[Sequence[Any]]) -> list[int]:
+        """Bulk insert raw_log_events rows (RAW_EVENT_COLUMNS order) and return their ids."""
+        if not rows:
+            return []
+        placeholders = ", ".join("?" for _ in RAW_EVENT_COLUMNS)
+        sql = f"INSERT INTO raw_log_events ({', '.join(RAW_EVENT_COLUMNS)}) VALUES ({placeholders})"
+        params = [tuple(row) for row in rows]
+
+        def _insert(conn: sqlite3.Connection) -> int:
+            conn.executemany(sql, params)
+            return int(conn.execute("SELECT last_insert_rowid()").fetchone()[0])
+
+        last_id = self.run_write(_insert)
+        # AUTOINCREMENT ids are handed out sequentially on the single write
+        # connection, so the batch occupies a contiguous range.
+        first_id = last_id - len(rows) + 1
+        return list(range(first_id, last_id + 1))
+
+    @contextmanager
+    def reader(self) -> Iterator[None]:
+        """Pin one pooled read connection to this thread for the whole block.
+
+        Payload builders issue dozens of queries; pinning avoids a pool
+        round-trip per query and keeps their prepared statements warm.
+        """
+        if getattr(self._local, "reader", None) is not None:
+            yield
+            return
+        conn = self._readers.acquire()
+        self._local.reader = conn
+        try:
+            yield
+        finally:
+            self._local.reader = None
+            self._readers.release(conn)
+
+    def _read(self, sql: str, params: Iterable[Any], one: bool) -> Any:
+        args = tuple(params)
+        if getattr(self._local, "session", None) is not None:
+            # Read-your-writes inside an open transaction.
+            cur = self._conn.execute(sql, args)
+            return cur.fetchone() if one else list(cur.fetchall())
+        pinned = getattr(self._local, "reader", None)
+        if pinned is not None:
+            cur = pinned.execute(sql, args)
+            return cur.fetchone() if one else list(cur.fetchall())
+        conn = self._readers.acquire()
+        try:
+            cur = conn.execute(sql, args)
+            return cur.fetchone() if one else list(cur.fetchall())
+        finally:
+            self._readers.release(conn)
 
     def query_all(self, sql: str, params: Iterable[Any] = ()) -> list[sqlite3.Row]:
-        with self._lock:
-            cur = self._conn.execute(sql, tuple(params))
-            return list(cur.fetchall())
+        return self._read(sql, params, one=False)
 
     def query_one(self, sql: str, params: Iterable[Any] = ()) -> sqlite3.Row | None:
-        with self._lock:
-            cur = self._conn.execute(sql, tuple(params))
-            return cur.fetchone()
+        return self._read(sql, params, one=True)
 
-    def get_state(self, key: str, default: str | None = None) -> str | None:
-        row = self.query_one("SELECT value FROM ingest_state WHERE key = ?", (key,))
+    @staticmethod
+    def _size_bytes(conn: sqlite3.Connection) -> dict[str, int]:
+        page_size = int(conn.execute("PRAGMA page_size").fetchone()[0])
+        page_count = int(conn.execute("PRAGMA page_count").fetchone()[0])
+        freelist = int(conn.execute("PRAGMA freelist_count").fetchone()[0])
+        return {"file_bytes": page_size * page_count, "free_bytes": page_size * freelist}
+
+    def compact_raw_log_events(
+        self,
+        keep_days: float,
+        *,
+        archive: bool = True,
+        block_rows: int = 5000,
+    ) -> dict[str, Any]:
+        """Apply the raw_log_events retention policy and report reclaimed space.
+
+        Chat lines (``is_chat = 1``), rows referenced by attempts / attempt_beds /
+        attempt_events and rows newer than ``keep_days`` are kept: chat lines are
+        what scripts/rebuild_attempts.py replays. Older rows are deleted, optionally after being
+        stored in raw_log_archive as zlib-compressed JSON blocks of
+        ``[id, ingested_at_utc, file_offset, raw_line]`` (the parsed columns can be
+        re-derived from raw_line). Each block is its own write job so ingest is
+        never held up for long; freed pages are returned with an incremental vacuum.
+        """
+        cutoff = (datetime.now(UTC) - timedelta(days=max(0.0, float(keep_days)))).isoformat(timespec="seconds")
+        before = self.run_write(self._size_bytes, raw=True)
+        limit = max(1, int(block_rows))
+
+        def _compact_block(conn: sqlite3.Connection, after_id: int) -> tuple[int, int]:
+            rows = conn.execute(
+                """
+                SELECT r.id, r.ingested_at_utc, r.file_offset, r.raw_line
+                FROM raw_log_events r
+                WHERE r.id > ?
+                  AND r.ingested_at_utc < ?
+                  AND r.is_chat = 0
+                  AND NOT EXISTS (SELECT 1 FROM attempts a WHERE a.started_event_id = r.id)
+                  AND NOT EXISTS (SELECT 1 FROM attempt_beds b WHERE b.event_id = r.id)
+                  AND NOT EXISTS (SELECT 1 FROM attempt_events e WHERE e.event_id = r.id)
+                ORDER BY r.id
+                LIMIT ?
+                """,
+                (after_id, cutoff, limit),
+            ).fetchall()
+            if not rows:
+                return 0, after_id
+            if archive:
+                payload = zlib.compress(
+                    json.dumps(
+                        [[r["id"], r["ingested_at_utc"], r["file_offset"], r["raw_line"]] for r in rows],
+                        separators=(",", ":"),
+                    ).encode("utf-8"),
+                    6,
+                )
+                conn.execute(
+                    """
+                    INSERT INTO raw_log_archive (
+                        first_event_id, last_event_id, first_ingested_at_utc,
+                        last_ingested_at_utc, line_count, payload, created_at
+                    )
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        rows[0]["id"],
+                        rows[-1]["id"],
+                        rows[0]["ingested_at_utc"],
+                        rows[-1]["ingested_at_utc"],
+                        len(rows),
+                        payload,
+                        datetime.now(UTC).isoformat(timespec="seconds"),
+                    ),
+                )
+            conn.executemany("DELETE FROM raw_log_events WHERE id = ?", [(r["id"],) for r in rows])
+            return len(rows), int(rows[-1]["id"])
+
+        deleted = 0
+        blocks = 0
+        after_id = 0
+        while True:
+            count, after_id = self.run_write(lambda conn, after_id=after_id: _compact_block(conn, after_id))
+            if count == 0:
+                break
+            deleted += count
+            blocks += 1 if archive else 0
+
+        def _vacuum(conn: sqlite3.Connection) -> dict[str, int]:
+            auto_vacuum = int(conn.execute("PRAGMA auto_vacuum").fetchone()[0])
+            if auto_vacuum == 2:
+                conn.execute("PRAGMA incremental_vacuum")
+            elif deleted > 0:
+                # Databases created before incremental auto_vacuum was enabled need
+                # one full VACUUM to switch modes; later runs stay incremental.
+                conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                conn.execute("VACUUM")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            return self._size_bytes(conn)
+
+        after = self.run_write(_vacuum, raw=True)
+        return {
+            "cutoff_utc": cutoff,
+            "deleted_events": deleted,
+            "archived_blocks": blocks,
+            "bytes_before": before["file_bytes"],
+            "bytes_after": after["file_bytes"],
+            "reclaimed_bytes": max(0, before["file_bytes"] - after["file_bytes"]),
+        }
+
+    def read_raw_log_archive_block(self, block_id: int) -> list[dict[str, Any]]:
+        row = self.query_one("SELECT payload FROM raw_log_archive WHERE id = ?", (block_id,))
         if row is None:
-            return default
-        return str(row["value"])
+            return []
+        items = json.loads(zlib.decompress(row["payload"]).decode("utf-8"))
+        return [
+            {"id": item[0], "ingested_at_utc": item[1], "file_offset": item[2], "raw_line": item[3]}
+            for item in items
+        ]
+
+    def _load_state(self) -> dict[str, str]:
+        # Never the write connection: the cache must only ever hold committed rows.
+        sql = "SELECT key, value FROM ingest_state"
+        pinned = getattr(self._local, "reader", None)
+        if pinned is not None:
+            rows = pinned.execute(sql).fetchall()
+        else:
+            conn = self._readers.acquire()
+            try:
+                rows = conn.execute(sql).fetchall()
+            finally:
+                self._readers.release(conn)
+        return {str(row["key"]): str(row["value"]) for row in rows}
 
-    def set_state(self, key: str, value: str) -> None:
-        self.execute(
+    def get_state(self, key: str, default: str | None = None) -> str | None:
+        """Read an ingest_state key from the in-memory cache (see ``self.state``)."""
+        return self.state.get(key, default)
+
+    def set_state(self, key: str, value: str) -> Future[None]:
+        return self.set_states({key: value})
+
+    def set_states(self, values: Mapping[str, str]) -> Future[None]:
+        """Upsert several ingest_state keys in one write.
+
+        Outside transaction() the write is write-behind: the cache shows the
+        new values immediately and the upsert joins the next group commit.
+        Wait on the returned future (or call flush()) when the rows must be on
+        disk; if the write fails the cache is dropped and reloaded.
+        """
+        values = {str(key): str(value) for key, value in values.items()}
+        if not values:
+            future: Future[None] = Future()
+            future.set_result(None)
+            return future
+        if getattr(self._local, "session", None) is not None:
+            future = self.submit_write(lambda conn: self.write_state(conn, values))
+            future.result()
+            return future
+        with self._state_write_lock:
+            number = self.state.assume(values)
+
+            def _write(conn: sqlite3.Connection) -> None:
+                with self.state.writing(number):
+                    self.write_state(conn, values)
+
+            future = self.submit_write(_write)
+        future.add_done_callback(lambda done: done.exception() is None or self.state.abandon(number))
+        return future
+
+    def flush(self) -> None:
+        """Block until every write queued before this call is committed."""
+        self.run_write(lambda conn: None)
+
+    @staticmethod
+    def write_state(conn: sqlite3.Connection, values: Mapping[str, str]) -> None:
+        """Upsert ingest_state rows on ``conn``, e.g. inside a larger write job."""
+        conn.executemany(
             """
             INSERT INTO ingest_state (key, value)
             VALUES (?, ?)
             ON CONFLICT(key) DO UPDATE SET value = excluded.value
             """,
-            (key, value),
+            list(values.items()),
         )
 
     def close(self) -> None:
-        with self._lock:
-            self._conn.close()
+        self._queue.put(_STOP)
+        self._writer.join()
+        self._readers.close()
+        self._conn.close()
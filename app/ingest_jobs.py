@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+import threading
+import time
+from typing import Any, Callable, Iterator
+
+
+def utc_now() -> str:
+    return datetime.now(UTC).isoformat(timespec="seconds")
+
+
+@dataclass(slots=True)
+class IngestJob:
+    key: str
+    fn: Callable[[IngestJob], str | None] | None = None
+    status: str = "queued"
+    result: str = ""
+    error: str = ""
+    enqueued_at_utc: str = field(default_factory=utc_now)
+    started_at_utc: str = ""
+    finished_at_utc: str = ""
+    stages: dict[str, float] = field(default_factory=dict)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = round(self.stages.get(name, 0.0) + time.perf_counter() - started, 3)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "key": self.key,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "enqueued_at_utc": self.enqueued_at_utc,
+            "started_at_utc": self.started_at_utc,
+            "finished_at_utc": self.finished_at_utc,
+            "stages": dict(self.stages),
+        }
+
+
+class IngestJobQueue(threading.Thread):
+    """Runs slow ingest work (MPK world parsing) off the log-tailing thread.
+
+    Jobs are keyed (by world name); submitting a key that is already queued or
+    running is a no-op, so the transition and exit triggers for the same world
+    collapse into one ingest.
+    """
+
+    def __init__(self, name: str = "zero-cycle-ingest-jobs", history: int = 20) -> None:
+        super().__init__(daemon=True, name=name)
+        self._pending: OrderedDict[str, IngestJob] = OrderedDict()
+        self._running: IngestJob | None = None
+        self._history: deque[IngestJob] = deque(maxlen=max(1, history))
+        self._cond = threading.Condition()
+        self._stopping = False
+        self.completed = 0
+        self.failed = 0
+
+    def submit(self, key: str, fn: Callable[[IngestJob], str | None]) -> bool:
+        with self._cond:
+            if self._stopping:
+                return False
+            if key in self._pending or (self._running is not None and self._running.key == key):
+                return False
+            self._pending[key] = IngestJob(key=key, fn=fn)
+            self._cond.notify()
+            return True
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+
+    def wait_for(self, key: str, timeout: float | None = None) -> bool:
+        """Block until no job for ``key`` is queued or running; False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while key in self._pending or (self._running is not None and self._running.key == key):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def wait_idle(self, timeout: float | None = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._pending or self._running is not None:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._stopping:
+                    self._cond.wait()
+                if self._stopping:
+                    return
+                _, job = self._pending.popitem(last=False)
+                job.status = "running"
+                job.started_at_utc = utc_now()
+                self._running = job
+            try:
+                assert job.fn is not None
+                job.result = job.fn(job) or ""
+                job.status = "done"
+            except Exception as exc:
+                job.status = "failed"
+                job.error = f"{type(exc).__name__}: {exc}"
+            job.finished_at_utc = utc_now()
+            with self._cond:
+                if job.status == "failed":
+                    self.failed += 1
+                else:
+                    self.completed += 1
+                self._history.append(job)
+                self._running = None
+                self._cond.notify_all()
+
+    def status(self) -> dict[str, Any]:
+        with self._cond:
+            return {
+                "alive": self.is_alive(),
+                "queue_depth": len(self._pending),
+                "queued": list(self._pending.keys()),
+                "running": self._running.as_dict() if self._running is not None else None,
+                "completed": self.completed,
+                "failed": self.failed,
+                "recent": [job.as_dict() for job in reversed(self._history)],
+            }
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+
+# inotify(7) constants; only the ones the log tailer needs.
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_WATCH_MASK = (
+    _IN_MODIFY
+    | _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+    | _IN_DELETE_SELF
+    | _IN_MOVE_SELF
+)
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class PollingChangeWaiter:
+    """Fallback backend: every wait is a fixed sleep and reports a possible change.
+
+    With ``upgrade_path`` set (inotify was wanted but the log directory did not
+    exist yet), the directory is re-checked every ``rescan_seconds`` and the
+    waiter marks itself dead once it appears, so the caller reopens a backend.
+    """
+
+    backend = "poll"
+
+    def __init__(
+        self,
+        interval_seconds: float,
+        *,
+        upgrade_path: Path | None = None,
+        rescan_seconds: float = 1.0,
+    ) -> None:
+        self.interval_seconds = interval_seconds
+        self.alive = True
+        self.upgrade_path = upgrade_path
+        self.rescan_seconds = rescan_seconds
+        self._next_upgrade_check = time.monotonic() + rescan_seconds
+
+    def wait(self) -> bool:
+        time.sleep(self.interval_seconds)
+        if self.upgrade_path is not None and time.monotonic() >= self._next_upgrade_check:
+            self._next_upgrade_check = time.monotonic() + self.rescan_seconds
+            if self.upgrade_path.parent.is_dir():
+                self.alive = False
+        return True
+
+    def close(self) -> None:
+        return
+
+
+class InotifyChangeWaiter:
+    """Blocks until the watched file's directory reports a change to that file.
+
+    The directory (not the file) is watched so rotation/recreation of
+    latest.log is seen as well. ``wait`` also returns after ``rescan_seconds``
+    without events so the caller can do a cheap safety stat.
+    """
+
+    backend = "inotify"
+
+    def __init__(self, path: Path, rescan_seconds: float) -> None:
+        self.path = path
+        self.rescan_seconds = rescan_seconds
+        self.alive = True
+        self._name = os.fsencode(path.name)
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        wd = libc.inotify_add_watch(fd, os.fsencode(str(path.parent)), _WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            os.close(fd)
+            raise OSError(err, f"inotify_add_watch failed for {path.parent}")
+        self._fd = fd
+
+    def wait(self) -> bool:
+        if self._fd < 0:
+            time.sleep(self.rescan_seconds)
+            return True
+        ready, _, _ = select.select([self._fd], [], [], self.rescan_seconds)
+        if not ready:
+            return False
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return False
+        return self._relevant(data)
+
+    def _relevant(self, data: bytes) -> bool:
+        changed = False
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            _, mask, _, name_len = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset : offset + name_len].rstrip(b"\0")
+            offset += name_len
+            if mask & (_IN_IGNORED | _IN_DELETE_SELF | _IN_MOVE_SELF):
+                # The directory itself went away; let the caller reopen a backend.
+                self.alive = False
+                changed = True
+            elif mask & _IN_Q_OVERFLOW or name == self._name:
+                changed = True
+        return changed
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+        self.alive = False
+
+
+def open_change_waiter(
+    path: Path,
+    *,
+    poll_seconds: float,
+    rescan_seconds: float,
+    backend: str = "auto",
+) -> InotifyChangeWaiter | PollingChangeWaiter:
+    wants_inotify = backend in {"auto", "inotify"} and sys.platform.startswith("linux")
+    if wants_inotify and path.parent.is_dir():
+        try:
+            return InotifyChangeWaiter(path, rescan_seconds=rescan_seconds)
+        except (OSError, AttributeError):
+            return PollingChangeWaiter(poll_seconds)
+    return PollingChangeWaiter(
+        poll_seconds,
+        upgrade_path=path if wants_inotify else None,
+        rescan_seconds=rescan_seconds,
+    )
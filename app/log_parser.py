@@ -10,6 +10,9 @@ LOG_LINE_RE = re.compile(
     r" ?(?P<body>.*)$"
 )
 
+# Every line LOG_LINE_RE parses as chat contains this.
+CHAT_MARKER = "[CHAT]"
+
 
 @dataclass(slots=True)
 class ParsedLogLine:
@@ -23,6 +26,16 @@ class ParsedLogLine:
     chat_message: str | None
 
 
+@dataclass(frozen=True, slots=True)
+class LogEvent:
+    """A stored log line as handed to trackers: row id, ingest time, file offset and parse."""
+
+    event_id: int
+    ingested_at_utc: str | None
+    file_offset: int | None
+    parsed: ParsedLogLine
+
+
 def normalize_chat_message(message: str) -> str:
     cleaned = message.strip()
     if cleaned.startswith("\\n"):
@@ -30,6 +43,99 @@ def normalize_chat_message(message: str) -> str:
     return cleaned
 
 
+@dataclass(frozen=True, slots=True)
+class LogInterest:
+    """Lines a tracker reacts to; everything else is never dispatched to it.
+
+    Prefixes and ``*_contains`` are matched against the stripped chat message /
+    body as-is. ``*_contains_lower`` entries must be lower case and are matched
+    against the lower-cased text, for trackers that compare case-insensitively.
+    """
+
+    chat_prefixes: tuple[str, ...] = ()
+    chat_contains: tuple[str, ...] = ()
+    chat_contains_lower: tuple[str, ...] = ()
+    chat_empty: bool = False
+    body_prefixes: tuple[str, ...] = ()
+    body_contains: tuple[str, ...] = ()
+    body_contains_lower: tuple[str, ...] = ()
+
+
+class LogDispatcher:
+    """Combined prefilter for one or more ``LogInterest`` declarations.
+
+    Uses only ``str.startswith`` with tuples and substring checks so the bulk
+    of irrelevant lines (chunk saves, mod debug output) is rejected without
+    running any tracker regex. :meth:`wants_raw` runs the same needles over the
+    unparsed line so rejected lines skip ``LOG_LINE_RE`` as well; :meth:`wants`
+    then decides on the parsed line.
+    """
+
+    def __init__(self, interests: list[LogInterest]) -> None:
+        self.chat = self._merge(interests, "chat")
+        self.chat_empty = any(i.chat_empty for i in interests)
+        self.body = self._merge(interests, "body")
+        body_prefixes, body_contains, body_contains_lower = self.body
+        # A body prefix is a substring of the raw line too.
+        self.raw_contains = tuple(dict.fromkeys(body_prefixes + body_contains))
+        self.raw_contains_lower = body_contains_lower
+
+    @staticmethod
+    def _merge(interests: list[LogInterest], kind: str) -> tuple[tuple[str, ...], ...]:
+        def _collect(field: str) -> tuple[str, ...]:
+            return tuple(dict.fromkeys(v for i in interests for v in getattr(i, f"{kind}_{field}")))
+
+        return _collect("prefixes"), _collect("contains"), _collect("contains_lower")
+
+    def wants_raw(self, raw_line: str) -> bool:
+        """Cheap superset of :meth:`wants` on the unparsed line.
+
+        Chat lines always pass (they are few and raw_log_events needs their
+        parsed columns); any other line passes only if it contains a body needle.
+        """
+        if CHAT_MARKER in raw_line:
+            return True
+        for needle in self.raw_contains:
+            if needle in raw_line:
+                return True
+        if self.raw_contains_lower:
+            lowered = raw_line.lower()
+            for needle in self.raw_contains_lower:
+                if needle in lowered:
+                    return True
+        return False
+
+    def wants(self, parsed: ParsedLogLine) -> bool:
+        if parsed.is_chat and parsed.chat_message is not None:
+            text = parsed.chat_message.strip()
+            if not text:
+                return self.chat_empty
+            return self._matches(text, *self.chat)
+        text = (parsed.body or "").strip()
+        if not text:
+            return False
+        return self._matches(text, *self.body)
+
+    @staticmethod
+    def _matches(
+        text: str,
+        prefixes: tuple[str, ...],
+        contains: tuple[str, ...],
+        contains_lower: tuple[str, ...],
+    ) -> bool:
+        if prefixes and text.startswith(prefixes):
+            return True
+        for needle in contains:
+            if needle in text:
+                return True
+        if contains_lower:
+            lowered = text.lower()
+            for needle in contains_lower:
+                if needle in lowered:
+                    return True
+        return False
+
+
 def parse_log_line(raw_line: str) -> ParsedLogLine:
     match = LOG_LINE_RE.match(raw_line)
     if not match:
@@ -1,17 +1,27 @@
 from __future__ import annotations
 
+import mmap
 import threading
 import time
 from datetime import UTC, datetime
 from pathlib import Path
-from typing import Any
-
+from typing import Any, BinaryIO
+
+from config import (
+    HEARTBEAT_SECONDS,
+    INGEST_BATCH_LINES,
+    LOG_NOTIFY_BACKEND,
+    MMAP_CATCHUP_BYTES,
+    NOTIFY_RESCAN_SECONDS,
+)
 from .database import Database
-from .log_parser import parse_log_line
+from .log_notify import InotifyChangeWaiter, PollingChangeWaiter, open_change_waiter
+from .log_parser import LogDispatcher, LogEvent, ParsedLogLine, parse_log_line
 
 STATE_FILE_IDENTITY = "log_reader.file_identity"
 STATE_FILE_POSITION = "log_reader.file_position"
 STATE_LAST_HEARTBEAT = "log_reader.last_heartbeat_utc"
+READ_CHUNK_BYTES = 4 * 1024 * 1024
 
 
 def utc_now() -> str:
@@ -26,92 +36,205 @@ class LogWatcher(threading.Thread):
         db: Database,
         tracker: Any,
         state_prefix: str = "log_reader",
+        batch_max_lines: int = INGEST_BATCH_LINES,
+        notify_backend: str = LOG_NOTIFY_BACKEND,
+        heartbeat_seconds: float = HEARTBEAT_SECONDS,
+        mmap_catchup_bytes: int = MMAP_CATCHUP_BYTES,
     ) -> None:
         super().__init__(daemon=True, name="zero-cycle-log-watcher")
         self.log_path = log_path
         self.poll_seconds = poll_seconds
+        self.batch_max_lines = max(1, int(batch_max_lines))
+        self.notify_backend = notify_backend
+        self.active_backend = ""
+        self.heartbeat_seconds = heartbeat_seconds
+        self._last_heartbeat_monotonic = float("-inf")
+        self.mmap_catchup_bytes = max(1, int(mmap_catchup_bytes))
+        self.last_catchup: dict[str, float | int] = {}
         self.db = db
         self.tracker = tracker
         self.state_prefix = state_prefix.strip() or "log_reader"
         self.state_file_identity = f"{self.state_prefix}.file_identity"
         self.state_file_position = f"{self.state_prefix}.file_position"
         self.state_last_heartbeat = f"{self.state_prefix}.last_heartbeat_utc"
+        interest = getattr(tracker, "LOG_INTEREST", None)
+        # Trackers without a declared interest still see every line.
+        self.dispatcher = LogDispatcher([interest]) if interest is not None else None
+        self._handle_event = getattr(tracker, "handle_event", None)
         self.stop_event = threading.Event()
+        self.position = 0
+        self.identity = ""
 
     def stop(self) -> None:
         self.stop_event.set()
 
     def run(self) -> None:
-        position = int(self.db.get_state(self.state_file_position, "0") or "0")
-        identity = self.db.get_state(self.state_file_identity, "")
+        self.position = int(self.db.get_state(self.state_file_position, "0") or "0")
+        self.identity = self.db.get_state(self.state_file_identity, "") or ""
+        waiter = self._open_waiter()
+
+        try:
+            while not self.stop_event.is_set():
+                self.poll_once()
+                self._maybe_heartbeat()
+                if not waiter.alive:
+                    waiter.close()
+                    waiter = self._open_waiter()
+                waiter.wait()
+        finally:
+            waiter.close()
+
+    def _open_waiter(self) -> InotifyChangeWaiter | PollingChangeWaiter:
+        waiter = open_change_waiter(
+            self.log_path,
+            poll_seconds=self.poll_seconds,
+            rescan_seconds=NOTIFY_RESCAN_SECONDS,
+            backend=self.notify_backend,
+        )
+        self.active_backend = waiter.backend
+        return waiter
+
+    def _maybe_heartbeat(self) -> None:
+        now = time.monotonic()
+        if now - self._last_heartbeat_monotonic < self.heartbeat_seconds:
+            return
+        self.db.set_state(self.state_last_heartbeat, utc_now())
+        self._last_heartbeat_monotonic = now
+
+    def poll_once(self) -> int:
+        """Ingest everything appended since the last poll; returns the line count."""
+        if not self.log_path.exists():
+            return 0
+
+        stat = self.log_path.stat()
+        # st_ctime changes on many systems whenever the file is modified,
+        # which would incorrectly reset the read position on every append.
+        # Device+inode is stable across appends and still changes on rotation/recreate.
+        current_identity = f"{stat.st_dev}:{stat.st_ino}"
+        same_file = (
+            self.identity == current_identity
+            or self.identity.startswith(f"{current_identity}:")
+        )
 
-        while not self.stop_event.is_set():
-            if not self.log_path.exists():
-                self.db.set_state(self.state_last_heartbeat, utc_now())
-                time.sleep(self.poll_seconds)
+        if not same_file:
+            self.identity = current_identity
+            self.position = 0
+            with self.db.transaction():
+                self.db.set_state(self.state_file_identity, self.identity)
+                self.db.set_state(self.state_file_position, "0")
+
+        if stat.st_size < self.position:
+            self.position = 0
+            self.db.set_state(self.state_file_position, "0")
+        elif stat.st_size == self.position:
+            # Nothing appended: skip reopening the file.
+            return 0
+
+        backlog = stat.st_size - self.position
+        started = time.perf_counter()
+        with self.log_path.open("rb") as handle:
+            if backlog >= self.mmap_catchup_bytes:
+                ingested = self._catch_up_mmap(handle)
+                elapsed = time.perf_counter() - started
+                self.last_catchup = {
+                    "bytes": backlog,
+                    "lines": ingested,
+                    "seconds": round(elapsed, 3),
+                    "mb_per_s": round((backlog / 1_000_000) / elapsed, 2) if elapsed > 0 else 0.0,
+                }
+                return ingested
+            handle.seek(self.position)
+            return self._consume(handle.read(backlog), self.position)
+
+    def _catch_up_mmap(self, handle: BinaryIO) -> int:
+        # Large backlog (e.g. dashboard restarted behind a multi-hundred-MB log):
+        # map the file and hand out newline-aligned windows instead of readline().
+        ingested = 0
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            end = len(view)
+            while self.position < end and not self.stop_event.is_set():
+                window_end = min(end, self.position + READ_CHUNK_BYTES)
+                cut = view.rfind(b"\n", self.position, window_end)
+                if cut < 0:
+                    # Single line longer than the window.
+                    cut = view.find(b"\n", window_end, end)
+                    if cut < 0:
+                        break
+                consumed = self._consume(view[self.position : cut + 1], self.position)
+                if consumed == 0:
+                    break
+                ingested += consumed
+        return ingested
+
+    def _consume(self, data: bytes, base_offset: int) -> int:
+        """Ingest the complete lines in ``data`` (which starts at ``base_offset``).
+
+        A trailing fragment without a newline is left unread so a half-written
+        line is never stored; the next poll picks it up once it is complete.
+        """
+        complete = data.rfind(b"\n") + 1
+        if complete <= 0:
+            return 0
+        pieces = data[:complete].split(b"\n")
+        pieces.pop()
+        ingested = 0
+        offset = base_offset
+        for batch_start in range(0, len(pieces), self.batch_max_lines):
+            if self.stop_event.is_set():
+                break
+            batch: list[tuple[str, int]] = []
+            for piece in pieces[batch_start : batch_start + self.batch_max_lines]:
+                batch.append((piece.decode("utf-8", errors="replace").rstrip("\r"), offset))
+                offset += len(piece) + 1
+            self._ingest_batch(batch, offset)
+            self.position = offset
+            ingested += len(batch)
+        return ingested
+
+    def _ingest_batch(self, lines: list[tuple[str, int]], position: int) -> None:
+        # Raw rows, file position and heartbeat land in one commit so a crash can
+        # never leave the stored offset out of step with the inserted events.
+        now = utc_now()
+        dispatcher = self.dispatcher
+        rows: list[tuple] = []
+        # Only lines the trackers may want are parsed; the others are stored
+        # with raw_line alone (their header columns can be re-derived from it).
+        parsed_lines: list[tuple[int, ParsedLogLine, int]] = []
+        for index, (raw_line, file_offset) in enumerate(lines):
+            if dispatcher is not None and not dispatcher.wants_raw(raw_line):
+                rows.append((now, None, None, None, None, 0, None, raw_line, file_offset))
                 continue
-
-            stat = self.log_path.stat()
-            # st_ctime changes on many systems whenever the file is modified,
-            # which would incorrectly reset the read position on every append.
-            # Device+inode is stable across appends and still changes on rotation/recreate.
-            current_identity = f"{stat.st_dev}:{stat.st_ino}"
-            same_file = (
-                identity == current_identity
-                or identity.startswith(f"{current_identity}:")
+            parsed = parse_log_line(raw_line)
+            parsed_lines.append((index, parsed, file_offset))
+            rows.append(
+                (
+                    now,
+                    parsed.clock_time,
+                    parsed.thread_name,
+                    parsed.level,
+                    parsed.source,
+                    1 if parsed.is_chat else 0,
+                    parsed.chat_message,
+                    parsed.raw_line,
+                    file_offset,
+                )
             )
-
-            if not same_file:
-                identity = current_identity
-                position = 0
-                self.db.set_state(self.state_file_identity, identity)
-
-            if stat.st_size < position:
-                position = 0
-
-            with self.log_path.open("r", encoding="utf-8", errors="replace") as handle:
-                handle.seek(position)
-                while True:
-                    line_start = handle.tell()
-                    line = handle.readline()
-                    if line == "":
-                        break
-                    position = handle.tell()
-                    self._ingest_line(raw_line=line.rstrip("\r\n"), file_offset=line_start)
-
+        with self.db.transaction():
+            event_ids = self.db.insert_raw_events(rows)
             self.db.set_state(self.state_file_position, str(position))
-            self.db.set_state(self.state_last_heartbeat, utc_now())
-            time.sleep(self.poll_seconds)
-
-    def _ingest_line(self, raw_line: str, file_offset: int) -> None:
-        parsed = parse_log_line(raw_line)
-        event_id = self.db.execute(
-            """
-            INSERT INTO raw_log_events (
-                ingested_at_utc,
-                clock_time,
-                thread_name,
-                level,
-                source,
-                is_chat,
-                chat_message,
-                raw_line,
-                file_offset
-            )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                utc_now(),
-                parsed.clock_time,
-                parsed.thread_name,
-                parsed.level,
-                parsed.source,
-                1 if parsed.is_chat else 0,
-                parsed.chat_message,
-                parsed.raw_line,
-                file_offset,
-            ),
-        )
+            self.db.set_state(self.state_last_heartbeat, now)
+        self._last_heartbeat_monotonic = time.monotonic()
+        for index, parsed, file_offset in parsed_lines:
+            self._dispatch(LogEvent(event_ids[index], now, file_offset, parsed))
+
+    def _dispatch(self, event: LogEvent) -> None:
+        parsed = event.parsed
+        if self.dispatcher is not None and not self.dispatcher.wants(parsed):
+            return
+        if self._handle_event is not None:
+            self._handle_event(event)
+            return
+        event_id = event.event_id
         if parsed.is_chat and parsed.chat_message is not None:
             self.tracker.handle_chat_event(
                 event_id=event_id,
@@ -7,7 +7,7 @@ import math
 from pathlib import Path
 import threading
 import time
-from typing import Any
+from typing import Any, Mapping
 
 from fastapi import FastAPI, Query, Request
 from fastapi.responses import FileResponse
@@ -15,8 +15,20 @@ from fastapi.responses import StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 
-from config import DB_PATH, MPK_ENABLED, POLL_SECONDS, STATIC_DIR
+from config import (
+    DB_PATH,
+    MPK_ENABLED,
+    MPK_SAVES_ARCHIVE_DIR,
+    MPK_SAVES_KEEP,
+    MPK_TOWER_PREWARM,
+    POLL_SECONDS,
+    RAW_EVENT_ARCHIVE,
+    RAW_EVENT_AUTO_COMPACT,
+    RAW_EVENT_RETENTION_DAYS,
+    STATIC_DIR,
+)
 from .database import Database
+from .ingest_jobs import IngestJobQueue
 from .log_watcher import LogWatcher
 from .metrics import (
     ATTEMPT_SOURCE_CTX,
@@ -29,11 +41,13 @@ from .metrics import (
 )
 from .metrics import (
     get_mpk_locked_targets,
+    get_mpk_seed_pool,
     parse_mpk_target_key,
     set_mpk_locked_targets,
     toggle_mpk_locked_target,
 )
 from .mpk_injection import MpkInjectionToken, MpkInjector, MpkRuntimePaths
+from .tower_heights import prewarm_tower_heights
 
 try:
     from .mpk_attempt_tracker import MpkAttemptTracker
@@ -88,6 +102,11 @@ def _stop_mpk_runtime(app: FastAPI, *, revert_injection: bool = True) -> None:
         mpk_watcher.stop()
         mpk_watcher.join(timeout=2.0)
     app.state.mpk_watcher = None
+    mpk_ingest_queue: IngestJobQueue | None = getattr(app.state, "mpk_ingest_queue", None)
+    if mpk_ingest_queue is not None:
+        mpk_ingest_queue.stop()
+        mpk_ingest_queue.join(timeout=2.0)
+    app.state.mpk_ingest_queue = None
 
     token: MpkInjectionToken | None = getattr(app.state, "mpk_injection_token", None)
     injector: MpkInjector | None = getattr(app.state, "mpk_injector", None)
@@ -101,6 +120,12 @@ def _stop_mpk_runtime(app: FastAPI, *, revert_injection: bool = True) -> None:
     app.state.mpk_runtime = None
 
 
+def _prewarm_tower_heights(db: Database, saves_dir: Path, radius: int) -> str:
+    report = prewarm_tower_heights(db, saves_dir, get_mpk_seed_pool(), radius=radius)
+    db.set_state("mpk.tower_cache.last_prewarm", json.dumps(report, sort_keys=True))
+    return f"cached {report['cached']} of {report['pool_size']} seeds"
+
+
 def _start_mpk_runtime(
     app: FastAPI,
     db: Database,
@@ -128,7 +153,15 @@ def _start_mpk_runtime(
         app.state.mpk_injection_token = None
         return False
 
-    mpk_tracker = MpkAttemptTracker(db=db, saves_dir=runtime.saves_dir)
+    mpk_ingest_queue = IngestJobQueue(name="zero-cycle-mpk-ingest")
+    mpk_ingest_queue.start()
+    mpk_tracker = MpkAttemptTracker(
+        db=db,
+        saves_dir=runtime.saves_dir,
+        ingest_queue=mpk_ingest_queue,
+        saves_archive_dir=Path(MPK_SAVES_ARCHIVE_DIR) if MPK_SAVES_ARCHIVE_DIR else None,
+        saves_keep=MPK_SAVES_KEEP,
+    )
     mpk_watcher = LogWatcher(
         log_path=runtime.log_path,
         poll_seconds=POLL_SECONDS,
@@ -137,10 +170,16 @@ def _start_mpk_runtime(
         state_prefix="mpk_log_reader",
     )
     mpk_watcher.start()
+    if MPK_TOWER_PREWARM:
+        mpk_ingest_queue.submit(
+            "prewarm:tower_heights",
+            lambda job: _prewarm_tower_heights(db, runtime.saves_dir, mpk_tracker.bedrock_radius),
+        )
 
     db.set_state("setup.mpk_instance_path", str(runtime.minecraft_dir))
     app.state.mpk_runtime = runtime
     app.state.mpk_watcher = mpk_watcher
+    app.state.mpk_ingest_queue = mpk_ingest_queue
     app.state.mpk_injected = True
     app.state.mpk_injection_token = token
     app.state.mpk_setup_required = False
@@ -189,7 +228,15 @@ def _init_mpk_runtime(app: FastAPI, db: Database) -> None:
     )
 
 
+def _compact_raw_events(db: Database, keep_days: float, archive: bool) -> dict[str, Any]:
+    report = db.compact_raw_log_events(keep_days, archive=archive)
+    report["finished_at_utc"] = utc_now()
+    db.set_state("maintenance.raw_events.last_report", json.dumps(report))
+    return report
+
+
 def _runtime_health_payload(app: FastAPI, db: Database) -> dict[str, object]:
+    mpk_ingest_queue: IngestJobQueue | None = getattr(app.state, "mpk_ingest_queue", None)
     mpk_identity_key = "mpk_log_reader.file_identity"
     mpk_position_key = "mpk_log_reader.file_position"
     mpk_heartbeat_key = "mpk_log_reader.last_heartbeat_utc"
@@ -329,6 +376,9 @@ def _runtime_health_payload(app: FastAPI, db: Database) -> dict[str, object]:
         "mpk_instance_path": mpk_instance_path,
         "db_path": str(DB_PATH),
         "poll_seconds": POLL_SECONDS,
+        "mpk_reader_backend": str(getattr(getattr(app.state, "mpk_watcher", None), "active_backend", "") or ""),
+        "mpk_reader_last_catchup": dict(getattr(getattr(app.state, "mpk_watcher", None), "last_catchup", {}) or {}),
+        "mpk_ingest": mpk_ingest_queue.status() if mpk_ingest_queue is not None else None,
         "mpk_log_exists": bool(mpk_log_path is not None and mpk_log_path.exists()),
         "mpk_reader_identity": db.get_state(mpk_identity_key, ""),
         "mpk_reader_position": int(db.get_state(mpk_position_key, "0") or "0"),
@@ -342,6 +392,7 @@ def _runtime_health_payload(app: FastAPI, db: Database) -> dict[str, object]:
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    startup_started = time.perf_counter()
     db = Database(DB_PATH)
     mpk_enabled_runtime = bool(MPK_ENABLED and MpkAttemptTracker is not None)
     if MPK_ENABLED and MpkAttemptTracker is None:
@@ -351,6 +402,7 @@ async def lifespan(app: FastAPI):
 
     app.state.db = db
     app.state.mpk_watcher = None
+    app.state.mpk_ingest_queue = None
     app.state.mpk_enabled = mpk_enabled_runtime
     app.state.mpk_runtime = None
     app.state.mpk_setup_required = False
@@ -361,16 +413,43 @@ async def lifespan(app: FastAPI):
     app.state.mpk_lock = threading.RLock()
     app.state.started_at = utc_now()
     app.state.dashboard_cache = {}
+    app.state.practice_changed = threading.Condition()
+    app.state.practice_generation = 0
+    unsubscribe_practice = db.state.subscribe(lambda changes: _note_practice_change(app, changes))
     with app.state.mpk_lock:
         _init_mpk_runtime(app, db)
+    app.state.startup = {
+        "seconds": round(time.perf_counter() - startup_started, 3),
+        "schema_version": db.schema_report["version"],
+        "schema_seconds": db.schema_report["seconds"],
+        "migrations_applied": db.schema_report["applied"],
+    }
+    if RAW_EVENT_AUTO_COMPACT:
+        threading.Thread(
+            target=_compact_raw_events,
+            args=(db, RAW_EVENT_RETENTION_DAYS, RAW_EVENT_ARCHIVE),
+            daemon=True,
+            name="zero-cycle-raw-compaction",
+        ).start()
     try:
         yield
     finally:
+        unsubscribe_practice()
         with app.state.mpk_lock:
             _stop_mpk_runtime(app, revert_injection=True)
         db.close()
 
 
+def _note_practice_change(app: FastAPI, changes: Mapping[str, str | None]) -> None:
+    # Runs on the DB writer thread after commit. Only practice/seed keys wake the
+    # SSE streams; reader positions and heartbeats change far too often.
+    if not any(key.startswith(("mpk.practice.", "mpk.seed_rotate.")) for key in changes):
+        return
+    with app.state.practice_changed:
+        app.state.practice_generation += 1
+        app.state.practice_changed.notify_all()
+
+
 app = FastAPI(title="Zero Cycle Dashboard", lifespan=lifespan)
 app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
 
@@ -387,6 +466,7 @@ def health(request: Request) -> dict[str, object]:
     return {
         "ok": True,
         "started_at": request.app.state.started_at,
+        "startup": request.app.state.startup,
         "now": utc_now(),
         **runtime_payload,
     }
@@ -616,8 +696,11 @@ def stream(
     detail: str = Query(default="light"),
 ) -> StreamingResponse:
 
+    changed: threading.Condition = request.app.state.practice_changed
+
     def event_stream():
         while True:
+            seen = request.app.state.practice_generation
             payload = _build_dashboard_payload_cached(
                 request,
                 include_1_8=include_1_8,
@@ -630,7 +713,9 @@ def stream(
                 detail=detail,
             )
             yield f"data: {json.dumps(payload)}\n\n"
-            time.sleep(1)
+            # Push a newly queued practice target right away instead of on the next tick.
+            with changed:
+                changed.wait_for(lambda: request.app.state.practice_generation != seen, timeout=1)
 
     return StreamingResponse(event_stream(), media_type="text/event-stream")
 
@@ -745,6 +830,77 @@ def skip_mpk_weak_lock_route(request: Request) -> dict[str, object]:
     return {"ok": True, **result}
 
 
+@app.get("/api/maintenance/raw-events")
+def raw_events_maintenance_status(request: Request) -> dict[str, object]:
+    db: Database = request.app.state.db
+    counts = db.query_one(
+        """
+        SELECT
+            (SELECT COUNT(*) FROM raw_log_events) AS raw_events,
+            (SELECT COUNT(*) FROM raw_log_archive) AS archive_blocks,
+            (SELECT COALESCE(SUM(line_count), 0) FROM raw_log_archive) AS archived_events
+        """
+    )
+    try:
+        last_report = json.loads(db.get_state("maintenance.raw_events.last_report", "") or "null")
+    except json.JSONDecodeError:
+        last_report = None
+    return {
+        "ok": True,
+        "retention_days": RAW_EVENT_RETENTION_DAYS,
+        "archive_enabled": RAW_EVENT_ARCHIVE,
+        "auto_compact": RAW_EVENT_AUTO_COMPACT,
+        "raw_events": int(counts["raw_events"]) if counts is not None else 0,
+        "archive_blocks": int(counts["archive_blocks"]) if counts is not None else 0,
+        "archived_events": int(counts["archived_events"]) if counts is not None else 0,
+        "last_report": last_report,
+    }
+
+
+@app.post("/api/maintenance/compact-raw-events")
+def compact_raw_events(
+    request: Request,
+    keep_days: float = Query(default=RAW_EVENT_RETENTION_DAYS, ge=0),
+    archive: bool = Query(default=RAW_EVENT_ARCHIVE),
+) -> dict[str, object]:
+    db: Database = request.app.state.db
+    report = _compact_raw_events(db, keep_days, archive)
+    return {"ok": True, **report}
+
+
+@app.post("/api/maintenance/rebuild-target-stats")
+def rebuild_target_stats(request: Request) -> dict[str, object]:
+    db: Database = request.app.state.db
+    report = db.rebuild_target_stats()
+    request.app.state.dashboard_cache = {}
+    return {"ok": True, **report}
+
+
+@app.post("/api/maintenance/prune-mpk-saves")
+def prune_mpk_saves(
+    request: Request,
+    keep: int = Query(default=MPK_SAVES_KEEP, ge=0),
+    include_unrecorded: bool = Query(default=False),
+    dry_run: bool = Query(default=True),
+    archive_dir: str = Query(default=MPK_SAVES_ARCHIVE_DIR),
+) -> dict[str, object]:
+    db: Database = request.app.state.db
+    mpk_watcher: LogWatcher | None = getattr(request.app.state, "mpk_watcher", None)
+    if mpk_watcher is None:
+        return {"ok": False, "error": "MPK tracking is not running."}
+    if not archive_dir.strip():
+        return {"ok": False, "error": "No archive directory configured (ZERO_DASH_MPK_SAVES_ARCHIVE_DIR)."}
+    report = mpk_watcher.tracker.prune_saves(
+        archive_dir=Path(archive_dir.strip()),
+        keep=keep,
+        include_unrecorded=include_unrecorded,
+        dry_run=dry_run,
+    )
+    if not dry_run:
+        db.set_state("maintenance.mpk_saves.last_report", json.dumps(report, sort_keys=True))
+    return report
+
+
 @app.get("/api/raw-events")
 def raw_events(
     request: Request, limit: int = Query(default=200, ge=1, le=2000)
@@ -2,11 +2,12 @@ from __future__ import annotations
 
 import csv
 from contextvars import ContextVar
+import functools
 import json
 from pathlib import Path
 import random
 import re
-from typing import Any
+from typing import Any, Callable, TypeVar
 
 from config import (
     MPK_BACK_DIAG_JSON_PATH,
@@ -16,7 +17,7 @@ from config import (
     MPK_SEEDS_MAP_PATH,
 )
 
-from .database import Database
+from .database import COMBINED_SESSION_SOURCE, Database
 
 WINDOW_MIN_ID_CTX: ContextVar[int | None] = ContextVar("window_min_id", default=None)
 WINDOW_START_UTC_CTX: ContextVar[str | None] = ContextVar("window_start_utc", default=None)
@@ -26,6 +27,19 @@ ATTEMPT_SOURCE_CTX: ContextVar[str] = ContextVar("attempt_source_filter", defaul
 ATTEMPT_SEED_MODE_CTX: ContextVar[str] = ContextVar("attempt_seed_mode_filter", default="all")
 MPK_LENIENCY_TARGET_CTX: ContextVar[float] = ContextVar("mpk_leniency_target", default=0.0)
 
+_F = TypeVar("_F", bound=Callable[..., Any])
+
+
+def _pinned_reader(fn: _F) -> _F:
+    """Run a payload builder on one pooled read connection for all its queries."""
+
+    @functools.wraps(fn)
+    def wrapper(db: Database, *args: Any, **kwargs: Any) -> Any:
+        with db.reader():
+            return fn(db, *args, **kwargs)
+
+    return wrapper  # type: ignore[return-value]
+
 _MPK_EXPECTED_TOWERS = [
     "Small Boy",
     "Small Cage",
@@ -175,6 +189,12 @@ def _load_mpk_seed_map() -> tuple[dict[tuple[str, str, int], list[int]], list[in
     return combos, _MPK_SEED_MAP_LEVELS, error
 
 
+def get_mpk_seed_pool() -> set[int]:
+    """Every seed the set-seed rotation can hand out."""
+    combos, _, _ = _load_mpk_seed_map()
+    return {seed for seeds in combos.values() for seed in seeds}
+
+
 def _path_mtime(path: Path) -> float | None:
     if not path.exists():
         return None
@@ -410,8 +430,7 @@ def _clear_mpk_seed_in_atum_json_for_path(path: Path) -> str | None:
 
 
 def is_mpk_full_random_override_enabled(db: Database) -> bool:
-    raw = (db.get_state(_MPK_FULL_RANDOM_OVERRIDE_KEY, "0") or "").strip().lower()
-    return raw in {"1", "true", "yes", "on"}
+    return db.state.get_bool(_MPK_FULL_RANDOM_OVERRIDE_KEY)
 
 
 def clear_runtime_atum_seed(db: Database) -> dict[str, Any]:
@@ -434,18 +453,22 @@ def clear_runtime_atum_seed(db: Database) -> dict[str, Any]:
 
 def set_mpk_full_random_override(db: Database, enabled: bool) -> dict[str, Any]:
     enabled_norm = bool(enabled)
-    db.set_state(_MPK_FULL_RANDOM_OVERRIDE_KEY, "1" if enabled_norm else "0")
     if enabled_norm:
         # Clear queued forced-seed target state while override is active.
-        db.set_state("mpk.practice.target_key", "")
-        db.set_state("mpk.practice.seed_value", "")
-        db.set_state("mpk.practice.next_selection_reason", "full_random_override")
-        db.set_state("mpk.practice.next_selection_mode", "full_random_override")
-        db.set_state("mpk.practice.next_requested_mode", "full_random_override")
-        db.set_state("mpk.practice.next_seed_mode", "full_random")
+        db.set_states(
+            {
+                _MPK_FULL_RANDOM_OVERRIDE_KEY: "1",
+                "mpk.practice.target_key": "",
+                "mpk.practice.seed_value": "",
+                "mpk.practice.next_selection_reason": "full_random_override",
+                "mpk.practice.next_selection_mode": "full_random_override",
+                "mpk.practice.next_requested_mode": "full_random_override",
+                "mpk.practice.next_seed_mode": "full_random",
+            }
+        )
         seed_status = clear_runtime_atum_seed(db)
     else:
-        db.set_state("mpk.practice.next_seed_mode", "set_seed")
+        db.set_states({_MPK_FULL_RANDOM_OVERRIDE_KEY: "0", "mpk.practice.next_seed_mode": "set_seed"})
         seed_status = {
             "ok": True,
             "seed_cleared": False,
@@ -489,11 +512,7 @@ def _normalize_mpk_target_keys(keys: list[str]) -> list[str]:
 
 
 def get_mpk_locked_targets(db: Database) -> list[str]:
-    raw = db.get_state(_MPK_LOCKED_TARGETS_KEY, "[]") or "[]"
-    try:
-        parsed = json.loads(raw)
-    except Exception:
-        parsed = []
+    parsed = db.state.get_json(_MPK_LOCKED_TARGETS_KEY, [])
     if not isinstance(parsed, list):
         parsed = []
     normalized = _normalize_mpk_target_keys([str(x) for x in parsed])
@@ -546,18 +565,13 @@ def _mpk_target_stats(db: Database, parsed_key: tuple[str, str, int]) -> dict[st
     row = db.query_one(
         """
         SELECT
-            COUNT(*) AS attempts,
-            SUM(CASE WHEN status = 'success' THEN 1 ELSE 0 END) AS successes
-        FROM attempts
-        WHERE status IN ('success', 'fail')
-          AND COALESCE(attempt_source, 'practice') = 'mpk'
+            SUM(successes + failures) AS attempts,
+            SUM(successes) AS successes
+        FROM target_stats
+        WHERE attempt_source = 'mpk'
           AND COALESCE(tower_name, 'Unknown') = ?
           AND o_level = ?
-          AND CASE
-                WHEN COALESCE(zero_type, '') LIKE 'Front %' THEN 'Front'
-                WHEN COALESCE(zero_type, '') LIKE 'Back %' THEN 'Back'
-                ELSE 'Unknown'
-              END = ?
+          AND side = ?
         """,
         (tower_name, o_level, side),
     )
@@ -592,7 +606,7 @@ def _max_finished_mpk_attempt_id(db: Database) -> int:
         SELECT COALESCE(MAX(id), 0) AS max_id
         FROM attempts
         WHERE status IN ('success', 'fail')
-          AND COALESCE(attempt_source, 'practice') = 'mpk'
+          AND attempt_source = 'mpk'
         """
     )
     if row is None:
@@ -610,15 +624,11 @@ def _mpk_success_streak_for_target(db: Database, target_key: str, *, anchor_afte
         SELECT status
         FROM attempts
         WHERE status IN ('success', 'fail')
-          AND COALESCE(attempt_source, 'practice') = 'mpk'
+          AND attempt_source = 'mpk'
           AND id > ?
           AND COALESCE(tower_name, 'Unknown') = ?
           AND o_level = ?
-          AND CASE
-                WHEN COALESCE(zero_type, '') LIKE 'Front %' THEN 'Front'
-                WHEN COALESCE(zero_type, '') LIKE 'Back %' THEN 'Back'
-                ELSE 'Unknown'
-              END = ?
+          AND side = ?
         ORDER BY id DESC
         LIMIT 200
         """,
@@ -634,21 +644,25 @@ def _mpk_success_streak_for_target(db: Database, target_key: str, *, anchor_afte
 
 
 def skip_current_mpk_weak_lock(db: Database) -> dict[str, Any]:
-    lock_key = db.get_state(_MPK_WEAK_LOCK_TARGET_KEY, "") or ""
+    lock_key = db.state.get(_MPK_WEAK_LOCK_TARGET_KEY, "") or ""
     had_lock = bool(lock_key)
-    db.set_state(_MPK_WEAK_LOCK_TARGET_KEY, "")
-    db.set_state(_MPK_WEAK_LOCK_ANCHOR_ATTEMPT_ID_KEY, "0")
-    queued_key = db.get_state("mpk.practice.target_key", "") or ""
+    updates = {_MPK_WEAK_LOCK_TARGET_KEY: "", _MPK_WEAK_LOCK_ANCHOR_ATTEMPT_ID_KEY: "0"}
+    queued_key = db.state.get("mpk.practice.target_key", "") or ""
     if lock_key and queued_key == lock_key:
-        db.set_state("mpk.practice.target_key", "")
-        db.set_state("mpk.practice.seed_value", "")
-        db.set_state("mpk.practice.next_selection_reason", "weak_lock_skipped")
-        db.set_state("mpk.practice.next_selection_mode", "")
-        db.set_state("mpk.practice.next_requested_mode", "")
+        updates.update(
+            {
+                "mpk.practice.target_key": "",
+                "mpk.practice.seed_value": "",
+                "mpk.practice.next_selection_reason": "weak_lock_skipped",
+                "mpk.practice.next_selection_mode": "",
+                "mpk.practice.next_requested_mode": "",
+            }
+        )
     if lock_key:
         history = _load_recent_mpk_targets(db, max_items=5)
         history.append(lock_key)
-        _store_recent_mpk_targets(db, history, max_items=5)
+        updates.update(_recent_mpk_targets_state(history, max_items=5))
+    db.set_states(updates)
     return {
         "had_lock": had_lock,
         "skipped_target_key": lock_key,
@@ -680,12 +694,9 @@ def rotate_mpk_seed_for_target_key(
             "map_error": map_error,
         }
 
-    last_target_key = db.get_state("mpk.practice.target_key", "")
-    last_seed_raw = db.get_state("mpk.practice.seed_value", "")
-    try:
-        cycle = int(db.get_state("mpk.practice.seed_cycle", "0") or "0")
-    except ValueError:
-        cycle = 0
+    last_target_key = db.state.get("mpk.practice.target_key", "")
+    last_seed_raw = db.state.get("mpk.practice.seed_value", "")
+    cycle = db.state.get_int("mpk.practice.seed_cycle")
 
     should_advance = (
         advance
@@ -697,9 +708,13 @@ def rotate_mpk_seed_for_target_key(
     seed_apply_error: str | None = None
     if should_advance:
         selected_seed = int(seed_pool[cycle % len(seed_pool)])
-        db.set_state("mpk.practice.seed_cycle", str(cycle + 1))
-        db.set_state("mpk.practice.target_key", target_key)
-        db.set_state("mpk.practice.seed_value", str(selected_seed))
+        db.set_states(
+            {
+                "mpk.practice.seed_cycle": str(cycle + 1),
+                "mpk.practice.target_key": target_key,
+                "mpk.practice.seed_value": str(selected_seed),
+            }
+        )
         seed_changed = True
         atum_json_path = _resolve_runtime_atum_json_path(db)
         if atum_json_path is None:
@@ -755,21 +770,17 @@ def get_mpk_practice_candidates(
         """
         SELECT
             COALESCE(tower_name, 'Unknown') AS tower_name,
-            CASE
-                WHEN COALESCE(zero_type, '') LIKE 'Front %' THEN 'Front'
-                WHEN COALESCE(zero_type, '') LIKE 'Back %' THEN 'Back'
-                ELSE 'Unknown'
-            END AS side,
+            side,
             o_level,
-            COUNT(*) AS attempts,
-            SUM(CASE WHEN status = 'success' THEN 1 ELSE 0 END) AS successes,
-            MAX(id) AS last_attempt_id
-        FROM attempts
-        WHERE status IN ('success', 'fail')
-          AND COALESCE(attempt_source, 'practice') = 'mpk'
+            SUM(successes + failures) AS attempts,
+            SUM(successes) AS successes,
+            MAX(last_attempt_id) AS last_attempt_id
+        FROM target_stats
+        WHERE attempt_source = 'mpk'
           AND o_level IS NOT NULL
           AND COALESCE(tower_name, 'Unknown') <> 'Unknown'
         GROUP BY COALESCE(tower_name, 'Unknown'), side, o_level
+        HAVING SUM(successes + failures) > 0
         """,
     )
     by_key: dict[tuple[str, str, int], dict[str, int]] = {}
@@ -841,11 +852,7 @@ def get_mpk_practice_candidates(
 
 
 def _load_recent_mpk_targets(db: Database, *, max_items: int = 3) -> list[str]:
-    raw = db.get_state(_MPK_RECENT_TARGETS_KEY, "[]") or "[]"
-    try:
-        parsed = json.loads(raw)
-    except Exception:
-        parsed = []
+    parsed = db.state.get_json(_MPK_RECENT_TARGETS_KEY, [])
     if not isinstance(parsed, list):
         return []
     keys = [str(x) for x in parsed if str(x)]
@@ -854,11 +861,11 @@ def _load_recent_mpk_targets(db: Database, *, max_items: int = 3) -> list[str]:
     return keys[-max_items:]
 
 
-def _store_recent_mpk_targets(db: Database, keys: list[str], *, max_items: int = 3) -> None:
+def _recent_mpk_targets_state(keys: list[str], *, max_items: int = 3) -> dict[str, str]:
     trimmed = [str(x) for x in keys if str(x)]
     if max_items > 0:
         trimmed = trimmed[-max_items:]
-    db.set_state(_MPK_RECENT_TARGETS_KEY, json.dumps(trimmed, ensure_ascii=True))
+    return {_MPK_RECENT_TARGETS_KEY: json.dumps(trimmed, ensure_ascii=True)}
 
 
 def _mpk_mode_schedule(coverage_percent: float) -> list[str]:
@@ -952,22 +959,13 @@ def _choose_mpk_target_with_modes(
     )
     coverage_percent = round(_pct(qualified_targets, total_targets), 2)
     schedule = _mpk_mode_schedule(coverage_percent)
-    try:
-        cursor = int(db.get_state(_MPK_MODE_CURSOR_KEY, "0") or "0")
-    except ValueError:
-        cursor = 0
+    cursor = db.state.get_int(_MPK_MODE_CURSOR_KEY)
     requested_mode = schedule[cursor % len(schedule)] if schedule else "weak"
-    queued_key = db.get_state("mpk.practice.target_key", "") or ""
-    weak_lock_target_key = db.get_state(_MPK_WEAK_LOCK_TARGET_KEY, "") or ""
-    try:
-        weak_lock_anchor_attempt_id = int(
-            db.get_state(_MPK_WEAK_LOCK_ANCHOR_ATTEMPT_ID_KEY, "0") or "0"
-        )
-    except ValueError:
-        weak_lock_anchor_attempt_id = 0
+    queued_key = db.state.get("mpk.practice.target_key", "") or ""
+    weak_lock_target_key = db.state.get(_MPK_WEAK_LOCK_TARGET_KEY, "") or ""
+    weak_lock_anchor_attempt_id = db.state.get_int(_MPK_WEAK_LOCK_ANCHOR_ATTEMPT_ID_KEY)
     if queued_key and queued_key not in by_key and advance_mode:
-        db.set_state(_MPK_WEAK_LOCK_TARGET_KEY, "")
-        db.set_state(_MPK_WEAK_LOCK_ANCHOR_ATTEMPT_ID_KEY, "0")
+        db.set_states({_MPK_WEAK_LOCK_TARGET_KEY: "", _MPK_WEAK_LOCK_ANCHOR_ATTEMPT_ID_KEY: "0"})
         weak_lock_target_key = ""
         weak_lock_anchor_attempt_id = 0
     if queued_key in by_key:
@@ -981,8 +979,12 @@ def _choose_mpk_target_with_modes(
                 # streak visibility to 0; only advance pass anchors a new lock.
                 anchor_after_id = _max_finished_mpk_attempt_id(db) if advance_mode else 0
                 if advance_mode:
-                    db.set_state(_MPK_WEAK_LOCK_TARGET_KEY, queued_key)
-                    db.set_state(_MPK_WEAK_LOCK_ANCHOR_ATTEMPT_ID_KEY, str(anchor_after_id))
+                    db.set_states(
+                        {
+                            _MPK_WEAK_LOCK_TARGET_KEY: queued_key,
+                            _MPK_WEAK_LOCK_ANCHOR_ATTEMPT_ID_KEY: str(anchor_after_id),
+                        }
+                    )
             weak_streak = _mpk_success_streak_for_target(
                 db, queued_key, anchor_after_id=anchor_after_id
             )
@@ -1001,11 +1003,9 @@ def _choose_mpk_target_with_modes(
                     "min_streak_to_swap": _MPK_WEAK_MIN_STREAK_TO_SWAP,
                 }
             if advance_mode:
-                db.set_state(_MPK_WEAK_LOCK_TARGET_KEY, "")
-                db.set_state(_MPK_WEAK_LOCK_ANCHOR_ATTEMPT_ID_KEY, "0")
+                db.set_states({_MPK_WEAK_LOCK_TARGET_KEY: "", _MPK_WEAK_LOCK_ANCHOR_ATTEMPT_ID_KEY: "0"})
         elif advance_mode and weak_lock_target_key == queued_key:
-            db.set_state(_MPK_WEAK_LOCK_TARGET_KEY, "")
-            db.set_state(_MPK_WEAK_LOCK_ANCHOR_ATTEMPT_ID_KEY, "0")
+            db.set_states({_MPK_WEAK_LOCK_TARGET_KEY: "", _MPK_WEAK_LOCK_ANCHOR_ATTEMPT_ID_KEY: "0"})
     if prefer_queued and queued_key in by_key:
         selected_mode = _mode_for_candidate(by_key[queued_key])
         return {
@@ -1077,24 +1077,24 @@ def _choose_mpk_target_with_modes(
         return None
 
     if advance_mode:
-        db.set_state(_MPK_MODE_CURSOR_KEY, str(cursor + 1))
         history = _load_recent_mpk_targets(db, max_items=3)
         history.append(str(selected["target_key"]))
-        _store_recent_mpk_targets(db, history, max_items=3)
-        db.set_state(_MPK_LAST_MODE_KEY, selected_mode)
+        updates = {
+            _MPK_MODE_CURSOR_KEY: str(cursor + 1),
+            **_recent_mpk_targets_state(history, max_items=3),
+            _MPK_LAST_MODE_KEY: selected_mode,
+        }
         selected_key = str(selected["target_key"])
         # Weak lock is a weak-mode mechanic only. Do not (re)anchor lock state
         # from maintain/fill selections, even if candidate stats are weak.
         if selected_mode == "weak":
             if weak_lock_target_key != selected_key:
-                db.set_state(_MPK_WEAK_LOCK_TARGET_KEY, selected_key)
-                db.set_state(
-                    _MPK_WEAK_LOCK_ANCHOR_ATTEMPT_ID_KEY,
-                    str(_max_finished_mpk_attempt_id(db)),
-                )
+                updates[_MPK_WEAK_LOCK_TARGET_KEY] = selected_key
+                updates[_MPK_WEAK_LOCK_ANCHOR_ATTEMPT_ID_KEY] = str(_max_finished_mpk_attempt_id(db))
         elif weak_lock_target_key:
-            db.set_state(_MPK_WEAK_LOCK_TARGET_KEY, "")
-            db.set_state(_MPK_WEAK_LOCK_ANCHOR_ATTEMPT_ID_KEY, "0")
+            updates[_MPK_WEAK_LOCK_TARGET_KEY] = ""
+            updates[_MPK_WEAK_LOCK_ANCHOR_ATTEMPT_ID_KEY] = "0"
+        db.set_states(updates)
 
     reason = "mode"
     if selected_mode != mode:
@@ -1173,31 +1173,25 @@ def _scope_where(
     if tower_name is not None:
         clauses.append("COALESCE(tower_name, 'Unknown') = ?")
         params.append(tower_name)
+    # side / rotation / is_straight are generated columns (see Database._migrate_columns);
+    # attempt_source and attempt_seed_mode are NOT NULL; the trackers write normalized
+    # values and Database._normalize_attempts fixed legacy rows once.
     if front_back is not None:
-        if front_back == "Front":
-            clauses.append("COALESCE(zero_type, '') LIKE 'Front %'")
-        elif front_back == "Back":
-            clauses.append("COALESCE(zero_type, '') LIKE 'Back %'")
-        else:
-            clauses.append(
-                "COALESCE(zero_type, '') NOT LIKE 'Front %' AND COALESCE(zero_type, '') NOT LIKE 'Back %'"
-            )
+        clauses.append("side = ?")
+        params.append(front_back if front_back in {"Front", "Back"} else "Unknown")
     if not INCLUDE_STRAIGHT_CTX.get():
-        clauses.append("COALESCE(zero_type, '') NOT LIKE '%Straight%'")
+        clauses.append("is_straight = 0")
     rotation_filter = ROTATION_FILTER_CTX.get()
-    if rotation_filter == "cw":
-        clauses.append(
-            "UPPER(COALESCE(zero_type, '')) LIKE '%CW' AND UPPER(COALESCE(zero_type, '')) NOT LIKE '%CCW'"
-        )
-    elif rotation_filter == "ccw":
-        clauses.append("UPPER(COALESCE(zero_type, '')) LIKE '%CCW'")
+    if rotation_filter in {"cw", "ccw"}:
+        clauses.append("rotation = ?")
+        params.append(rotation_filter)
     attempt_source = ATTEMPT_SOURCE_CTX.get()
     if attempt_source in {"practice", "mpk"}:
-        clauses.append("COALESCE(attempt_source, 'practice') = ?")
+        clauses.append("attempt_source = ?")
         params.append(attempt_source)
     attempt_seed_mode = ATTEMPT_SEED_MODE_CTX.get()
     if attempt_seed_mode in {"full_random", "set_seed"}:
-        clauses.append("COALESCE(attempt_seed_mode, 'set_seed') = ?")
+        clauses.append("attempt_seed_mode = ?")
         params.append(attempt_seed_mode)
 
     window_min_id = WINDOW_MIN_ID_CTX.get()
@@ -1219,87 +1213,53 @@ def _type_where(zero_type: str | None, include_where: bool = True) -> tuple[str,
     return _scope_where(zero_type=zero_type, include_where=include_where)
 
 
+def _target_stats_scope(
+    tower_name: str | None = None,
+    front_back: str | None = None,
+    zero_type: str | None = None,
+    include_where: bool = True,
+) -> tuple[str, list[Any]] | None:
+    """_scope_where for the target_stats aggregate, or None when the scope needs
+    per-attempt columns (zero_type, attempt windows) and attempts must be scanned."""
+    if zero_type is not None or WINDOW_MIN_ID_CTX.get() is not None or WINDOW_START_UTC_CTX.get() is not None:
+        return None
+    return _scope_where(tower_name=tower_name, front_back=front_back, include_where=include_where)
+
+
 def _compute_current_session_start_utc(db: Database) -> str | None:
-    where, params = _scope_where(include_where=False)
+    attempt_source = ATTEMPT_SOURCE_CTX.get()
+    if attempt_source not in {"practice", "mpk"}:
+        return _compute_current_session_start_utc_unscoped(db)
     row = db.query_one(
-        f"""
-        WITH finished AS (
-            SELECT id, started_at_utc
-            FROM attempts
-            WHERE status IN ('success', 'fail')
-              AND started_at_utc IS NOT NULL{where}
-            ORDER BY started_at_utc ASC, id ASC
-        ),
-        marks AS (
-            SELECT
-                id,
-                started_at_utc,
-                CASE
-                    WHEN LAG(started_at_utc) OVER (ORDER BY started_at_utc ASC, id ASC) IS NULL THEN 1
-                    WHEN (
-                        julianday(started_at_utc)
-                        - julianday(LAG(started_at_utc) OVER (ORDER BY started_at_utc ASC, id ASC))
-                    ) * 86400.0 > 3600.0 THEN 1
-                    ELSE 0
-                END AS is_new_session
-            FROM finished
-        ),
-        numbered AS (
-            SELECT
-                started_at_utc,
-                SUM(is_new_session) OVER (ORDER BY started_at_utc ASC, id ASC) AS session_index
-            FROM marks
-        )
-        SELECT MIN(started_at_utc) AS session_start_utc
-        FROM numbered
-        WHERE session_index = (SELECT MAX(session_index) FROM numbered)
+        """
+        SELECT started_at_utc
+        FROM sessions
+        WHERE attempt_source = ?
+        ORDER BY started_at_utc DESC, id DESC
+        LIMIT 1
         """,
-        params,
+        (attempt_source,),
     )
     if row is None:
         return None
-    value = row["session_start_utc"]
+    value = row["started_at_utc"]
     return str(value) if value is not None else None
 
 
 def _compute_current_session_start_utc_unscoped(db: Database) -> str | None:
     row = db.query_one(
         """
-        WITH finished AS (
-            SELECT id, started_at_utc
-            FROM attempts
-            WHERE status IN ('success', 'fail')
-              AND started_at_utc IS NOT NULL
-            ORDER BY started_at_utc ASC, id ASC
-        ),
-        marks AS (
-            SELECT
-                id,
-                started_at_utc,
-                CASE
-                    WHEN LAG(started_at_utc) OVER (ORDER BY started_at_utc ASC, id ASC) IS NULL THEN 1
-                    WHEN (
-                        julianday(started_at_utc)
-                        - julianday(LAG(started_at_utc) OVER (ORDER BY started_at_utc ASC, id ASC))
-                    ) * 86400.0 > 3600.0 THEN 1
-                    ELSE 0
-                END AS is_new_session
-            FROM finished
-        ),
-        numbered AS (
-            SELECT
-                started_at_utc,
-                SUM(is_new_session) OVER (ORDER BY started_at_utc ASC, id ASC) AS session_index
-            FROM marks
-        )
-        SELECT MIN(started_at_utc) AS session_start_utc
-        FROM numbered
-        WHERE session_index = (SELECT MAX(session_index) FROM numbered)
-        """
+        SELECT started_at_utc
+        FROM sessions
+        WHERE attempt_source = ?
+        ORDER BY started_at_utc DESC, id DESC
+        LIMIT 1
+        """,
+        (COMBINED_SESSION_SOURCE,),
     )
     if row is None:
         return None
-    value = row["session_start_utc"]
+    value = row["started_at_utc"]
     return str(value) if value is not None else None
 
 
@@ -1328,6 +1288,7 @@ def _compute_window_bounds(db: Database) -> dict[str, dict[str, Any]]:
     return bounds
 
 
+@_pinned_reader
 def compute_mpk_practice_next_widget(db: Database) -> dict[str, Any]:
     leniency_target = _normalize_leniency_target(MPK_LENIENCY_TARGET_CTX.get())
     full_random_override_enabled = is_mpk_full_random_override_enabled(db)
@@ -1391,7 +1352,7 @@ def compute_mpk_practice_next_widget(db: Database) -> dict[str, Any]:
         }
     recommended_raw = pick["candidate"]
     selection_reason = str(pick.get("selection_reason", "mode"))
-    selected_mode = str(pick.get("mode", db.get_state(_MPK_LAST_MODE_KEY, "") or "weak"))
+    selected_mode = str(pick.get("mode", db.state.get(_MPK_LAST_MODE_KEY, "") or "weak"))
     requested_mode = str(pick.get("requested_mode", selected_mode))
     qualified_targets = int(pick.get("qualified_targets", 0))
     total_targets = int(pick.get("total_targets", len(candidates)))
@@ -1400,13 +1361,8 @@ def compute_mpk_practice_next_widget(db: Database) -> dict[str, Any]:
     lock_applied = bool(pick.get("lock_applied", False))
     current_streak_on_recommended = int(pick.get("current_streak_on_recommended", 0))
     min_streak_to_swap = int(pick.get("min_streak_to_swap", _MPK_WEAK_MIN_STREAK_TO_SWAP))
-    weak_lock_target_key = db.get_state(_MPK_WEAK_LOCK_TARGET_KEY, "") or ""
-    try:
-        weak_lock_anchor_attempt_id = int(
-            db.get_state(_MPK_WEAK_LOCK_ANCHOR_ATTEMPT_ID_KEY, "0") or "0"
-        )
-    except ValueError:
-        weak_lock_anchor_attempt_id = 0
+    weak_lock_target_key = db.state.get(_MPK_WEAK_LOCK_TARGET_KEY, "") or ""
+    weak_lock_anchor_attempt_id = db.state.get_int(_MPK_WEAK_LOCK_ANCHOR_ATTEMPT_ID_KEY)
 
     def _weak_status_for_target(target_key: str) -> dict[str, Any] | None:
         if not target_key:
@@ -1630,6 +1586,7 @@ def compute_mpk_practice_next_widget(db: Database) -> dict[str, Any]:
     }
 
 
+@_pinned_reader
 def compute_practice_next_widget(db: Database) -> dict[str, Any]:
     return compute_mpk_practice_next_widget(db)
 
@@ -1890,6 +1847,7 @@ def compute_damage_per_bed(
     ]
 
 
+@_pinned_reader
 def build_dashboard_payload_selected(
     db: Database,
     *,
@@ -2083,11 +2041,7 @@ def compute_tower_performance(
         f"""
         SELECT
             COALESCE(tower_name, 'Unknown') AS tower_name,
-            CASE
-                WHEN COALESCE(zero_type, '') LIKE 'Front %' THEN 'Front'
-                WHEN COALESCE(zero_type, '') LIKE 'Back %' THEN 'Back'
-                ELSE 'Unknown'
-            END AS front_back,
+            side AS front_back,
             COUNT(*) AS attempts,
             SUM(CASE WHEN status = 'success' THEN 1 ELSE 0 END) AS successes,
             SUM(CASE WHEN status = 'fail' THEN 1 ELSE 0 END) AS failures,
@@ -2169,11 +2123,7 @@ def compute_tower_type_breakdown(
         f"""
         SELECT
             COALESCE(tower_name, 'Unknown') AS tower_name,
-            CASE
-                WHEN COALESCE(zero_type, '') LIKE 'Front %' THEN 'Front'
-                WHEN COALESCE(zero_type, '') LIKE 'Back %' THEN 'Back'
-                ELSE 'Unknown'
-            END AS front_back,
+            side AS front_back,
             COALESCE(zero_type, 'Unknown') AS zero_type,
             COUNT(*) AS attempts,
             SUM(CASE WHEN status = 'success' THEN 1 ELSE 0 END) AS successes,
@@ -2236,6 +2186,7 @@ def compute_tower_type_breakdown(
     return result
 
 
+@_pinned_reader
 def compute_recent_attempts(
     db: Database,
     limit: int = 40,
@@ -2377,44 +2328,14 @@ def compute_session_progression(
     where, params = _scope_where(
         zero_type=zero_type, tower_name=tower_name, front_back=front_back, include_where=False
     )
+    # Finished attempts get a session per attempt_source and one across all
+    # sources (see Database._segment_finished_sessions); the index counts only
+    # the sessions that have attempts in this scope.
+    session_column = "session_id" if ATTEMPT_SOURCE_CTX.get() in {"practice", "mpk"} else "combined_session_id"
     rows = db.query_all(
         f"""
-        WITH scoped AS (
-            SELECT
-                id,
-                started_at_utc,
-                status,
-                success_time_seconds,
-                explosives_used,
-                explosives_left
-            FROM attempts
-            WHERE status IN ('success', 'fail'){where}
-            ORDER BY started_at_utc ASC, id ASC
-        ),
-        with_prev AS (
-            SELECT
-                *,
-                LAG(started_at_utc) OVER (ORDER BY started_at_utc ASC, id ASC) AS prev_started_at_utc
-            FROM scoped
-        ),
-        with_sessions AS (
-            SELECT
-                *,
-                CASE
-                    WHEN prev_started_at_utc IS NULL THEN 1
-                    WHEN (julianday(started_at_utc) - julianday(prev_started_at_utc)) * 86400.0 > 3600.0 THEN 1
-                    ELSE 0
-                END AS is_new_session
-            FROM with_prev
-        ),
-        numbered AS (
-            SELECT
-                *,
-                SUM(is_new_session) OVER (ORDER BY started_at_utc ASC, id ASC) AS session_index
-            FROM with_sessions
-        )
         SELECT
-            session_index,
+            {session_column} AS session_id,
             MIN(started_at_utc) AS session_start_utc,
             MAX(started_at_utc) AS session_last_attempt_utc,
             COUNT(*) AS attempts,
@@ -2428,20 +2349,21 @@ def compute_session_progression(
                     THEN CAST(explosives_used + COALESCE(explosives_left, 0) AS REAL)
                 END
             ) AS avg_total_explosives_success
-        FROM numbered
-        GROUP BY session_index
-        ORDER BY session_index ASC
+        FROM attempts
+        WHERE status IN ('success', 'fail'){where}
+        GROUP BY {session_column}
+        ORDER BY session_start_utc ASC, {session_column} ASC
         """,
         params,
     )
     result: list[dict[str, Any]] = []
-    for row in rows:
+    for session_index, row in enumerate(rows, start=1):
         attempts = _safe_int(row["attempts"])
         successes = _safe_int(row["successes"])
         result.append(
             {
-                "session_index": _safe_int(row["session_index"]),
-                "session_label": f"S{_safe_int(row['session_index'])}",
+                "session_index": session_index,
+                "session_label": f"S{session_index}",
                 "session_start_utc": row["session_start_utc"],
                 "session_last_attempt_utc": row["session_last_attempt_utc"],
                 "attempts": attempts,
@@ -2938,26 +2860,36 @@ def compute_o_level_heatmap(
         else:
             default_min = _MPK_HEATMAP_MIN_LEVEL
             default_max = _MPK_HEATMAP_MAX_LEVEL
-    where, params = _scope_where(
-        zero_type=zero_type, tower_name=tower_name, front_back=front_back, include_where=False
-    )
+    stats_scope = _target_stats_scope(
+        tower_name=tower_name, front_back=front_back, zero_type=zero_type, include_where=False
+    )
+    if stats_scope is not None:
+        where, params = stats_scope
+        source = "target_stats"
+        finished = "successes + failures > 0"
+        attempts_sql = "SUM(successes + failures)"
+        successes_sql = "SUM(successes)"
+    else:
+        where, params = _scope_where(
+            zero_type=zero_type, tower_name=tower_name, front_back=front_back, include_where=False
+        )
+        source = "attempts"
+        finished = "status IN ('success', 'fail')"
+        attempts_sql = "COUNT(*)"
+        successes_sql = "SUM(CASE WHEN status = 'success' THEN 1 ELSE 0 END)"
     rows = db.query_all(
         f"""
         SELECT
             COALESCE(tower_name, 'Unknown') AS tower_name,
-            CASE
-                WHEN COALESCE(zero_type, '') LIKE 'Front %' THEN 'Front'
-                WHEN COALESCE(zero_type, '') LIKE 'Back %' THEN 'Back'
-                ELSE 'Unknown'
-            END AS side,
+            side,
             o_level,
-            COUNT(*) AS attempts,
-            SUM(CASE WHEN status = 'success' THEN 1 ELSE 0 END) AS successes
-        FROM attempts
-        WHERE status IN ('success', 'fail')
+            {attempts_sql} AS attempts,
+            {successes_sql} AS successes
+        FROM {source}
+        WHERE {finished}
           AND o_level IS NOT NULL
           AND COALESCE(tower_name, 'Unknown') <> 'Unknown'
-          AND COALESCE(zero_type, '') NOT LIKE '%Straight%'{where}
+          AND is_straight = 0{where}
         GROUP BY COALESCE(tower_name, 'Unknown'), side, o_level
         ORDER BY side ASC, tower_name ASC, o_level ASC
         """,
@@ -2967,21 +2899,17 @@ def compute_o_level_heatmap(
         f"""
         SELECT
             COALESCE(tower_name, 'Unknown') AS tower_name,
-            CASE
-                WHEN COALESCE(zero_type, '') LIKE 'Front %' THEN 'Front'
-                WHEN COALESCE(zero_type, '') LIKE 'Back %' THEN 'Back'
-                ELSE 'Unknown'
-            END AS side,
+            side,
             o_level,
             standing_height,
-            COUNT(*) AS attempts,
-            SUM(CASE WHEN status = 'success' THEN 1 ELSE 0 END) AS successes
-        FROM attempts
-        WHERE status IN ('success', 'fail')
+            {attempts_sql} AS attempts,
+            {successes_sql} AS successes
+        FROM {source}
+        WHERE {finished}
           AND o_level IS NOT NULL
           AND standing_height IS NOT NULL
           AND COALESCE(tower_name, 'Unknown') <> 'Unknown'
-          AND COALESCE(zero_type, '') NOT LIKE '%Straight%'{where}
+          AND is_straight = 0{where}
         GROUP BY COALESCE(tower_name, 'Unknown'), side, o_level, standing_height
         ORDER BY side ASC, tower_name ASC, o_level ASC, standing_height ASC
         """,
@@ -3174,27 +3102,44 @@ def compute_standing_height_consistency(
 
 
 def compute_tower_front_back_overview(db: Database) -> list[dict[str, Any]]:
-    where, params = _scope_where(include_where=True)
-    rows = db.query_all(
-        f"""
-        SELECT
-            COALESCE(tower_name, 'Unknown') AS tower_name,
-            CASE
-                WHEN COALESCE(zero_type, '') LIKE 'Front %' THEN 'Front'
-                WHEN COALESCE(zero_type, '') LIKE 'Back %' THEN 'Back'
-                ELSE 'Unknown'
-            END AS front_back,
-            COUNT(*) AS attempts,
-            SUM(CASE WHEN status = 'success' THEN 1 ELSE 0 END) AS successes,
-            SUM(CASE WHEN status = 'fail' THEN 1 ELSE 0 END) AS failures,
-            AVG(CASE WHEN status = 'success' THEN success_time_seconds END) AS avg_success_time
-        FROM attempts
-        {where}
-        GROUP BY COALESCE(tower_name, 'Unknown'), front_back
-        ORDER BY attempts DESC, tower_name ASC, front_back ASC
-        """,
-        params,
-    )
+    stats_scope = _target_stats_scope(include_where=True)
+    if stats_scope is not None:
+        where, params = stats_scope
+        rows = db.query_all(
+            f"""
+            SELECT
+                COALESCE(tower_name, 'Unknown') AS tower_name,
+                side AS front_back,
+                SUM(attempts) AS attempts,
+                SUM(successes) AS successes,
+                SUM(failures) AS failures,
+                SUM(success_time_sum) / NULLIF(SUM(success_time_count), 0) AS avg_success_time
+            FROM target_stats
+            {where}
+            GROUP BY COALESCE(tower_name, 'Unknown'), front_back
+            HAVING SUM(attempts) > 0
+            ORDER BY attempts DESC, tower_name ASC, front_back ASC
+            """,
+            params,
+        )
+    else:
+        where, params = _scope_where(include_where=True)
+        rows = db.query_all(
+            f"""
+            SELECT
+                COALESCE(tower_name, 'Unknown') AS tower_name,
+                side AS front_back,
+                COUNT(*) AS attempts,
+                SUM(CASE WHEN status = 'success' THEN 1 ELSE 0 END) AS successes,
+                SUM(CASE WHEN status = 'fail' THEN 1 ELSE 0 END) AS failures,
+                AVG(CASE WHEN status = 'success' THEN success_time_seconds END) AS avg_success_time
+            FROM attempts
+            {where}
+            GROUP BY COALESCE(tower_name, 'Unknown'), front_back
+            ORDER BY attempts DESC, tower_name ASC, front_back ASC
+            """,
+            params,
+        )
     result: list[dict[str, Any]] = []
     for row in rows:
         successes = _safe_int(row["successes"])
@@ -3232,11 +3177,7 @@ def compute_tower_radar(db: Database) -> dict[str, Any]:
         f"""
         SELECT
             COALESCE(tower_name, 'Unknown') AS tower_name,
-            CASE
-                WHEN COALESCE(zero_type, '') LIKE 'Front %' THEN 'Front'
-                WHEN COALESCE(zero_type, '') LIKE 'Back %' THEN 'Back'
-                ELSE 'Unknown'
-            END AS front_back,
+            side AS front_back,
             status,
             explosives_used,
             explosives_left
@@ -3318,6 +3259,7 @@ def compute_tower_radar(db: Database) -> dict[str, Any]:
     }
 
 
+@_pinned_reader
 def build_dashboard_payload(db: Database) -> dict[str, Any]:
     def scoped(tower_name: str | None = None, front_back: str | None = None) -> dict[str, Any]:
         return {
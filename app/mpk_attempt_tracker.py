@@ -1,17 +1,20 @@
 from __future__ import annotations
 
+from collections import OrderedDict
 from datetime import UTC, datetime, timedelta
+import json
 from pathlib import Path
 import re
+import sqlite3
 import time
 from typing import Any
 
 from config import MAJOR_DAMAGE_THRESHOLD
 from scripts.parse_command_storage import (
     bedrock_by_node,
-    dominant_node_from_storage,
-    rotation_from_storage,
-    run_metrics_from_storage,
+    load_storage_snapshot,
+    storage_run_finalized,
+    world_seed_from_level_dat,
 )
 from .metrics import (
     clear_runtime_atum_seed,
@@ -21,7 +24,10 @@ from .metrics import (
 )
 
 from .database import Database
-from .log_parser import ParsedLogLine
+from .ingest_jobs import IngestJob, IngestJobQueue
+from .log_parser import LogEvent, LogInterest, ParsedLogLine
+from .saves_index import SavesIndex
+from .tower_heights import get_cached_tower_heights, store_tower_heights
 
 
 def utc_now() -> str:
@@ -42,6 +48,18 @@ class MpkAttemptTracker:
         103: "Tall Boy",
     }
     MIN_END_TICKS_FOR_ATTEMPT = 100
+    # World transitions, active-world tracking, seed-rotation triggers and exit markers.
+    LOG_INTEREST = LogInterest(
+        body_prefixes=(
+            'Creating "',
+            "Attempting event world load at ",
+            "StateOutput State: inworld",
+            "StateOutput State: waiting",
+            "Loaded StandardSettings on World Join",
+            "Stopping!",
+        ),
+        body_contains=("Saving chunks for level 'ServerLevel[",),
+    )
 
     def __init__(
         self,
@@ -51,9 +69,25 @@ class MpkAttemptTracker:
         window_ticks: int = 600,
         bedrock_radius: int = 4,
         storage_wait_seconds: float = 35.0,
+        ingest_queue: IngestJobQueue | None = None,
+        ingest_wait_seconds: float = 60.0,
+        saves_archive_dir: Path | None = None,
+        saves_keep: int = 50,
     ) -> None:
         self.db = db
+        # When set, world parsing runs on the queue's worker instead of the
+        # log-tailing thread (scripts and tests leave it unset and ingest inline).
+        # Target selection for the next world still waits (up to
+        # ``ingest_wait_seconds``) for the previous world's attempt to land.
+        self.ingest_queue = ingest_queue
+        self.ingest_wait_seconds = ingest_wait_seconds
+        self._last_ingest_key = ""
         self.saves_dir = saves_dir
+        self.saves_index = SavesIndex(saves_dir)
+        # Ingested worlds beyond the newest ``saves_keep`` are moved here
+        # after each insert (queued runs only); None disables pruning.
+        self.saves_archive_dir = saves_archive_dir
+        self.saves_keep = saves_keep
         self.window_ticks = window_ticks
         self.bedrock_radius = bedrock_radius
         self.storage_wait_seconds = storage_wait_seconds
@@ -68,8 +102,22 @@ class MpkAttemptTracker:
         self.state_inworld_re = re.compile(r"^StateOutput State: inworld(?:,|$)")
         self.pending_world_name_for_seed_rotation: str | None = None
         self.pending_world_seed_for_seed_rotation: str | None = None
+        # World name -> seed from 'Creating "<world>" with seed "<seed>"' lines.
+        self.world_seeds: OrderedDict[str, str] = OrderedDict()
         self.last_rotated_world_name = self.db.get_state("mpk.seed_rotate.last_world", "") or ""
         self.active_world_name = self.db.get_state(self.state_active_world_key, "") or ""
+        self._current_event: LogEvent | None = None
+
+    def handle_event(self, event: LogEvent) -> None:
+        self._current_event = event
+        try:
+            parsed = event.parsed
+            if parsed.is_chat and parsed.chat_message is not None:
+                self.handle_chat_event(event.event_id, parsed.chat_message, parsed.clock_time)
+            else:
+                self.handle_log_event(event.event_id, parsed)
+        finally:
+            self._current_event = None
 
     def handle_chat_event(self, event_id: int, chat_message: str, clock_time: str | None) -> None:
         # MPK ingestion is driven by world-exit log lines, not chat.
@@ -100,6 +148,11 @@ class MpkAttemptTracker:
             self.pending_world_name_for_seed_rotation = str(create_match.group("world"))
             seed_group = create_match.group("seed")
             self.pending_world_seed_for_seed_rotation = str(seed_group) if seed_group is not None else None
+            self.saves_index.note_world(str(create_match.group("world")))
+            if seed_group is not None:
+                self.world_seeds[str(create_match.group("world"))] = str(seed_group)
+                while len(self.world_seeds) > 64:
+                    self.world_seeds.popitem(last=False)
             return
         load_match = self.world_load_re.match(body)
         if load_match is not None:
@@ -118,53 +171,51 @@ class MpkAttemptTracker:
             return
         # Snapshot what the player is currently practicing (the seed that just loaded),
         # then queue the next target/seed for the next reset.
-        current_target_key = self.db.get_state("mpk.practice.target_key", "") or ""
-        current_seed_value = current_world_seed or (self.db.get_state("mpk.practice.seed_value", "") or "")
+        # State reads are served from the in-memory store and each group of
+        # updates below is one write-behind batch, so nothing here waits on SQLite.
+        state = self.db.state
         self.active_world_name = world_name
-        self.db.set_state(self.state_active_world_key, world_name)
-        self.db.set_state("mpk.practice.current_world_name", world_name)
-        self.db.set_state("mpk.practice.current_target_key", current_target_key)
-        self.db.set_state("mpk.practice.current_seed_value", current_seed_value)
-        self.db.set_state(
-            "mpk.practice.current_selection_reason",
-            self.db.get_state("mpk.practice.next_selection_reason", "") or "",
-        )
-        self.db.set_state(
-            "mpk.practice.current_selection_mode",
-            self.db.get_state("mpk.practice.next_selection_mode", "") or "",
-        )
-        self.db.set_state(
-            "mpk.practice.current_requested_mode",
-            self.db.get_state("mpk.practice.next_requested_mode", "") or "",
-        )
-        self.db.set_state(
-            "mpk.practice.current_seed_mode",
-            self.db.get_state("mpk.practice.next_seed_mode", "") or "set_seed",
+        self.db.set_states(
+            {
+                self.state_active_world_key: world_name,
+                "mpk.practice.current_world_name": world_name,
+                "mpk.practice.current_target_key": state.get("mpk.practice.target_key", "") or "",
+                "mpk.practice.current_seed_value": current_world_seed
+                or (state.get("mpk.practice.seed_value", "") or ""),
+                "mpk.practice.current_selection_reason": state.get("mpk.practice.next_selection_reason", "") or "",
+                "mpk.practice.current_selection_mode": state.get("mpk.practice.next_selection_mode", "") or "",
+                "mpk.practice.current_requested_mode": state.get("mpk.practice.next_requested_mode", "") or "",
+                "mpk.practice.current_seed_mode": state.get("mpk.practice.next_seed_mode", "") or "set_seed",
+            }
         )
         if is_mpk_full_random_override_enabled(self.db):
-            self.db.set_state("mpk.practice.target_key", "")
-            self.db.set_state("mpk.practice.seed_value", "")
-            self.db.set_state("mpk.practice.current_target_key", "")
-            self.db.set_state("mpk.practice.current_seed_value", "")
-            self.db.set_state("mpk.practice.current_selection_reason", "full_random_override")
-            self.db.set_state("mpk.practice.current_selection_mode", "full_random_override")
-            self.db.set_state("mpk.practice.current_requested_mode", "full_random_override")
-            self.db.set_state("mpk.practice.current_seed_mode", "full_random")
-            self.db.set_state("mpk.practice.next_selection_reason", "full_random_override")
-            self.db.set_state("mpk.practice.next_selection_mode", "full_random_override")
-            self.db.set_state("mpk.practice.next_requested_mode", "full_random_override")
-            self.db.set_state("mpk.practice.next_seed_mode", "full_random")
             clear_state = clear_runtime_atum_seed(self.db)
             clear_error = clear_state.get("seed_clear_error")
-            self.db.set_state("mpk.seed_rotate.last_error", str(clear_error or ""))
             self.last_rotated_world_name = world_name
-            self.db.set_state("mpk.seed_rotate.last_world", world_name)
+            self.db.set_states(
+                {
+                    "mpk.practice.target_key": "",
+                    "mpk.practice.seed_value": "",
+                    "mpk.practice.current_target_key": "",
+                    "mpk.practice.current_seed_value": "",
+                    "mpk.practice.current_selection_reason": "full_random_override",
+                    "mpk.practice.current_selection_mode": "full_random_override",
+                    "mpk.practice.current_requested_mode": "full_random_override",
+                    "mpk.practice.current_seed_mode": "full_random",
+                    "mpk.practice.next_selection_reason": "full_random_override",
+                    "mpk.practice.next_selection_mode": "full_random_override",
+                    "mpk.practice.next_requested_mode": "full_random_override",
+                    "mpk.practice.next_seed_mode": "full_random",
+                    "mpk.seed_rotate.last_error": str(clear_error or ""),
+                    "mpk.seed_rotate.last_world": world_name,
+                }
+            )
             return
 
-        try:
-            leniency_target = float(self.db.get_state("mpk.practice.leniency_target", "0") or "0")
-        except ValueError:
-            leniency_target = 0.0
+        # Selection reads attempts (weak-lock streaks, coverage), so the world
+        # just left must be ingested first, as when ingest ran inline.
+        self._wait_for_queued_ingest()
+        leniency_target = state.get_float("mpk.practice.leniency_target")
         pick_result = select_next_mpk_target(self.db, leniency_target=leniency_target)
         pick = pick_result.get("pick")
         if pick is None:
@@ -177,23 +228,30 @@ class MpkAttemptTracker:
         if seed_state.get("seed_apply_error"):
             self.db.set_state("mpk.seed_rotate.last_error", str(seed_state["seed_apply_error"]))
             return
-        self.db.set_state("mpk.seed_rotate.last_error", "")
-        self.db.set_state("mpk.practice.next_selection_reason", str(pick.get("selection_reason", "")))
-        self.db.set_state("mpk.practice.next_selection_mode", str(pick.get("mode", "")))
-        self.db.set_state("mpk.practice.next_requested_mode", str(pick.get("requested_mode", "")))
-        self.db.set_state("mpk.practice.next_seed_mode", "set_seed")
-        self.db.set_state("mpk.practice.next_mode_coverage_percent", str(pick.get("coverage_percent", 0.0)))
-        self.db.set_state("mpk.practice.next_mode_qualified_targets", str(pick.get("qualified_targets", 0)))
-        self.db.set_state("mpk.practice.next_mode_total_targets", str(pick.get("total_targets", 0)))
-        self.db.set_state(
-            "mpk.practice.next_mode_min_samples",
-            str(pick.get("min_samples_per_target", 0)),
-        )
+        updates = {
+            "mpk.seed_rotate.last_error": "",
+            "mpk.practice.next_selection_reason": str(pick.get("selection_reason", "")),
+            "mpk.practice.next_selection_mode": str(pick.get("mode", "")),
+            "mpk.practice.next_requested_mode": str(pick.get("requested_mode", "")),
+            "mpk.practice.next_seed_mode": "set_seed",
+            "mpk.practice.next_mode_coverage_percent": str(pick.get("coverage_percent", 0.0)),
+            "mpk.practice.next_mode_qualified_targets": str(pick.get("qualified_targets", 0)),
+            "mpk.practice.next_mode_total_targets": str(pick.get("total_targets", 0)),
+            "mpk.practice.next_mode_min_samples": str(pick.get("min_samples_per_target", 0)),
+            "mpk.seed_rotate.last_world": world_name,
+        }
         self.last_rotated_world_name = world_name
-        self.db.set_state("mpk.seed_rotate.last_world", world_name)
         selected_seed = seed_state.get("selected_seed")
         if selected_seed is not None:
-            self.db.set_state("mpk.seed_rotate.last_seed", str(selected_seed))
+            updates["mpk.seed_rotate.last_seed"] = str(selected_seed)
+        self.db.set_states(updates)
+
+    def _wait_for_queued_ingest(self) -> None:
+        key = self._last_ingest_key
+        if self.ingest_queue is None or not key:
+            return
+        if not self.ingest_queue.wait_for(key, timeout=self.ingest_wait_seconds):
+            self._set_ingest_diag(reason="selection_ingest_wait_timeout", world_name=key)
 
     def _update_active_world_from_log(self, parsed: ParsedLogLine) -> None:
         body = (parsed.body or "").strip()
@@ -207,12 +265,19 @@ class MpkAttemptTracker:
             return
         if world_name != self.active_world_name:
             self.active_world_name = world_name
+            self.saves_index.note_world(world_name)
             self.db.set_state(self.state_active_world_key, world_name)
 
-    def _set_ingest_diag(self, *, reason: str, world_name: str = "", detail: str = "") -> None:
-        self.db.set_state("mpk.ingest.last_reason", reason)
-        self.db.set_state("mpk.ingest.last_world", world_name)
-        self.db.set_state("mpk.ingest.last_detail", detail)
+    def _ingest_diag_state(self, *, reason: str, world_name: str = "", detail: str = "") -> dict[str, str]:
+        return {
+            "mpk.ingest.last_reason": reason,
+            "mpk.ingest.last_world": world_name,
+            "mpk.ingest.last_detail": detail,
+        }
+
+    def _set_ingest_diag(self, *, reason: str, world_name: str = "", detail: str = "") -> str:
+        self.db.set_states(self._ingest_diag_state(reason=reason, world_name=world_name, detail=detail))
+        return reason
 
     def _is_world_exit_line(self, body: str) -> bool:
         # Language-agnostic / forced markers only.
@@ -243,12 +308,53 @@ class MpkAttemptTracker:
         return False
 
     def _find_latest_world(self) -> Path | None:
-        if not self.saves_dir.exists():
-            return None
-        worlds = [p for p in self.saves_dir.iterdir() if p.is_dir()]
-        if not worlds:
-            return None
-        return max(worlds, key=lambda p: p.stat().st_mtime)
+        return self.saves_index.latest()
+
+    def prune_saves(
+        self,
+        *,
+        archive_dir: Path | None = None,
+        keep: int | None = None,
+        include_unrecorded: bool = False,
+        dry_run: bool = False,
+    ) -> dict[str, Any]:
+        """Archive old worlds out of ``saves/``.
+
+        Only worlds with an inserted MPK attempt are moved unless
+        ``include_unrecorded`` is set (worlds that never reached the End have
+        no attempt row). The active and last-ingested worlds are never moved.
+        """
+        target = archive_dir or self.saves_archive_dir
+        if target is None:
+            return {"ok": False, "error": "no_archive_dir"}
+        ingested = {
+            str(row["world_name"])
+            for row in self.db.query_all(
+                "SELECT DISTINCT world_name FROM attempts WHERE attempt_source = 'mpk' AND world_name IS NOT NULL"
+            )
+        }
+        report = self.saves_index.prune(
+            keep=self.saves_keep if keep is None else keep,
+            archive_dir=target,
+            is_prunable=(lambda name: True) if include_unrecorded else ingested.__contains__,
+            protect=(
+                self.active_world_name,
+                self.db.get_state(self.state_last_world_key, "") or "",
+                self.pending_world_name_for_seed_rotation or "",
+            ),
+            dry_run=dry_run,
+        )
+        return {"ok": True, **report}
+
+    def _schedule_saves_prune(self) -> None:
+        if self.saves_archive_dir is None or self.ingest_queue is None:
+            return
+        self.ingest_queue.submit("prune:saves", self._run_saves_prune)
+
+    def _run_saves_prune(self, job: IngestJob) -> str:
+        report = self.prune_saves()
+        self.db.set_state("maintenance.mpk_saves.last_report", json.dumps(report, sort_keys=True))
+        return f"archived {report.get('archived', 0)} of {report.get('worlds', 0)} worlds"
 
     def _find_world_for_ingest(self) -> Path | None:
         active = (self.active_world_name or "").strip()
@@ -269,18 +375,27 @@ class MpkAttemptTracker:
         )
         return candidates[0] if candidates else None
 
-    def _wait_for_storage(self, path: Path) -> bool:
+    def _wait_for_storage(self, path: Path) -> str | None:
+        """Wait until the saved storage holds the finished run; returns how it was decided.
+
+        "finalized": the datapack's end_run handshake (run.seq matching
+        meta.run_seq, run.finalized set) is on disk. "stable": older datapacks,
+        or runs that never reached end_run (left mid-fight), fall back to the
+        file size holding still for 1.5 s. None on timeout.
+        """
         deadline = datetime.now(UTC) + timedelta(seconds=self.storage_wait_seconds)
         last_size = -1
         stable_since: datetime | None = None
         while datetime.now(UTC) < deadline:
             if path.exists() and path.stat().st_size > 0:
+                if storage_run_finalized(path):
+                    return "finalized"
                 size = path.stat().st_size
                 if size == last_size:
                     if stable_since is None:
                         stable_since = datetime.now(UTC)
                     elif (datetime.now(UTC) - stable_since).total_seconds() >= 1.5:
-                        return True
+                        return "stable"
                 else:
                     stable_since = None
                 last_size = size
@@ -288,9 +403,12 @@ class MpkAttemptTracker:
                 stable_since = None
                 last_size = -1
             time.sleep(0.25)
-        return False
+        return None
 
     def _event_ingested_at_utc(self, event_id: int) -> str | None:
+        event = self._current_event
+        if event is not None and event.event_id == event_id:
+            return event.ingested_at_utc
         row = self.db.query_one("SELECT ingested_at_utc FROM raw_log_events WHERE id = ?", (event_id,))
         if row is None:
             return None
@@ -315,9 +433,11 @@ class MpkAttemptTracker:
             return "Unknown"
         return f"{side} {shape} {rot}"
 
-    def _tower_name_from_height(self, height: int | None) -> str:
+    def _tower_name_from_height(self, height: int | None, standing_height: int | None = None) -> str:
         if height is None or height < 0:
-            return "Unknown"
+            # No bedrock reading (region missing or anvil-parser absent): the
+            # explosive stand height the datapack logged sits on the same tower.
+            return self.TOWER_NAME_BY_HEIGHT.get(standing_height, "Unknown")
         return self.TOWER_NAME_BY_HEIGHT.get(height, f"T-{height}")
 
     def _explosive_event_count(self, mapped_events: list[dict[str, Any]]) -> int:
@@ -350,48 +470,111 @@ class MpkAttemptTracker:
         )
 
     def _ingest_latest_world(self, *, event_id: int, clock_time: str | None) -> None:
+        # Resolve which world and end time this trigger refers to now, on the
+        # tailing thread; the slow part (storage wait, NBT, regions) is queued.
         world = self._find_world_for_ingest()
         if world is None:
             self._set_ingest_diag(reason="no_world")
             return
+        ended_at_utc = self._event_ingested_at_utc(event_id) or utc_now()
+        # Captured before the next world's seed rotation can overwrite it.
+        attempt_seed_mode = (self.db.get_state("mpk.practice.current_seed_mode", "") or "").strip().lower()
+        if attempt_seed_mode not in {"full_random", "set_seed"}:
+            attempt_seed_mode = "full_random" if is_mpk_full_random_override_enabled(self.db) else "set_seed"
+
+        world_seed = self.world_seeds.get(world.name)
+
+        def run(job: IngestJob) -> str:
+            return self._ingest_world(
+                world,
+                world_seed=world_seed,
+                event_id=event_id,
+                clock_time=clock_time,
+                ended_at_utc=ended_at_utc,
+                attempt_seed_mode=attempt_seed_mode,
+                job=job,
+            )
+
+        if self.ingest_queue is None:
+            run(IngestJob(key=world.name))
+            return
+        self._last_ingest_key = world.name
+        if not self.ingest_queue.submit(world.name, run):
+            self._set_ingest_diag(reason="ingest_already_queued", world_name=world.name)
+
+    def _tower_heights(
+        self,
+        world: Path,
+        world_seed: str | None,
+        attempt_seed_mode: str,
+        job: IngestJob,
+    ) -> dict[str, int | None]:
+        # Set-seed practice replays the same seeds; their towers never change,
+        # so region parsing is only needed the first time a seed is seen.
+        with job.stage("tower_cache"):
+            seed = world_seed or world_seed_from_level_dat(world)
+            cached = get_cached_tower_heights(self.db, seed, self.bedrock_radius)
+        if cached is not None:
+            return cached
+        with job.stage("bedrock"):
+            bedrock = bedrock_by_node(world, radius=self.bedrock_radius)
+        if attempt_seed_mode == "set_seed":
+            store_tower_heights(self.db, seed, self.bedrock_radius, bedrock, source_world=world.name)
+        return bedrock
+
+    def _ingest_world(
+        self,
+        world: Path,
+        *,
+        world_seed: str | None,
+        event_id: int,
+        clock_time: str | None,
+        ended_at_utc: str,
+        attempt_seed_mode: str,
+        job: IngestJob,
+    ) -> str:
         world_name = world.name
         if world_name == (self.db.get_state(self.state_last_world_key, "") or ""):
-            self._set_ingest_diag(reason="duplicate_world", world_name=world_name)
-            return
+            return self._set_ingest_diag(reason="duplicate_world", world_name=world_name)
         existing = self.db.query_one(
             "SELECT id FROM attempts WHERE attempt_source = 'mpk' AND world_name = ? LIMIT 1",
             (world_name,),
         )
         if existing is not None:
             self.db.set_state(self.state_last_world_key, world_name)
-            self._set_ingest_diag(reason="already_inserted", world_name=world_name)
-            return
+            return self._set_ingest_diag(reason="already_inserted", world_name=world_name)
 
         storage_path = self._find_storage_file(world / "data")
         if storage_path is None:
-            self._set_ingest_diag(reason="no_storage", world_name=world_name)
-            return
-        if not self._wait_for_storage(storage_path):
-            self._set_ingest_diag(reason="storage_not_ready", world_name=world_name)
-            return
-
-        node, _ = dominant_node_from_storage(storage_path, window_ticks=self.window_ticks)
-        rotation = rotation_from_storage(storage_path, window_ticks=self.window_ticks)
-        metrics = run_metrics_from_storage(storage_path)
-        if self._metrics_look_uninitialized(metrics):
-            retry_deadline = time.time() + 12.0
-            while time.time() < retry_deadline:
-                time.sleep(0.4)
-                refreshed = run_metrics_from_storage(storage_path)
-                if not self._metrics_look_uninitialized(refreshed):
-                    metrics = refreshed
-                    break
-        if self._metrics_look_uninitialized(metrics):
-            self._set_ingest_diag(reason="uninitialized_storage_snapshot", world_name=world_name)
-            return
-        bedrock = bedrock_by_node(world, radius=self.bedrock_radius)
+            return self._set_ingest_diag(reason="no_storage", world_name=world_name)
+        with job.stage("wait_storage"):
+            storage_ready = self._wait_for_storage(storage_path)
+        if not storage_ready:
+            return self._set_ingest_diag(reason="storage_not_ready", world_name=world_name)
+
+        # One decode serves node, rotation and metrics; retries only re-decode
+        # once the datapack has actually rewritten the file.
+        with job.stage("decode_storage"):
+            snapshot = load_storage_snapshot(storage_path)
+            metrics = snapshot.run_metrics() if snapshot is not None else {}
+            if self._metrics_look_uninitialized(metrics):
+                retry_deadline = time.time() + 12.0
+                while time.time() < retry_deadline:
+                    time.sleep(0.4)
+                    refreshed_snapshot = load_storage_snapshot(storage_path)
+                    if refreshed_snapshot is None or refreshed_snapshot is snapshot:
+                        continue
+                    refreshed = refreshed_snapshot.run_metrics()
+                    if not self._metrics_look_uninitialized(refreshed):
+                        snapshot = refreshed_snapshot
+                        metrics = refreshed
+                        break
+        if snapshot is None or self._metrics_look_uninitialized(metrics):
+            return self._set_ingest_diag(reason="uninitialized_storage_snapshot", world_name=world_name)
+        node, _ = snapshot.dominant_node(window_ticks=self.window_ticks)
+        rotation = snapshot.rotation(window_ticks=self.window_ticks)
+        bedrock = self._tower_heights(world, world_seed, attempt_seed_mode, job)
         tower_height = bedrock.get(node) if node is not None else None
-        tower_name = self._tower_name_from_height(tower_height)
         zero_type = self._zero_type_from_node(node, rotation)
 
         dragon_died = bool(metrics.get("dragon_died", False))
@@ -428,15 +611,13 @@ class MpkAttemptTracker:
         end_ticks = (final_gt - end_entry_gt) if end_entry_logged and final_gt > end_entry_gt else 0
         if end_ticks < self.MIN_END_TICKS_FOR_ATTEMPT:
             # Ignore short End visits; caller asked to only count real attempts.
-            self._set_ingest_diag(
+            return self._set_ingest_diag(
                 reason="min_end_ticks_not_met",
                 world_name=world_name,
                 detail=f"end_ticks={end_ticks}, min={self.MIN_END_TICKS_FOR_ATTEMPT}",
             )
-            return
         duration_seconds = max(0.0, (final_gt - start_gt) / 20.0) if final_gt > start_gt else 0.0
 
-        ended_at_utc = self._event_ingested_at_utc(event_id) or utc_now()
         started_at_utc = self._iso_minus_seconds(ended_at_utc, duration_seconds) if duration_seconds > 0 else ended_at_utc
 
         bed_damage = float(metrics.get("bed_damage_est", 0.0) or 0.0)
@@ -463,93 +644,47 @@ class MpkAttemptTracker:
         damage_events_count = int(metrics.get("damage_events_count", 0) or 0)
         explosive_standing_y_raw = metrics.get("explosive_standing_y", None)
         explosive_standing_y = int(explosive_standing_y_raw) if explosive_standing_y_raw is not None else None
+        tower_name = self._tower_name_from_height(tower_height, explosive_standing_y)
         o_level = None
         if bool(metrics.get("end_entry_logged", False)):
             top_y = int(metrics.get("end_entry_top_y", -1) or -1)
             if top_y >= 0:
                 o_level = top_y
-        attempt_seed_mode = (self.db.get_state("mpk.practice.current_seed_mode", "") or "").strip().lower()
-        if attempt_seed_mode not in {"full_random", "set_seed"}:
-            attempt_seed_mode = "full_random" if is_mpk_full_random_override_enabled(self.db) else "set_seed"
-
-        attempt_id = self.db.execute(
-            """
-            INSERT INTO attempts (
-                started_event_id,
-                started_at_utc,
-                started_clock,
-                ended_at_utc,
-                ended_clock,
-                status,
-                fail_reason,
-                success_time_seconds,
-                tower_name,
-                tower_code,
-                zero_type,
-                standing_height,
-                explosives_used,
-                explosives_left,
-                total_damage,
-                bed_count,
-                beds_exploded,
-                anchors_exploded,
-                bow_shots,
-                crossbow_shots,
-                major_damage_total,
-                major_hit_count,
-                setup_damage_total,
-                setup_hit_count,
-                max_damage_single_bed,
-                attempt_source,
-                attempt_seed_mode,
-                o_level,
-                flyaway_detected,
-                flyaway_gt,
-                flyaway_dragon_y,
-                flyaway_node,
-                flyaway_crystals_alive,
-                world_name,
-                created_at
-            )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0, 0, ?, 'mpk', ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                event_id,
-                started_at_utc,
-                clock_time,
-                ended_at_utc,
-                clock_time,
-                status,
-                fail_reason,
-                duration_seconds if status == "success" and duration_seconds > 0 else None,
-                tower_name,
-                str(tower_height) if tower_height is not None else None,
-                zero_type,
-                explosive_standing_y,
-                explosives_base_count if explosives_base_count > 0 else None,
-                explosives_plus_one_count if explosives_plus_one_count > 0 else None,
-                total_damage,
-                damage_events_count,
-                beds_exploded,
-                anchors_exploded_est,
-                bows_shot,
-                crossbows_shot,
-                major_damage_total,
-                major_hit_count,
-                max_damage_single,
-                attempt_seed_mode,
-                o_level,
-                1 if flyaway_detected else 0,
-                flyaway_gt,
-                flyaway_dragon_y,
-                flyaway_node if flyaway_node else None,
-                flyaway_crystals_alive if flyaway_crystals_alive >= 0 else None,
-                world_name,
-                ended_at_utc,
-            ),
+        attempt_values = (
+            event_id,
+            started_at_utc,
+            clock_time,
+            ended_at_utc,
+            clock_time,
+            status,
+            fail_reason,
+            duration_seconds if status == "success" and duration_seconds > 0 else None,
+            tower_name,
+            str(tower_height) if tower_height is not None else None,
+            zero_type,
+            explosive_standing_y,
+            explosives_base_count if explosives_base_count > 0 else None,
+            explosives_plus_one_count if explosives_plus_one_count > 0 else None,
+            total_damage,
+            damage_events_count,
+            beds_exploded,
+            anchors_exploded_est,
+            bows_shot,
+            crossbows_shot,
+            major_damage_total,
+            major_hit_count,
+            max_damage_single,
+            attempt_seed_mode,
+            o_level,
+            1 if flyaway_detected else 0,
+            flyaway_gt,
+            flyaway_dragon_y,
+            flyaway_node if flyaway_node else None,
+            flyaway_crystals_alive if flyaway_crystals_alive >= 0 else None,
+            world_name,
+            ended_at_utc,
         )
-
-        bed_index = 0
+        bed_rows: list[tuple[Any, ...]] = []
         for ev in mapped_damage_events:
             source = str(ev.get("source", "other"))
             if source not in {"bed", "anchor", "mixed", "mixed_explosive", "mixed_bed_other", "mixed_anchor_other"}:
@@ -558,7 +693,91 @@ class MpkAttemptTracker:
             if damage <= 0:
                 continue
             is_major = damage >= MAJOR_DAMAGE_THRESHOLD
-            self.db.execute(
+            bed_rows.append(
+                (
+                    event_id,
+                    len(bed_rows),
+                    damage,
+                    "major" if is_major else "setup",
+                    1 if is_major else 0,
+                    ended_at_utc,
+                )
+            )
+        with job.stage("insert"):
+            self._store_attempt(
+                attempt_values,
+                bed_rows,
+                {
+                    self.state_last_world_key: world_name,
+                    **self._ingest_diag_state(
+                        reason="inserted",
+                        world_name=world_name,
+                        detail=f"storage_ready={storage_ready}",
+                    ),
+                },
+            )
+        self._schedule_saves_prune()
+        return "inserted"
+
+    def _store_attempt(
+        self,
+        attempt_values: tuple[Any, ...],
+        bed_rows: list[tuple[Any, ...]],
+        state: dict[str, str],
+    ) -> int:
+        """Insert the attempt, its beds and the ingest state in one transaction.
+
+        The dashboard never sees an attempt without its beds, and a run with
+        many hits costs one commit.
+        """
+
+        def _insert(conn: sqlite3.Connection) -> int:
+            attempt_id = int(
+                conn.execute(
+                    """
+                    INSERT INTO attempts (
+                        started_event_id,
+                        started_at_utc,
+                        started_clock,
+                        ended_at_utc,
+                        ended_clock,
+                        status,
+                        fail_reason,
+                        success_time_seconds,
+                        tower_name,
+                        tower_code,
+                        zero_type,
+                        standing_height,
+                        explosives_used,
+                        explosives_left,
+                        total_damage,
+                        bed_count,
+                        beds_exploded,
+                        anchors_exploded,
+                        bow_shots,
+                        crossbow_shots,
+                        major_damage_total,
+                        major_hit_count,
+                        setup_damage_total,
+                        setup_hit_count,
+                        max_damage_single_bed,
+                        attempt_source,
+                        attempt_seed_mode,
+                        o_level,
+                        flyaway_detected,
+                        flyaway_gt,
+                        flyaway_dragon_y,
+                        flyaway_node,
+                        flyaway_crystals_alive,
+                        world_name,
+                        created_at
+                    )
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0, 0, ?, 'mpk', ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    attempt_values,
+                ).lastrowid
+            )
+            conn.executemany(
                 """
                 INSERT INTO attempt_beds (
                     attempt_id,
@@ -571,17 +790,9 @@ class MpkAttemptTracker:
                 )
                 VALUES (?, ?, ?, ?, ?, ?, ?)
                 """,
-                (
-                    attempt_id,
-                    event_id,
-                    bed_index,
-                    damage,
-                    "major" if is_major else "setup",
-                    1 if is_major else 0,
-                    ended_at_utc,
-                ),
+                [(attempt_id, *row) for row in bed_rows],
             )
-            bed_index += 1
+            Database.write_state(conn, state)
+            return attempt_id
 
-        self.db.set_state(self.state_last_world_key, world_name)
-        self._set_ingest_diag(reason="inserted", world_name=world_name)
+        return self.db.run_write(_insert)
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+import os
+from pathlib import Path
+import shutil
+import threading
+import time
+from typing import Any, Callable, Iterable
+
+# Directory mtimes this close to "now" may still change within the same
+# timestamp tick on coarse filesystems; such a listing is not trusted as final.
+_MTIME_SETTLE_SECONDS = 2.0
+
+
+class SavesIndex:
+    """Incremental view of ``saves/`` for MPK world discovery.
+
+    A speedrunning instance piles up thousands of ``Random Speedrun #N``
+    worlds, so worlds are kept in recency order instead of being listed and
+    stat-ed per ingest: seeded once from their mtimes, then moved to the newest
+    end by the log (``Creating "<world>"``, chunk saves). ``saves/`` is only
+    re-listed when its own mtime changes (a world was added or removed), and
+    only the new entries are stat-ed then.
+    """
+
+    def __init__(self, saves_dir: Path) -> None:
+        self.saves_dir = saves_dir
+        # Oldest first; the last key is the newest/active world.
+        self._worlds: OrderedDict[str, None] = OrderedDict()
+        self._dir_mtime_ns: int | None = None
+        self._lock = threading.Lock()
+        self.scans = 0
+
+    def note_world(self, world_name: str) -> None:
+        """The log says ``world_name`` was just created or is being played."""
+        if not world_name:
+            return
+        with self._lock:
+            self._worlds[world_name] = None
+            self._worlds.move_to_end(world_name)
+
+    def latest(self) -> Path | None:
+        with self._lock:
+            self._refresh_locked()
+            for name in reversed(self._worlds):
+                path = self.saves_dir / name
+                if path.is_dir():
+                    return path
+        return None
+
+    def worlds(self) -> list[str]:
+        """Known world names, oldest first."""
+        with self._lock:
+            self._refresh_locked()
+            return list(self._worlds)
+
+    def _refresh_locked(self) -> None:
+        try:
+            mtime_ns = self.saves_dir.stat().st_mtime_ns
+        except OSError:
+            self._worlds.clear()
+            self._dir_mtime_ns = None
+            return
+        if mtime_ns == self._dir_mtime_ns:
+            return
+        self.scans += 1
+        present: set[str] = set()
+        new: list[tuple[float, str]] = []
+        with os.scandir(self.saves_dir) as entries:
+            for entry in entries:
+                try:
+                    if not entry.is_dir():
+                        continue
+                    if entry.name in self._worlds:
+                        present.add(entry.name)
+                    else:
+                        new.append((entry.stat().st_mtime, entry.name))
+                except OSError:
+                    continue
+        for name in [name for name in self._worlds if name not in present]:
+            del self._worlds[name]
+        # New directories are newer than anything already indexed.
+        for _, name in sorted(new):
+            self._worlds[name] = None
+        settled = time.time() - mtime_ns / 1e9 > _MTIME_SETTLE_SECONDS
+        self._dir_mtime_ns = mtime_ns if settled else None
+
+    def prune(
+        self,
+        *,
+        keep: int,
+        archive_dir: Path,
+        is_prunable: Callable[[str], bool],
+        protect: Iterable[str] = (),
+        dry_run: bool = False,
+    ) -> dict[str, Any]:
+        """Move prunable worlds older than the newest ``keep`` into ``archive_dir``.
+
+        Worlds are moved, never deleted; a name already present in the archive
+        is left in place.
+        """
+        protected = {name for name in protect if name}
+        with self._lock:
+            self._refresh_locked()
+            names = list(self._worlds)
+        candidates = names[: max(0, len(names) - max(0, keep))]
+        report: dict[str, Any] = {
+            "worlds": len(names),
+            "keep": keep,
+            "archive_dir": str(archive_dir),
+            "dry_run": dry_run,
+            "archived": 0,
+            "kept_not_prunable": 0,
+            "conflicts": 0,
+            "errors": [],
+        }
+        if not dry_run and candidates:
+            archive_dir.mkdir(parents=True, exist_ok=True)
+        for name in candidates:
+            if name in protected or not is_prunable(name):
+                report["kept_not_prunable"] += 1
+                continue
+            target = archive_dir / name
+            if target.exists():
+                report["conflicts"] += 1
+                continue
+            if not dry_run:
+                try:
+                    shutil.move(str(self.saves_dir / name), str(target))
+                except OSError as exc:
+                    report["errors"].append(f"{name}: {exc}")
+                    continue
+                with self._lock:
+                    self._worlds.pop(name, None)
+            report["archived"] += 1
+        return report
@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+import json
+import threading
+from typing import Any, Callable, Iterator, Mapping
+
+StateListener = Callable[[Mapping[str, str | None]], None]
+
+_TRUE_VALUES = frozenset({"1", "true", "yes", "on"})
+
+
+class StateStore:
+    """In-process copy of ``ingest_state`` with typed getters.
+
+    The table is loaded once (lazily) and then kept current from the write
+    connection itself: TEMP triggers on ``ingest_state`` report every changed
+    row to :meth:`note_change` while the writer runs a job, the writer thread
+    publishes those changes when the surrounding transaction commits and
+    drops them when it rolls back. Raw ``DELETE FROM ingest_state`` statements
+    and state written inside larger jobs are therefore seen as well. Other
+    threads never observe another transaction's uncommitted values, while the
+    thread holding the write connection reads its own pending changes.
+
+    :class:`~app.database.Database` is the only writer of this table in the
+    process; edits made by other processes are picked up on the next start.
+    """
+
+    def __init__(
+        self,
+        load: Callable[[], Mapping[str, str]],
+        *,
+        owns_writer: Callable[[], bool] = lambda: False,
+    ) -> None:
+        # ``load`` must read committed rows, never the open write transaction.
+        self._load = load
+        self._owns_writer = owns_writer
+        self._values: dict[str, str] | None = None
+        # Guards loading and applying; held while the table is first read so
+        # a commit published meanwhile is applied on top of that snapshot.
+        self._lock = threading.Lock()
+        # Row changes made by the transaction currently open on the write
+        # connection, with the write-behind number of the set_states() call
+        # that made them (0 for any other write); only the thread owning that
+        # connection touches this.
+        self._staged: list[tuple[str, str | None, int]] = []
+        self._writing = 0
+        # Newest write-behind number per key whose value is assumed in the
+        # cache but not yet committed.
+        self._pending: dict[str, int] = {}
+        self._last_number = 0
+        self._listeners: list[StateListener] = []
+        self._listeners_lock = threading.Lock()
+
+    # Reads
+
+    def _snapshot(self) -> dict[str, str]:
+        values = self._values
+        if values is not None:
+            return values
+        with self._lock:
+            if self._values is None:
+                self._values = {str(key): str(value) for key, value in self._load().items()}
+            return self._values
+
+    def get(self, key: str, default: str | None = None) -> str | None:
+        if self._staged and self._owns_writer():
+            for staged_key, staged_value, _ in reversed(self._staged):
+                if staged_key == key:
+                    return default if staged_value is None else staged_value
+        value = self._snapshot().get(key)
+        return default if value is None else value
+
+    def get_int(self, key: str, default: int = 0) -> int:
+        try:
+            return int(self.get(key) or "")
+        except ValueError:
+            return default
+
+    def get_float(self, key: str, default: float = 0.0) -> float:
+        try:
+            return float(self.get(key) or "")
+        except ValueError:
+            return default
+
+    def get_bool(self, key: str, default: bool = False) -> bool:
+        value = self.get(key)
+        if value is None or not value.strip():
+            return default
+        return value.strip().lower() in _TRUE_VALUES
+
+    def get_json(self, key: str, default: Any = None) -> Any:
+        value = self.get(key)
+        if not value:
+            return default
+        try:
+            return json.loads(value)
+        except ValueError:
+            return default
+
+    def items(self, prefix: str = "") -> dict[str, str]:
+        """All cached keys starting with ``prefix``."""
+        values = dict(self._snapshot())
+        if self._staged and self._owns_writer():
+            for key, value, _ in self._staged:
+                if value is None:
+                    values.pop(key, None)
+                else:
+                    values[key] = value
+        return {key: value for key, value in values.items() if key.startswith(prefix)}
+
+    # Write connection hooks
+
+    def note_change(self, key: str, value: str | None) -> None:
+        """Called by the TEMP triggers for each inserted, updated or deleted row."""
+        self._staged.append((str(key), None if value is None else str(value), self._writing))
+
+    @contextmanager
+    def writing(self, number: int) -> Iterator[None]:
+        """Tag row changes made inside the block with write-behind ``number``."""
+        self._writing = number
+        try:
+            yield
+        finally:
+            self._writing = 0
+
+    def staged_mark(self) -> int:
+        return len(self._staged)
+
+    def discard_staged(self, mark: int = 0) -> None:
+        """Forget changes rolled back since ``mark`` (a savepoint or the whole transaction)."""
+        del self._staged[mark:]
+
+    def publish_staged(self) -> None:
+        """Apply the committed changes and notify listeners."""
+        if not self._staged:
+            return
+        changes: dict[str, str | None] = {}
+        committed: dict[str, int] = {}
+        for key, value, number in self._staged:
+            changes[key] = value
+            committed[key] = max(committed.get(key, 0), number)
+        self._staged.clear()
+        with self._lock:
+            stale = set()
+            for key, number in committed.items():
+                pending = self._pending.get(key)
+                if pending is None:
+                    continue
+                if pending > number:
+                    # A newer value is still queued and already in the cache;
+                    # this commit must not roll the cache back to an older one.
+                    stale.add(key)
+                else:
+                    del self._pending[key]
+        self._apply({key: value for key, value in changes.items() if key not in stale})
+        with self._listeners_lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(changes)
+            except Exception:
+                # A broken listener must not fail the writer thread.
+                pass
+
+    def assume(self, values: Mapping[str, str]) -> int:
+        """Show queued (not yet committed) values to readers right away.
+
+        Returns the write-behind number the queued write must run under
+        (see :meth:`writing`) so its commit is matched to these values.
+        """
+        self._snapshot()
+        with self._lock:
+            self._last_number += 1
+            number = self._last_number
+            for key in values:
+                self._pending[key] = number
+        self._apply(values)
+        return number
+
+    def abandon(self, number: int) -> None:
+        """A queued write failed: forget its pending keys and reload the cache."""
+        with self._lock:
+            for key in [key for key, pending in self._pending.items() if pending == number]:
+                del self._pending[key]
+            self._values = None
+
+    def _apply(self, changes: Mapping[str, str | None]) -> None:
+        if not changes:
+            return
+        with self._lock:
+            current = self._values
+            if current is None:
+                return
+            # Commits of values already assumed (the usual set_states path)
+            # and rewrites of unchanged values leave the cache as it is.
+            diff = {
+                key: None if value is None else str(value)
+                for key, value in changes.items()
+                if current.get(key) != (None if value is None else str(value))
+            }
+            if not diff:
+                return
+            values = dict(current)
+            for key, value in diff.items():
+                if value is None:
+                    values.pop(key, None)
+                else:
+                    values[key] = value
+            # Swap rather than mutate so lock-free readers never see a dict
+            # changing size under them.
+            self._values = values
+
+    # Change notifications
+
+    def subscribe(self, listener: StateListener) -> Callable[[], None]:
+        """Call ``listener({key: value_or_None})`` after each commit that changed state.
+
+        Listeners run on the writer thread and must return quickly. Returns a
+        function that removes the listener.
+        """
+        with self._listeners_lock:
+            self._listeners.append(listener)
+
+        def _unsubscribe() -> None:
+            with self._listeners_lock:
+                if listener in self._listeners:
+                    self._listeners.remove(listener)
+
+        return _unsubscribe
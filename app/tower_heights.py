@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any, Iterable
+
+from .database import Database
+
+# Must match the node keys of scripts.parse_command_storage.bedrock_by_node.
+TOWER_NODES = ("back_diag", "front_diag", "back_straight", "front_straight")
+
+
+def utc_now() -> str:
+    return datetime.now(UTC).isoformat(timespec="seconds")
+
+
+def get_cached_tower_heights(db: Database, seed: str | None, radius: int) -> dict[str, int | None] | None:
+    if not seed:
+        return None
+    row = db.query_one(
+        f"SELECT {', '.join(TOWER_NODES)} FROM mpk_tower_heights WHERE seed = ? AND radius = ?",
+        (str(seed), int(radius)),
+    )
+    if row is None:
+        return None
+    return {node: (int(row[node]) if row[node] is not None else None) for node in TOWER_NODES}
+
+
+def store_tower_heights(
+    db: Database,
+    seed: str | None,
+    radius: int,
+    heights: dict[str, int | None],
+    *,
+    source_world: str = "",
+) -> bool:
+    """Remember a seed's node heights; partial reads (unsaved chunks) are not cached."""
+    if not seed or any(heights.get(node) is None for node in TOWER_NODES):
+        return False
+    db.execute(
+        f"""
+        INSERT INTO mpk_tower_heights (seed, radius, {', '.join(TOWER_NODES)}, source_world, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(seed, radius) DO UPDATE SET
+            back_diag = excluded.back_diag,
+            front_diag = excluded.front_diag,
+            back_straight = excluded.back_straight,
+            front_straight = excluded.front_straight,
+            source_world = excluded.source_world,
+            created_at = excluded.created_at
+        """,
+        (str(seed), int(radius), *(int(heights[node]) for node in TOWER_NODES), source_world, utc_now()),
+    )
+    return True
+
+
+def prewarm_tower_heights(
+    db: Database,
+    saves_dir: Path,
+    seeds: Iterable[int | str],
+    *,
+    radius: int = 4,
+) -> dict[str, Any]:
+    """Fill the cache for pool seeds that already have a world on disk.
+
+    Tower heights can only be read from generated region files, so this walks
+    ``saves_dir`` once, matches each world's level.dat seed against the pool and
+    measures the seeds that are not cached yet.
+    """
+    from scripts.parse_command_storage import bedrock_by_node, world_seed_from_level_dat
+
+    pool = {str(seed) for seed in seeds}
+    report: dict[str, Any] = {"pool_size": len(pool), "worlds_scanned": 0, "cached": 0, "already_cached": 0}
+    if not pool or not saves_dir.exists():
+        return report
+    cached = {
+        str(row["seed"])
+        for row in db.query_all("SELECT seed FROM mpk_tower_heights WHERE radius = ?", (int(radius),))
+    }
+    report["already_cached"] = len(pool & cached)
+    for world in sorted(saves_dir.iterdir()):
+        if not world.is_dir():
+            continue
+        report["worlds_scanned"] += 1
+        seed = world_seed_from_level_dat(world)
+        if seed is None or seed not in pool or seed in cached:
+            continue
+        heights = bedrock_by_node(world, radius=radius)
+        if store_tower_heights(db, seed, radius, heights, source_world=world.name):
+            cached.add(seed)
+            report["cached"] += 1
+    return report
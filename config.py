@@ -42,4 +42,20 @@ MPK_BACK_DIAG_JSON_PATH = Path(
 )
 
 POLL_SECONDS = float(os.getenv("ZERO_DASH_POLL_SECONDS", "0.4"))
+# "auto" uses inotify on Linux and falls back to polling every POLL_SECONDS.
+LOG_NOTIFY_BACKEND = os.getenv("ZERO_DASH_LOG_NOTIFY", "auto").strip().lower()
+NOTIFY_RESCAN_SECONDS = float(os.getenv("ZERO_DASH_NOTIFY_RESCAN_SECONDS", "1.0"))
+HEARTBEAT_SECONDS = float(os.getenv("ZERO_DASH_HEARTBEAT_SECONDS", "5.0"))
 MAJOR_DAMAGE_THRESHOLD = int(os.getenv("ZERO_DASH_MAJOR_DAMAGE_THRESHOLD", "15"))
+INGEST_BATCH_LINES = int(os.getenv("ZERO_DASH_INGEST_BATCH_LINES", "2000"))
+MMAP_CATCHUP_BYTES = int(os.getenv("ZERO_DASH_MMAP_CATCHUP_BYTES", str(8 * 1024 * 1024)))
+MPK_TOWER_PREWARM = os.getenv("ZERO_DASH_MPK_TOWER_PREWARM", "0").strip().lower() in {"1", "true", "yes", "on"}
+# Empty disables archiving; otherwise ingested MPK worlds beyond the newest
+# MPK_SAVES_KEEP are moved out of saves/ into this directory.
+MPK_SAVES_ARCHIVE_DIR = os.getenv("ZERO_DASH_MPK_SAVES_ARCHIVE_DIR", "").strip()
+MPK_SAVES_KEEP = int(os.getenv("ZERO_DASH_MPK_SAVES_KEEP", "50"))
+DB_READ_POOL_SIZE = int(os.getenv("ZERO_DASH_DB_READ_POOL_SIZE", "4"))
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("ZERO_DASH_DB_STATEMENT_CACHE_SIZE", "256"))
+RAW_EVENT_RETENTION_DAYS = float(os.getenv("ZERO_DASH_RAW_EVENT_RETENTION_DAYS", "14"))
+RAW_EVENT_ARCHIVE = os.getenv("ZERO_DASH_RAW_EVENT_ARCHIVE", "1").strip().lower() not in {"0", "false", "no", "off"}
+RAW_EVENT_AUTO_COMPACT = os.getenv("ZERO_DASH_RAW_EVENT_AUTO_COMPACT", "0").strip().lower() in {"1", "true", "yes", "on"}
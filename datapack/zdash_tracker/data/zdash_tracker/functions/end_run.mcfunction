@@ -6,4 +6,6 @@ scoreboard players set #active zdi 0
 scoreboard players set #missing zdi 0
 data modify storage zdash:tracker run.active set value 0b
 execute store result storage zdash:tracker run.end_gt long 1 run time query gametime
+# Handshake for the dashboard: this run's data is complete once saved.
+data modify storage zdash:tracker run.finalized set value 1b
 tellraw @a [{"text":"[zdash] run ended","color":"yellow"}]
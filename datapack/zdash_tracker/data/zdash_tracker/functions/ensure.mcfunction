@@ -63,10 +63,14 @@ execute unless score #fly_since_end zdi matches -2147483648..2147483647 run scor
 execute unless score #fly_crystals_alive zdi matches -2147483648..2147483647 run scoreboard players set #fly_crystals_alive zdi 0
 execute unless score #fly_within2 zdi matches -2147483648..2147483647 run scoreboard players set #fly_within2 zdi 100
 execute unless score #fly_away2 zdi matches -2147483648..2147483647 run scoreboard players set #fly_away2 zdi 600
+execute unless score #run_seq zdi matches -2147483648..2147483647 run scoreboard players set #run_seq zdi 0
 
 execute unless data storage zdash:tracker meta run data modify storage zdash:tracker meta set value {scale:1000}
-execute unless data storage zdash:tracker meta.version run data modify storage zdash:tracker meta.version set value "v2026-02-17-flyaway3"
-execute unless data storage zdash:tracker run run data modify storage zdash:tracker run set value {active:0b,start_gt:0L,end_gt:0L,dragon_died:0b,dragon_died_gt:0L,flyaway:{armed:0b,detected:0b,node:"",node_code:0,detected_gt:0L,dragon_x:0,dragon_y:0,dragon_z:0,detected_dist2:0,crystals_alive:-1},deltas:{beds_exploded:0,anchors_interactions:0,anchors_exploded_est:0,bows_shot:0,crossbows_shot:0},end_entry:{logged:0b,gt:0L,player_y:0,top_y:-1,top_is_endstone:0b},explosive_stand:{logged:0b,y:0},damage_by_source:{beds_scaled:0,anchors_scaled:0,other_scaled:0},damage_events:[],explode_events:[]}
+execute unless data storage zdash:tracker meta.version run data modify storage zdash:tracker meta.version set value "v2026-10-17-handshake1"
+execute unless data storage zdash:tracker run run data modify storage zdash:tracker run set value {active:0b,seq:0,finalized:0b,start_gt:0L,end_gt:0L,dragon_died:0b,dragon_died_gt:0L,flyaway:{armed:0b,detected:0b,node:"",node_code:0,detected_gt:0L,dragon_x:0,dragon_y:0,dragon_z:0,detected_dist2:0,crystals_alive:-1},deltas:{beds_exploded:0,anchors_interactions:0,anchors_exploded_est:0,bows_shot:0,crossbows_shot:0},end_entry:{logged:0b,gt:0L,player_y:0,top_y:-1,top_is_endstone:0b},explosive_stand:{logged:0b,y:0},damage_by_source:{beds_scaled:0,anchors_scaled:0,other_scaled:0},damage_events:[],explode_events:[]}
+execute unless data storage zdash:tracker meta.run_seq run execute store result storage zdash:tracker meta.run_seq int 1 run scoreboard players get #run_seq zdi
+execute unless data storage zdash:tracker run.seq run data modify storage zdash:tracker run.seq set value 0
+execute unless data storage zdash:tracker run.finalized run data modify storage zdash:tracker run.finalized set value 0b
 execute unless data storage zdash:tracker run.active run data modify storage zdash:tracker run.active set value 0b
 execute unless data storage zdash:tracker run.start_gt run data modify storage zdash:tracker run.start_gt set value 0L
 execute unless data storage zdash:tracker run.end_gt run data modify storage zdash:tracker run.end_gt set value 0L
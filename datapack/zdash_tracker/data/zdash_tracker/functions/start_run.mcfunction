@@ -1,5 +1,9 @@
 scoreboard players set #active zdi 1
 scoreboard players set #dragon_died zdi 0
+scoreboard players add #run_seq zdi 1
+execute store result storage zdash:tracker meta.run_seq int 1 run scoreboard players get #run_seq zdi
+execute store result storage zdash:tracker run.seq int 1 run scoreboard players get #run_seq zdi
+data modify storage zdash:tracker run.finalized set value 0b
 
 execute store result storage zdash:tracker run.start_gt long 1 run time query gametime
 data modify storage zdash:tracker run.active set value 1b
@@ -0,0 +1,591 @@
+from __future__ import annotations
+
+import argparse
+import math
+from pathlib import Path
+import random
+import re
+import sys
+import tempfile
+import time
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app import attempt_tracker as at
+from app.database import Database
+from app.log_parser import LogDispatcher, LogInterest, ParsedLogLine, parse_log_line
+from app.log_watcher import LogWatcher
+
+SYNTHETIC_LINES = [
+    "[21:09:37] [Server thread/INFO]: Saving chunks for level 'ServerLevel[Random Speedrun #1]'/minecraft:overworld",
+    *["[21:09:37] [Worker-Main-7/DEBUG]: Chunk [12, -4] saved in 3ms"] * 8,
+    *["[21:09:37] [Render thread/WARN]: Received passengers for unknown entity"] * 5,
+    *["[21:09:38] [Server thread/INFO]: Preparing spawn area: 83%"] * 5,
+    "[21:09:38] [Render thread/INFO]: [CHAT] Damage: 42",
+]
+
+
+class _NullTracker:
+    def handle_chat_event(self, event_id: int, chat_message: str, clock_time: str | None) -> None:
+        return
+
+    def handle_log_event(self, event_id: int, parsed: object) -> None:
+        return
+
+
+def _write_synthetic_log(path: Path, size_mb: float) -> None:
+    target = int(size_mb * 1_000_000)
+    block = ("\n".join(SYNTHETIC_LINES) + "\n").encode("utf-8") * 256
+    written = 0
+    with path.open("wb") as f:
+        while written < target:
+            f.write(block)
+            written += len(block)
+
+
+def bench_catchup(args: argparse.Namespace) -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        log_path = Path(args.log) if args.log else tmp_dir / "latest.log"
+        if not args.log:
+            _write_synthetic_log(log_path, args.size_mb)
+        size = log_path.stat().st_size
+        for label, mmap_bytes in (("buffered", size + 1), ("mmap", 1)):
+            db = Database(tmp_dir / f"bench_{label}.db")
+            try:
+                watcher = LogWatcher(
+                    log_path=log_path,
+                    poll_seconds=0.4,
+                    db=db,
+                    tracker=_NullTracker(),
+                    mmap_catchup_bytes=mmap_bytes,
+                )
+                started = time.perf_counter()
+                lines = watcher.poll_once()
+                elapsed = time.perf_counter() - started
+            finally:
+                db.close()
+            print(
+                f"{label:>8}: {size / 1_000_000:.1f} MB, {lines} lines in {elapsed:.2f}s "
+                f"-> {size / 1_000_000 / elapsed:.1f} MB/s"
+            )
+    return 0
+
+
+def _mpk_log_interest() -> LogInterest | None:
+    try:
+        from app.mpk_attempt_tracker import MpkAttemptTracker
+    except ModuleNotFoundError:
+        return None
+    return MpkAttemptTracker.LOG_INTEREST
+
+
+# What every line used to go through before the interest prefilter existed.
+_CHAT_REGEX_CHAIN = [
+    at.ZDASH_TOWER_RE,
+    at.ZDASH_TYPE_RE,
+    at.FIRST_BED_RE,
+    at.DAMAGE_RE,
+    at.BLOCKS_RE,
+    at.EXPLOSIVES_RE,
+    at.TIME_RE,
+    at.TOWER_RE,
+    at.TYPE_RE,
+    at.HEIGHT_RE,
+]
+_BODY_REGEX_CHAIN = [
+    re.compile(r'^Creating "(?P<world>.+)"(?: with seed "(?P<seed>[-\d]+)")?\.\.\.$'),
+    re.compile(r"^Attempting event world load at (?P<world>.+)$"),
+    re.compile(r"Saving chunks for level 'ServerLevel\[(?P<world>.+?)\]'/"),
+    re.compile(r"^StateOutput State: inworld(?:,|$)"),
+]
+
+
+def _legacy_tracker_checks(parsed: ParsedLogLine) -> None:
+    # Non-matching lines (the common case) ran every check in both trackers.
+    if parsed.is_chat and parsed.chat_message is not None:
+        message = parsed.chat_message.strip()
+        message.lower()
+        for pattern in _CHAT_REGEX_CHAIN:
+            pattern.match(message)
+        return
+    stripped = (parsed.body or "").strip()
+    lowered = stripped.lower()
+    for needle in ("stateoutput state: title", "stateoutput state: waiting", "disconnecting from server"):
+        _ = needle in lowered
+    for pattern in _BODY_REGEX_CHAIN:
+        pattern.search(stripped)
+    stripped.startswith(("Loaded StandardSettings on World Join", "StateOutput State: waiting"))
+
+
+def bench_prefilter(args: argparse.Namespace) -> int:
+    if args.log:
+        with Path(args.log).open("r", encoding="utf-8", errors="replace") as f:
+            lines = [line.rstrip("\r\n") for line in f]
+    else:
+        lines = SYNTHETIC_LINES * (args.lines // len(SYNTHETIC_LINES))
+    interests = [at.AttemptTracker.LOG_INTEREST]
+    mpk_interest = _mpk_log_interest()
+    if mpk_interest is not None:
+        interests.append(mpk_interest)
+    dispatcher = LogDispatcher(interests)
+
+    started = time.perf_counter()
+    parsed_lines = [parse_log_line(raw) for raw in lines]
+    parse_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for parsed in parsed_lines:
+        _legacy_tracker_checks(parsed)
+    legacy_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    dispatched = 0
+    for parsed in parsed_lines:
+        if dispatcher.wants(parsed):
+            dispatched += 1
+    prefilter_s = time.perf_counter() - started
+
+    # What LogWatcher does now: the raw check first, LOG_LINE_RE only for survivors.
+    started = time.perf_counter()
+    raw_dispatched = 0
+    for raw in lines:
+        if dispatcher.wants_raw(raw) and dispatcher.wants(parse_log_line(raw)):
+            raw_dispatched += 1
+    raw_s = time.perf_counter() - started
+    assert raw_dispatched == dispatched
+
+    n = len(lines)
+    print(f"lines: {n}, dispatched to trackers: {dispatched} ({100.0 * dispatched / max(1, n):.1f}%)")
+    print(f"  parse_log_line:                 {n / parse_s:,.0f} lines/s")
+    print(f"  tracker regex chains (before):  {n / legacy_s:,.0f} lines/s")
+    print(f"  interest prefilter (after):     {n / prefilter_s:,.0f} lines/s ({legacy_s / prefilter_s:.1f}x)")
+    print(
+        f"  parse + dispatch end-to-end:    {n / (parse_s + legacy_s):,.0f} -> "
+        f"{n / (parse_s + prefilter_s):,.0f} lines/s"
+    )
+    print(f"  raw prefilter, parse survivors: {n / raw_s:,.0f} lines/s")
+    if mpk_interest is None:
+        print("  (MPK tracker interest skipped: nbtlib not installed)")
+    return 0
+
+
+def _synthetic_samples(count: int, seed: int = 7) -> list[dict[str, int]]:
+    # Dragon circling the pillars (radius ~40) with jitter, one sample per tick.
+    rng = random.Random(seed)
+    samples = []
+    for i in range(count):
+        angle = -i * 0.02 + rng.uniform(-0.05, 0.05)
+        radius = 40.0 + rng.uniform(-12.0, 12.0)
+        samples.append(
+            {
+                "x": int(radius * math.cos(angle) * 1000),
+                "y": 70_000 + rng.randrange(0, 20_000),
+                "z": int(radius * math.sin(angle) * 1000),
+                "gt": 100_000 + i,
+            }
+        )
+    return samples
+
+
+def bench_classify(args: argparse.Namespace) -> int:
+    import scripts.parse_command_storage as pcs
+
+    samples = _synthetic_samples(args.samples)
+    window = args.samples  # whole run, the worst case for the per-sample loops
+    started = time.perf_counter()
+    py_counts = pcs._classify_node_python(samples, window_ticks=window)
+    py_net = pcs._net_angle_python(samples, window)
+    py_s = time.perf_counter() - started
+    print(f"samples: {len(samples)}")
+    print(f"  pure Python:  {py_s * 1000:8.1f} ms  counts={py_counts} net={py_net:.6f}")
+    if pcs.np is None:
+        print("  (vectorized path skipped: numpy not installed)")
+        return 0
+    started = time.perf_counter()
+    arrays = pcs.SampleArrays(samples)
+    load_s = time.perf_counter() - started
+    started = time.perf_counter()
+    np_counts = pcs._classify_node_vectorized(arrays, window_ticks=window)
+    np_net = pcs._net_angle_vectorized(arrays, window)
+    np_s = time.perf_counter() - started
+    print(
+        f"  NumPy:        {(load_s + np_s) * 1000:8.1f} ms  (array load {load_s * 1000:.1f} ms) "
+        f"counts={np_counts} net={np_net:.6f}"
+    )
+    same = py_counts == np_counts and pcs._rotation(samples, window, arrays) == (
+        "unknown" if abs(py_net) < 0.2 else ("ccw" if py_net > 0 else "cw")
+    )
+    print(
+        f"  speed-up: {py_s / (load_s + np_s):.1f}x, same counts/rotation: {same}, "
+        f"net angle drift: {abs(py_net - np_net):.1e} rad"
+    )
+    return 0
+
+
+def bench_attribution(args: argparse.Namespace) -> int:
+    import scripts.parse_command_storage as pcs
+
+    rng = random.Random(7)
+    # A long bed/anchor run: a use every few ticks, chip damage around each.
+    explode = []
+    damage = []
+    gt = 0
+    for _ in range(args.uses):
+        gt += rng.randrange(2, 12)
+        explode.append({"gt": gt, "explode_beds": rng.randrange(0, 2), "explode_anchors": rng.randrange(0, 2)})
+        for _ in range(rng.randrange(1, 3)):
+            damage.append({"gt": gt + rng.randrange(0, 300), "hp_diff_scaled": rng.randrange(50, 4000)})
+    damage.sort(key=lambda e: e["gt"])
+
+    started = time.perf_counter()
+    scan = pcs._attribute_damage_from_events_scan(explode, damage)
+    scan_s = time.perf_counter() - started
+    started = time.perf_counter()
+    indexed = pcs._attribute_damage_from_events(explode, damage)
+    indexed_s = time.perf_counter() - started
+    print(f"explode events: {len(explode)}, damage events: {len(damage)}")
+    print(f"  per-use scan:      {scan_s * 1000:8.1f} ms")
+    print(f"  tick-indexed:      {indexed_s * 1000:8.1f} ms ({scan_s / indexed_s:.0f}x)")
+    print(f"  identical matches: {scan == indexed}")
+    return 0
+
+
+def _write_synthetic_storage(path: Path, samples: int, damage_events: int, seed: int = 11) -> None:
+    """command_storage_zdash.dat shaped like the zdash_tracker datapack writes it."""
+    import gzip
+
+    from nbtlib import Byte, Compound, File, Int, List, Long, String
+
+    rng = random.Random(seed)
+    sample_tags = List[Compound](
+        Compound(
+            {
+                "x": Int(s["x"]),
+                "y": Int(s["y"]),
+                "z": Int(s["z"]),
+                "yaw": Int(rng.randrange(-180_000, 180_000)),
+                "pitch": Int(rng.randrange(-90_000, 90_000)),
+                "gt": Long(s["gt"]),
+            }
+        )
+        for s in _synthetic_samples(samples, seed)
+    )
+    damage_tags = List[Compound](
+        Compound(
+            {
+                "gt": Long(100_000 + i * 7),
+                "hp_diff_scaled": Int(rng.randrange(100, 4000)),
+                "explode_beds": Int(rng.randrange(0, 3)),
+                "explode_anchors": Int(rng.randrange(0, 3)),
+                "bed_dmg_scaled": Int(0),
+                "anchor_dmg_scaled": Int(0),
+                "other_dmg_scaled": Int(0),
+            }
+        )
+        for i in range(damage_events)
+    )
+    explode_tags = List[Compound](
+        Compound({"gt": Long(100_000 + i * 7 - 2), "explode_beds": Int(1), "explode_anchors": Int(0)})
+        for i in range(damage_events)
+    )
+    run = Compound(
+        {
+            "active": Byte(0),
+            "seq": Int(1),
+            "finalized": Byte(1),
+            "start_gt": Long(100_000),
+            "end_gt": Long(100_000 + samples),
+            "dragon_died": Byte(1),
+            "dragon_died_gt": Long(100_000 + samples - 1),
+            "flyaway": Compound(
+                {
+                    "armed": Byte(0),
+                    "detected": Byte(0),
+                    "node": String(""),
+                    "node_code": Int(0),
+                    "detected_gt": Long(0),
+                    "dragon_x": Int(0),
+                    "dragon_y": Int(0),
+                    "dragon_z": Int(0),
+                    "detected_dist2": Int(0),
+                    "crystals_alive": Int(-1),
+                }
+            ),
+            "deltas": Compound(
+                {
+                    "beds_exploded": Int(damage_events),
+                    "anchors_interactions": Int(0),
+                    "anchors_exploded_est": Int(0),
+                    "bows_shot": Int(2),
+                    "crossbows_shot": Int(0),
+                }
+            ),
+            "end_entry": Compound(
+                {"logged": Byte(1), "gt": Long(100_000), "player_y": Int(60), "top_y": Int(58), "top_is_endstone": Byte(1)}
+            ),
+            "explosive_stand": Compound({"logged": Byte(1), "y": Int(64)}),
+            "damage_by_source": Compound({"beds_scaled": Int(0), "anchors_scaled": Int(0), "other_scaled": Int(0)}),
+            "damage_events": damage_tags,
+            "explode_events": explode_tags,
+        }
+    )
+    tracker = Compound(
+        {
+            "meta": Compound({"scale": Int(1000), "version": String("v2026-10-17-handshake1"), "run_seq": Int(1)}),
+            "cur": Compound({"x": Int(0), "y": Int(0), "z": Int(0), "yaw": Int(0), "pitch": Int(0), "gt": Long(0)}),
+            "run": run,
+            "samples": sample_tags,
+        }
+    )
+    root = File({"data": Compound({"contents": Compound({"tracker": tracker})}), "DataVersion": Int(2230)})
+    with gzip.open(path, "wb") as f:
+        root.write(f)
+
+
+def bench_storage(args: argparse.Namespace) -> int:
+    import gzip
+
+    import nbtlib
+
+    import scripts.parse_command_storage as pcs
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(args.file) if args.file else Path(tmp) / "command_storage_zdash.dat"
+        if not args.file:
+            _write_synthetic_storage(path, args.samples, args.damage_events)
+        stat = path.stat()
+
+        started = time.perf_counter()
+        with gzip.open(path, "rb") as f:
+            nbt_file = nbtlib.File.parse(f)
+        parse_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        legacy_samples, _ = pcs._find_samples(nbt_file)
+        legacy_tracker, _ = pcs._find_tracker(nbt_file)
+        legacy_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        plain = pcs._to_plain(nbt_file)
+        whole_samples, _ = pcs._search_samples(plain)
+        whole_tracker, _ = pcs._search_tracker(plain)
+        whole_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        snapshot = pcs.StorageSnapshot.from_nbt(path, stat.st_size, stat.st_mtime_ns, nbt_file)
+        direct_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        streamed = pcs._stream_zdash_tracker(gzip.decompress(path.read_bytes()))
+        stream_s = time.perf_counter() - started
+        assert streamed is not None, "streaming reader did not recognise the storage layout"
+        stream_samples, stream_tracker = streamed
+
+        same = legacy_samples == whole_samples == snapshot.samples and legacy_tracker == whole_tracker == snapshot.tracker
+        streamed_same = (
+            stream_samples == snapshot.samples
+            and stream_tracker == snapshot.tracker
+            and pcs._run_metrics(stream_tracker, stream_samples) == snapshot.run_metrics()
+        )
+        nbtlib_peak = _peak_bytes(lambda: pcs.StorageSnapshot.from_nbt(path, 0, 0, nbtlib.File.load(path, gzipped=True)))
+        stream_peak = _peak_bytes(lambda: pcs._stream_zdash_tracker(gzip.decompress(path.read_bytes())))
+
+        print(f"file: {stat.st_size / 1_000_000:.2f} MB gzip, samples: {len(snapshot.samples or [])}")
+        print(f"  nbtlib parse:                          {parse_s * 1000:8.1f} ms")
+        print(f"  per-level _to_plain search (before):   {legacy_s * 1000:8.1f} ms")
+        print(f"  whole-tree _to_plain + search:         {whole_s * 1000:8.1f} ms")
+        print(f"  path-addressed extraction:             {direct_s * 1000:8.1f} ms ({legacy_s / direct_s:.0f}x)")
+        print(f"  identical samples/tracker: {same}")
+        total_before = parse_s + direct_s
+        print(f"  nbtlib parse + extraction:             {total_before * 1000:8.1f} ms, peak {nbtlib_peak / 1e6:.1f} MB")
+        print(
+            f"  streaming reader (gunzip + decode):    {stream_s * 1000:8.1f} ms, peak {stream_peak / 1e6:.1f} MB"
+            f" ({total_before / stream_s:.0f}x)"
+        )
+        print(f"  streaming reader matches nbtlib: {streamed_same}")
+    return 0
+
+
+def _pack_heightmap(values: list[int], data_version: int) -> list[int]:
+    """Inverse of parse_command_storage._unpack_heightmap (unsigned longs, as anvil-parser writes them)."""
+    bits = 9
+    words: list[int] = []
+    if data_version >= 2529:
+        per_long = 64 // bits
+        for start in range(0, len(values), per_long):
+            word = 0
+            for i, value in enumerate(values[start : start + per_long]):
+                word |= value << (i * bits)
+            words.append(word)
+    else:
+        packed = 0
+        for i, value in enumerate(values):
+            packed |= value << (i * bits)
+        words = [(packed >> (64 * i)) & 0xFFFFFFFFFFFFFFFF for i in range(-(-len(values) * bits // 64))]
+    return words
+
+
+def _write_synthetic_end_world(world_dir: Path, *, heightmaps: bool = True, seed: int = 5) -> dict[str, int]:
+    """DIM1 regions with a bedrock-capped obsidian tower at each MPK node; returns each cap's y."""
+    import anvil
+    from nbt import nbt
+
+    import scripts.parse_command_storage as pcs
+
+    class _SurfaceChunk(anvil.EmptyChunk):
+        # EmptyChunk writes no Heightmaps; add WORLD_SURFACE like the game does.
+        __slots__ = ("surface",)
+
+        def save(self) -> nbt.NBTFile:
+            root = super().save()
+            heightmaps = nbt.TAG_Compound()
+            heightmaps.name = "Heightmaps"
+            surface = nbt.TAG_Long_Array(name="WORLD_SURFACE")
+            surface.value = _pack_heightmap(self.surface, self.version)
+            heightmaps.tags.append(surface)
+            root["Level"].tags.append(heightmaps)
+            return root
+
+    rng = random.Random(seed)
+    chunks: dict[tuple[int, int], anvil.EmptyChunk] = {}
+
+    def put(block: anvil.Block, x: int, y: int, z: int) -> None:
+        key = (x // 16, z // 16)
+        chunk = chunks.get(key)
+        if chunk is None:
+            chunk = chunks[key] = (_SurfaceChunk if heightmaps else anvil.EmptyChunk)(*key)
+            if heightmaps:
+                chunk.surface = [0] * 256
+        chunk.set_block(block, x & 15, y, z & 15)
+        if heightmaps:
+            column = (z & 15) * 16 + (x & 15)
+            chunk.surface[column] = max(chunk.surface[column], y + 1)
+
+    end_stone = anvil.Block("minecraft", "end_stone")
+    obsidian = anvil.Block("minecraft", "obsidian")
+    caps: dict[str, int] = {}
+    for name, (x0, z0) in pcs.TOWER_NODE_COLUMNS.items():
+        cap = rng.randrange(76, 104)
+        caps[name] = cap
+        for dx in range(-4, 5):
+            for dz in range(-4, 5):
+                for y in range(56, 61):
+                    put(end_stone, x0 + dx, y, z0 + dz)
+                if dx * dx + dz * dz <= 9:
+                    for y in range(61, cap):
+                        put(obsidian, x0 + dx, y, z0 + dz)
+        put(anvil.Block("minecraft", "bedrock"), x0, cap, z0)
+
+    regions: dict[tuple[int, int], anvil.EmptyRegion] = {}
+    for (cx, cz), chunk in chunks.items():
+        region = regions.get((cx // 32, cz // 32))
+        if region is None:
+            region = regions[(cx // 32, cz // 32)] = anvil.EmptyRegion(cx // 32, cz // 32)
+        region.add_chunk(chunk)
+    region_dir = world_dir / "DIM1" / "region"
+    region_dir.mkdir(parents=True, exist_ok=True)
+    for (rx, rz), region in regions.items():
+        region.save(str(region_dir / f"r.{rx}.{rz}.mca"))
+    return caps
+
+
+def _bedrock_y_near_scan(world_dir: Path, x: int, z: int, radius: int) -> int | None:
+    """The lookup EndTowerReader replaced: reopen the region per column, probe y=255 down."""
+    import anvil
+
+    best = None
+    for px in range(x - radius, x + radius + 1):
+        for pz in range(z - radius, z + radius + 1):
+            cx, cz = px // 16, pz // 16
+            region_path = world_dir / "DIM1" / "region" / f"r.{cx // 32}.{cz // 32}.mca"
+            if not region_path.exists():
+                continue
+            chunk = anvil.Region.from_file(str(region_path)).get_chunk(cx % 32, cz % 32)
+            for y in range(255, -1, -1):
+                if "bedrock" in str(chunk.get_block(px & 15, y, pz & 15).id):
+                    best = y if best is None else max(best, y)
+                    break
+    return best
+
+
+def bench_towers(args: argparse.Namespace) -> int:
+    import scripts.parse_command_storage as pcs
+
+    if pcs.anvil is None:
+        print("(skipped: anvil-parser not installed)")
+        return 0
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"radius: {args.radius} ({len(pcs.TOWER_NODE_COLUMNS) * (2 * args.radius + 1) ** 2} column lookups)")
+        for heightmaps in (False, True):
+            world_dir = Path(tmp) / ("heightmaps" if heightmaps else "palettes")
+            caps = _write_synthetic_end_world(world_dir, heightmaps=heightmaps)
+            started = time.perf_counter()
+            scanned = {
+                name: _bedrock_y_near_scan(world_dir, x, z, args.radius)
+                for name, (x, z) in pcs.TOWER_NODE_COLUMNS.items()
+            }
+            scan_s = time.perf_counter() - started
+            started = time.perf_counter()
+            read = pcs.bedrock_by_node(world_dir, radius=args.radius)
+            read_s = time.perf_counter() - started
+            label = "palettes + heightmaps" if heightmaps else "palettes only"
+            print(f"  {label}:")
+            print(f"    per-column region open + top-down scan: {scan_s * 1000:8.1f} ms")
+            print(f"    EndTowerReader:                          {read_s * 1000:8.1f} ms ({scan_s / read_s:.0f}x)")
+            print(f"    same heights: {scanned == read == caps}")
+    return 0
+
+
+def _peak_bytes(fn) -> int:
+    import tracemalloc
+
+    tracemalloc.start()
+    try:
+        result = fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        del result
+        tracemalloc.stop()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the ingest and parse paths.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    catchup = sub.add_parser("catchup", help="Log catch-up throughput (MB/s) including raw event inserts.")
+    catchup.add_argument("--log", help="Recorded latest.log to replay (default: synthetic log).")
+    catchup.add_argument("--size-mb", type=float, default=50.0, help="Synthetic log size in MB.")
+    catchup.set_defaults(func=bench_catchup)
+
+    prefilter = sub.add_parser("prefilter", help="Line parse + tracker dispatch decision throughput.")
+    prefilter.add_argument("--log", help="Recorded latest.log to replay (default: synthetic lines).")
+    prefilter.add_argument("--lines", type=int, default=400_000, help="Synthetic line count.")
+    prefilter.set_defaults(func=bench_prefilter)
+
+    classify = sub.add_parser("classify", help="Dragon-path node classification + rotation on long runs.")
+    classify.add_argument("--samples", type=int, default=50_000, help="Synthetic sample count.")
+    classify.set_defaults(func=bench_classify)
+
+    attribution = sub.add_parser("attribution", help="Damage-to-explosion matching on long runs.")
+    attribution.add_argument("--uses", type=int, default=2000, help="Synthetic explode events.")
+    attribution.set_defaults(func=bench_attribution)
+
+    storage = sub.add_parser("storage", help="command_storage_zdash.dat decode + samples/tracker extraction.")
+    storage.add_argument("--file", help="Recorded command_storage_zdash.dat (default: synthetic file).")
+    storage.add_argument("--samples", type=int, default=60_000, help="Synthetic sample count.")
+    storage.add_argument("--damage-events", type=int, default=400, help="Synthetic damage/explode event count.")
+    storage.set_defaults(func=bench_storage)
+
+    towers = sub.add_parser("towers", help="End tower bedrock lookups (bedrock_by_node) on a synthetic world.")
+    towers.add_argument("--radius", type=int, default=4, help="Search radius around each node column.")
+    towers.set_defaults(func=bench_towers)
+
+    args = parser.parse_args()
+    return int(args.func(args))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -2,17 +2,36 @@
 
 from __future__ import annotations
 
+from array import array
 import argparse
+from bisect import bisect_right
+from collections import OrderedDict, deque
+from collections.abc import Sequence
 import gzip
 import math
 from pathlib import Path
-from typing import Any
+import struct
+import threading
+from typing import Any, Iterator
 
 import nbtlib
 try:
     import anvil  # type: ignore
 except Exception:  # pragma: no cover - optional dependency
     anvil = None
+try:
+    import numpy as np  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    np = None
+
+# Below this many samples the plain loops beat NumPy's per-call overhead.
+VECTORIZE_MIN_SAMPLES = 256
+NODE_CENTERS = {
+    "back_diag": (-30.0, 27.0),
+    "front_diag": (29.0, -29.0),
+    "back_straight": (-21.0, 0.0),
+    "front_straight": (20.0, 0.0),
+}
 
 
 def _to_plain(value: Any) -> Any:
@@ -32,7 +51,10 @@ def _to_plain(value: Any) -> Any:
 
 
 def _find_samples(node: Any, path: str = "") -> tuple[list[dict[str, Any]] | None, str | None]:
-    plain = _to_plain(node)
+    return _search_samples(_to_plain(node), path)
+
+
+def _search_samples(plain: Any, path: str = "") -> tuple[list[dict[str, Any]] | None, str | None]:
     if isinstance(plain, dict):
         maybe = plain.get("samples")
         if isinstance(maybe, list):
@@ -40,45 +62,324 @@ def _find_samples(node: Any, path: str = "") -> tuple[list[dict[str, Any]] | Non
                 return maybe, (path + ".samples" if path else "samples")
         for k, v in plain.items():
             child_path = f"{path}.{k}" if path else str(k)
-            found, found_path = _find_samples(v, child_path)
+            found, found_path = _search_samples(v, child_path)
             if found is not None:
                 return found, found_path
     elif isinstance(plain, list):
         for i, v in enumerate(plain):
             child_path = f"{path}[{i}]"
-            found, found_path = _find_samples(v, child_path)
+            found, found_path = _search_samples(v, child_path)
             if found is not None:
                 return found, found_path
     return None, None
 
 
 def _find_tracker(node: Any, path: str = "") -> tuple[dict[str, Any] | None, str | None]:
-    plain = _to_plain(node)
+    return _search_tracker(_to_plain(node), path)
+
+
+def _search_tracker(plain: Any, path: str = "") -> tuple[dict[str, Any] | None, str | None]:
     if isinstance(plain, dict):
         maybe = plain.get("tracker")
         if isinstance(maybe, dict):
             return maybe, (path + ".tracker" if path else "tracker")
         for k, v in plain.items():
             child_path = f"{path}.{k}" if path else str(k)
-            found, found_path = _find_tracker(v, child_path)
+            found, found_path = _search_tracker(v, child_path)
             if found is not None:
                 return found, found_path
     elif isinstance(plain, list):
         for i, v in enumerate(plain):
             child_path = f"{path}[{i}]"
-            found, found_path = _find_tracker(v, child_path)
+            found, found_path = _search_tracker(v, child_path)
             if found is not None:
                 return found, found_path
     return None, None
 
 
-def _classify_node(samples: list[dict[str, Any]], *, window_ticks: int) -> dict[str, int]:
-    nodes = {
-        "back_diag": (-30.0, 27.0),
-        "front_diag": (29.0, -29.0),
-        "back_straight": (-21.0, 0.0),
-        "front_straight": (20.0, 0.0),
-    }
+class CompoundColumns(Sequence):
+    """A fixed-schema NBT compound list (samples, damage events) held column-wise.
+
+    Every field is an integer tag, so each column is one ``array('q')``. It reads
+    like the list of plain dicts ``_to_plain`` would give; rows are built on access.
+    """
+
+    __slots__ = ("names", "columns")
+
+    def __init__(self, names: tuple[str, ...], columns: tuple[array, ...]) -> None:
+        self.names = names
+        self.columns = columns
+
+    def __len__(self) -> int:
+        return len(self.columns[0]) if self.columns else 0
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return {name: column[index] for name, column in zip(self.names, self.columns)}
+
+    def __iter__(self) -> Iterator[dict[str, int]]:
+        names = self.names
+        for values in zip(*self.columns):
+            yield dict(zip(names, values))
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (list, CompoundColumns)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def column(self, name: str) -> array | None:
+        try:
+            return self.columns[self.names.index(name)]
+        except ValueError:
+            return None
+
+
+_TAG_END, _TAG_COMPOUND, _TAG_LIST, _TAG_STRING = 0, 10, 9, 8
+_INT_TAG_FORMATS = {1: "b", 2: "h", 3: "i", 4: "q"}
+_FLOAT_TAG_FORMATS = {5: "f", 6: "d"}
+_ARRAY_TAG_FORMATS = {7: "b", 11: "i", 12: "q"}
+_SCALAR_SIZES = {1: 1, 2: 2, 3: 4, 4: 8, 5: 4, 6: 8}
+_U16 = struct.Struct(">H")
+_I32 = struct.Struct(">i")
+
+
+class _NbtReader:
+    """Decodes big-endian NBT straight from the decompressed bytes.
+
+    Values come out in the same plain form ``_to_plain`` produces from nbtlib
+    tags (except byte/int/long arrays, which become lists), subtrees that are not
+    asked for are skipped without building anything, and compound lists whose
+    elements all share one integer-only layout are unpacked in a single
+    ``struct.iter_unpack`` pass into ``CompoundColumns``.
+    """
+
+    __slots__ = ("buf", "pos")
+
+    def __init__(self, buf: bytes) -> None:
+        self.buf = memoryview(buf)
+        self.pos = 0
+
+    def tag(self) -> int:
+        value = self.buf[self.pos]
+        self.pos += 1
+        return value
+
+    def name(self) -> str:
+        (length,) = _U16.unpack_from(self.buf, self.pos)
+        start = self.pos + 2
+        self.pos = start + length
+        return bytes(self.buf[start : self.pos]).decode("utf-8", errors="replace")
+
+    def _count(self) -> int:
+        (count,) = _I32.unpack_from(self.buf, self.pos)
+        self.pos += 4
+        return max(0, count)
+
+    def _unpack(self, fmt: str, count: int) -> tuple[Any, ...]:
+        values = struct.unpack_from(f">{count}{fmt}", self.buf, self.pos)
+        self.pos += count * struct.calcsize(fmt)
+        return values
+
+    def find(self, path: tuple[str, ...]) -> int | None:
+        """Position the reader at the payload of ``path`` (root compound first)."""
+        if self.tag() != _TAG_COMPOUND:
+            return None
+        self.name()
+        tag = _TAG_COMPOUND
+        for key in path:
+            if tag != _TAG_COMPOUND:
+                return None
+            while True:
+                tag = self.tag()
+                if tag == _TAG_END:
+                    return None
+                if self.name() == key:
+                    break
+                self.skip(tag)
+        return tag
+
+    def skip(self, tag: int) -> None:
+        if tag in _SCALAR_SIZES:
+            self.pos += _SCALAR_SIZES[tag]
+        elif tag == _TAG_STRING:
+            (length,) = _U16.unpack_from(self.buf, self.pos)
+            self.pos += 2 + length
+        elif tag in _ARRAY_TAG_FORMATS:
+            count = self._count()
+            self.pos += count * struct.calcsize(_ARRAY_TAG_FORMATS[tag])
+        elif tag == _TAG_LIST:
+            element = self.tag()
+            count = self._count()
+            if element in _SCALAR_SIZES:
+                self.pos += count * _SCALAR_SIZES[element]
+            else:
+                for _ in range(count):
+                    self.skip(element)
+        elif tag == _TAG_COMPOUND:
+            while True:
+                child = self.tag()
+                if child == _TAG_END:
+                    return
+                self.name()
+                self.skip(child)
+        else:
+            raise ValueError(f"unknown NBT tag {tag}")
+
+    def value(self, tag: int) -> Any:
+        if tag in _INT_TAG_FORMATS:
+            return self._unpack(_INT_TAG_FORMATS[tag], 1)[0]
+        if tag in _FLOAT_TAG_FORMATS:
+            return _to_plain(self._unpack(_FLOAT_TAG_FORMATS[tag], 1)[0])
+        if tag == _TAG_STRING:
+            return _to_plain(self.name())
+        if tag in _ARRAY_TAG_FORMATS:
+            return list(self._unpack(_ARRAY_TAG_FORMATS[tag], self._count()))
+        if tag == _TAG_LIST:
+            element = self.tag()
+            count = self._count()
+            if element in _INT_TAG_FORMATS:
+                return list(self._unpack(_INT_TAG_FORMATS[element], count))
+            if element in _FLOAT_TAG_FORMATS:
+                return [_to_plain(v) for v in self._unpack(_FLOAT_TAG_FORMATS[element], count)]
+            if element == _TAG_COMPOUND and count:
+                columns = self._compound_columns(count)
+                if columns is not None:
+                    return columns
+            return [self.value(element) for _ in range(count)]
+        if tag == _TAG_COMPOUND:
+            out: dict[str, Any] = {}
+            while True:
+                child = self.tag()
+                if child == _TAG_END:
+                    return out
+                key = self.name()
+                out[key] = self.value(child)
+        raise ValueError(f"unknown NBT tag {tag}")
+
+    def _compound_columns(self, count: int) -> CompoundColumns | None:
+        # Lay out the first element; if every element repeats it byte-for-byte
+        # apart from the values, the whole list is one fixed-size record array.
+        start = self.pos
+        names: list[str] = []
+        fmt = ">"
+        header_spans: list[tuple[int, int]] = []
+        while True:
+            header_start = self.pos - start
+            tag = self.tag()
+            if tag == _TAG_END:
+                header_spans.append((header_start, self.pos - start))
+                break
+            if tag not in _INT_TAG_FORMATS:
+                self.pos = start
+                return None
+            names.append(self.name())
+            header_spans.append((header_start, self.pos - start))
+            fmt += f"{self.pos - start - header_start}x{_INT_TAG_FORMATS[tag]}"
+            self.pos += _SCALAR_SIZES[tag]
+        fmt += "x"
+        self.pos = start
+        record = struct.calcsize(fmt)
+        end = start + record * count
+        if not names or end > len(self.buf):
+            return None
+        records = self.buf[start:end]
+        # Header bytes (tag, name) must be identical in every record: compare
+        # each header byte position as one strided slice across the list.
+        for lo, hi in header_spans:
+            for offset in range(lo, hi):
+                expected = records[offset]
+                if records[offset::record].tobytes() != bytes((expected,)) * count:
+                    return None
+        self.pos = end
+        columns = tuple(array("q", column) for column in zip(*struct.iter_unpack(fmt, records)))
+        return CompoundColumns(tuple(names), columns)
+
+
+def _stream_zdash_tracker(data: bytes) -> tuple[Sequence[dict[str, Any]], dict[str, Any]] | None:
+    """Decode only ``data.contents.tracker`` from a decompressed storage file.
+
+    Returns ``(samples, tracker)`` like ``_extract_zdash_tracker`` or None when
+    the layout is different (the caller then falls back to nbtlib).
+    """
+    reader = _NbtReader(data)
+    tag = reader.find(ZDASH_TRACKER_PATH)
+    if tag != _TAG_COMPOUND:
+        return None
+    tracker = reader.value(tag)
+    samples = tracker.get("samples")
+    if isinstance(samples, CompoundColumns):
+        if not {"x", "y", "z"}.issubset(samples.names):
+            return None
+    elif not isinstance(samples, list) or not all(
+        isinstance(s, dict) and {"x", "y", "z"}.issubset(s.keys()) for s in samples
+    ):
+        return None
+    return samples, tracker
+
+
+class SampleArrays:
+    """Sample ``x``/``z``/``gt`` columns loaded into NumPy arrays once."""
+
+    __slots__ = ("x", "z", "gt")
+
+    def __init__(self, samples: Sequence[dict[str, Any]]) -> None:
+        count = len(samples)
+        if isinstance(samples, CompoundColumns):
+            # Already int64 columns: wrap the buffers instead of walking rows.
+            self.x, self.z, self.gt = (
+                np.frombuffer(column, dtype=np.int64) if column is not None else np.zeros(count, dtype=np.int64)
+                for column in (samples.column("x"), samples.column("z"), samples.column("gt"))
+            )
+            return
+        self.x = np.fromiter((int(s.get("x", 0)) for s in samples), dtype=np.int64, count=count)
+        self.z = np.fromiter((int(s.get("z", 0)) for s in samples), dtype=np.int64, count=count)
+        self.gt = np.fromiter((int(s.get("gt", 0)) for s in samples), dtype=np.int64, count=count)
+
+    def window(self, window_ticks: int) -> tuple[Any, Any]:
+        # Same cut as the loops: stop at the first sample past the window,
+        # scaled back to blocks.
+        if self.gt.size == 0:
+            return self.x / 1000.0, self.z / 1000.0
+        over = np.flatnonzero(self.gt > int(self.gt[0]) + window_ticks)
+        end = int(over[0]) if over.size else int(self.gt.size)
+        return self.x[:end] / 1000.0, self.z[:end] / 1000.0
+
+
+def _sample_arrays(samples: list[dict[str, Any]] | None) -> SampleArrays | None:
+    if np is None or not samples or len(samples) < VECTORIZE_MIN_SAMPLES:
+        return None
+    return SampleArrays(samples)
+
+
+def _classify_node(
+    samples: list[dict[str, Any]],
+    *,
+    window_ticks: int,
+    arrays: SampleArrays | None = None,
+) -> dict[str, int]:
+    if arrays is None:
+        arrays = _sample_arrays(samples)
+    if arrays is not None:
+        return _classify_node_vectorized(arrays, window_ticks=window_ticks)
+    return _classify_node_python(samples, window_ticks=window_ticks)
+
+
+def _classify_node_vectorized(arrays: SampleArrays, *, window_ticks: int) -> dict[str, int]:
+    x, z = arrays.window(window_ticks)
+    names = list(NODE_CENTERS)
+    if x.size == 0:
+        return {k: 0 for k in names}
+    dist = np.stack([np.hypot(x - nx, z - nz) for nx, nz in NODE_CENTERS.values()])
+    # argmin keeps the first node on ties, like the strict "<" in the loop.
+    counts = np.bincount(np.argmin(dist, axis=0), minlength=len(names))
+    return {name: int(counts[i]) for i, name in enumerate(names)}
+
+
+def _classify_node_python(samples: list[dict[str, Any]], *, window_ticks: int) -> dict[str, int]:
+    nodes = NODE_CENTERS
     counts = {k: 0 for k in nodes}
     if not samples:
         return counts
@@ -102,29 +403,51 @@ def _classify_node(samples: list[dict[str, Any]], *, window_ticks: int) -> dict[
     return counts
 
 
-def dominant_node_from_storage(path: Path, window_ticks: int = 600) -> tuple[str | None, dict[str, int]]:
-    if not path.exists():
-        return None, {}
-    with gzip.open(path, "rb") as f:
-        nbt_file = nbtlib.File.parse(f)
-    samples, _ = _find_samples(nbt_file)
+def _dominant_node(
+    samples: list[dict[str, Any]] | None,
+    window_ticks: int,
+    arrays: SampleArrays | None = None,
+) -> tuple[str | None, dict[str, int]]:
     if not samples:
         return None, {}
-    counts = _classify_node(samples, window_ticks=window_ticks)
+    counts = _classify_node(samples, window_ticks=window_ticks, arrays=arrays)
     if not counts:
         return None, counts
     dominant = max(counts.items(), key=lambda kv: kv[1])[0]
     return dominant, counts
 
 
-def rotation_from_storage(path: Path, window_ticks: int = 600) -> str:
-    if not path.exists():
-        return "unknown"
-    with gzip.open(path, "rb") as f:
-        nbt_file = nbtlib.File.parse(f)
-    samples, _ = _find_samples(nbt_file)
+def _rotation(
+    samples: list[dict[str, Any]] | None,
+    window_ticks: int,
+    arrays: SampleArrays | None = None,
+) -> str:
     if not samples:
         return "unknown"
+    if arrays is None:
+        arrays = _sample_arrays(samples)
+    if arrays is not None:
+        net = _net_angle_vectorized(arrays, window_ticks)
+    else:
+        net = _net_angle_python(samples, window_ticks)
+    if abs(net) < 0.2:
+        return "unknown"
+    return "ccw" if net > 0 else "cw"
+
+
+def _net_angle_vectorized(arrays: SampleArrays, window_ticks: int) -> float:
+    x, z = arrays.window(window_ticks)
+    if x.size < 2:
+        return 0.0
+    delta = np.diff(np.arctan2(z, x))
+    # |delta| < 2*pi, so one correction matches the loop's while-unwrapping.
+    delta = np.where(delta <= -math.pi, delta + 2 * math.pi, delta)
+    delta = np.where(delta > math.pi, delta - 2 * math.pi, delta)
+    # cumsum accumulates left to right like the loop (np.sum would pair-sum).
+    return float(np.cumsum(delta)[-1])
+
+
+def _net_angle_python(samples: list[dict[str, Any]], window_ticks: int) -> float:
     first_gt = int(samples[0].get("gt", 0))
     max_gt = first_gt + window_ticks
     last_angle = None
@@ -144,13 +467,25 @@ def rotation_from_storage(path: Path, window_ticks: int = 600) -> str:
                 delta -= 2 * math.pi
             net += delta
         last_angle = angle
-    if abs(net) < 0.2:
+    return net
+
+
+def dominant_node_from_storage(path: Path, window_ticks: int = 600) -> tuple[str | None, dict[str, int]]:
+    snapshot = load_storage_snapshot(path)
+    if snapshot is None:
+        return None, {}
+    return snapshot.dominant_node(window_ticks)
+
+
+def rotation_from_storage(path: Path, window_ticks: int = 600) -> str:
+    snapshot = load_storage_snapshot(path)
+    if snapshot is None:
         return "unknown"
-    return "ccw" if net > 0 else "cw"
+    return snapshot.rotation(window_ticks)
 
 
 def _parse_explode_events(raw_events: Any) -> list[dict[str, int]]:
-    if not isinstance(raw_events, list):
+    if not isinstance(raw_events, (list, CompoundColumns)):
         return []
     parsed: list[dict[str, int]] = []
     for item in raw_events:
@@ -170,7 +505,7 @@ def _parse_explode_events(raw_events: Any) -> list[dict[str, int]]:
 
 
 def _parse_damage_events(raw_events: Any) -> list[dict[str, int]]:
-    if not isinstance(raw_events, list):
+    if not isinstance(raw_events, (list, CompoundColumns)):
         return []
     parsed: list[dict[str, int]] = []
     for item in raw_events:
@@ -199,6 +534,63 @@ def _parse_damage_events(raw_events: Any) -> list[dict[str, int]]:
     return parsed
 
 
+def _map_damage_events(damage_events: list[dict[str, int]]) -> list[dict[str, Any]]:
+    return [
+        {
+            "gt": int(ev["gt"]),
+            "hp_diff_scaled": int(ev["hp_diff_scaled"]),
+            "explode_beds": int(ev.get("explode_beds", 0)),
+            "explode_anchors": int(ev.get("explode_anchors", 0)),
+            "near_bed_drop": int(ev.get("near_bed_drop", 0)),
+            "near_anchor_drop": int(ev.get("near_anchor_drop", 0)),
+            "source": "other",
+            "matched_use_gt": None,
+            "matched_dt": None,
+        }
+        for ev in damage_events
+    ]
+
+
+class _UseIndex:
+    """Unused explosion uses of one source, grouped by tick.
+
+    ``latest(gt)`` finds the newest tick <= gt that still has an unused use in
+    O(log n): groups that run dry are linked to their left neighbour
+    (union-find with path compression), so exhausted ticks are skipped once.
+    """
+
+    __slots__ = ("ticks", "uses", "_left")
+
+    def __init__(self, uses: list[tuple[int, int]]) -> None:
+        # uses: (use_gt, use_idx) in use_idx order.
+        groups: dict[int, deque[int]] = {}
+        for use_gt, use_idx in uses:
+            groups.setdefault(use_gt, deque()).append(use_idx)
+        self.ticks = sorted(groups)
+        self.uses = [groups[tick] for tick in self.ticks]
+        self._left = list(range(len(self.ticks)))
+
+    def _find(self, i: int) -> int:
+        left = self._left
+        root = i
+        while root >= 0 and left[root] != root:
+            root = left[root]
+        while i >= 0 and left[i] != i:
+            left[i], i = root, left[i]
+        return root
+
+    def latest(self, gt: int) -> int:
+        """Group index of the newest unused tick <= gt, or -1."""
+        return self._find(bisect_right(self.ticks, gt) - 1)
+
+    def take(self, group: int) -> int:
+        group_uses = self.uses[group]
+        use_idx = group_uses.popleft()
+        if not group_uses:
+            self._left[group] = group - 1
+        return use_idx
+
+
 def _attribute_damage_from_events(
     explode_events: list[dict[str, int]],
     damage_events: list[dict[str, int]],
@@ -208,6 +600,86 @@ def _attribute_damage_from_events(
     bed_window_ticks: int = 220,
     anchor_window_ticks: int = 320,
 ) -> tuple[int, int, int, list[dict[str, Any]]]:
+    """Match each damage event to the explosion that most likely caused it.
+
+    Same matches as ``_attribute_damage_from_events_scan``: per damage event
+    (strongest first) take the latest unused use at or before it within the
+    source's window, earliest-listed use on equal ticks. Uses are indexed per
+    source by tick, so each lookup is a bisect instead of a scan.
+    """
+    bed_uses: list[tuple[int, int]] = []
+    anchor_uses: list[tuple[int, int]] = []
+    use_idx = 0
+    for ev in explode_events:
+        for _ in range(max(0, ev["explode_beds"])):
+            bed_uses.append((ev["gt"], use_idx))
+            use_idx += 1
+        for _ in range(max(0, ev["explode_anchors"])):
+            anchor_uses.append((ev["gt"], use_idx))
+            use_idx += 1
+    indexes = (("bed", _UseIndex(bed_uses)), ("anchor", _UseIndex(anchor_uses)))
+
+    mapped = _map_damage_events(damage_events)
+    # Match strongest hits first so chip damage does not consume the best use events.
+    dmg_order = sorted(
+        range(len(mapped)),
+        key=lambda idx: (-int(mapped[idx]["hp_diff_scaled"]), int(mapped[idx]["gt"])),
+    )
+
+    def _match_damage_events(*, bed_window: int, anchor_window: int) -> None:
+        windows = {"bed": bed_window, "anchor": anchor_window}
+        for idx in dmg_order:
+            ev = mapped[idx]
+            if ev["source"] != "other":
+                continue
+            dmg_gt = int(ev["gt"])
+            best: tuple[int, int, str, _UseIndex, int] | None = None
+            for source, index in indexes:
+                group = index.latest(dmg_gt)
+                if group < 0:
+                    continue
+                use_gt = index.ticks[group]
+                if dmg_gt - use_gt > windows[source]:
+                    continue
+                # Prefer nearest use first, then the earliest-listed use on that tick.
+                key = (-use_gt, index.uses[group][0])
+                if best is None or key < best[:2]:
+                    best = (*key, source, index, group)
+            if best is None:
+                continue
+            _, _, source, index, group = best
+            use_gt = index.ticks[group]
+            index.take(group)
+            ev["source"] = source
+            ev["matched_use_gt"] = use_gt
+            ev["matched_dt"] = dmg_gt - use_gt
+
+    # Tight pass catches obvious direct matches; wide pass catches delayed explosions.
+    _match_damage_events(
+        bed_window=tight_bed_window_ticks,
+        anchor_window=tight_anchor_window_ticks,
+    )
+    _match_damage_events(
+        bed_window=bed_window_ticks,
+        anchor_window=anchor_window_ticks,
+    )
+
+    bed_scaled = sum(int(ev["hp_diff_scaled"]) for ev in mapped if ev["source"] == "bed")
+    anchor_scaled = sum(int(ev["hp_diff_scaled"]) for ev in mapped if ev["source"] == "anchor")
+    other_scaled = sum(int(ev["hp_diff_scaled"]) for ev in mapped if ev["source"] == "other")
+    return bed_scaled, anchor_scaled, other_scaled, mapped
+
+
+def _attribute_damage_from_events_scan(
+    explode_events: list[dict[str, int]],
+    damage_events: list[dict[str, int]],
+    *,
+    tight_bed_window_ticks: int = 24,
+    tight_anchor_window_ticks: int = 48,
+    bed_window_ticks: int = 220,
+    anchor_window_ticks: int = 320,
+) -> tuple[int, int, int, list[dict[str, Any]]]:
+    """Original O(damage x uses) matcher; kept as the reference for tests and bench.py."""
     use_items: list[dict[str, Any]] = []
     for ev in explode_events:
         for _ in range(max(0, ev["explode_beds"])):
@@ -215,20 +687,7 @@ def _attribute_damage_from_events(
         for _ in range(max(0, ev["explode_anchors"])):
             use_items.append({"gt": ev["gt"], "source": "anchor", "used": False})
 
-    mapped: list[dict[str, Any]] = [
-        {
-            "gt": int(ev["gt"]),
-            "hp_diff_scaled": int(ev["hp_diff_scaled"]),
-            "explode_beds": int(ev.get("explode_beds", 0)),
-            "explode_anchors": int(ev.get("explode_anchors", 0)),
-            "near_bed_drop": int(ev.get("near_bed_drop", 0)),
-            "near_anchor_drop": int(ev.get("near_anchor_drop", 0)),
-            "source": "other",
-            "matched_use_gt": None,
-            "matched_dt": None,
-        }
-        for ev in damage_events
-    ]
+    mapped = _map_damage_events(damage_events)
 
     def _match_damage_events(*, bed_window: int, anchor_window: int) -> None:
         # Match strongest hits first so chip damage does not consume the best use events.
@@ -347,14 +806,15 @@ def _derive_explosive_usage_from_damage(
 
 
 def run_metrics_from_storage(path: Path) -> dict[str, Any]:
-    if not path.exists():
+    snapshot = load_storage_snapshot(path)
+    if snapshot is None:
         return {}
-    with gzip.open(path, "rb") as f:
-        nbt_file = nbtlib.File.parse(f)
-    tracker, _ = _find_tracker(nbt_file)
+    return snapshot.run_metrics()
+
+
+def _run_metrics(tracker: dict[str, Any] | None, samples: list[dict[str, Any]] | None) -> dict[str, Any]:
     if not tracker:
         return {}
-    samples, _ = _find_samples(nbt_file)
     last_sample_gt = int(samples[-1].get("gt", 0) or 0) if samples else 0
     sample_count = len(samples) if samples else 0
     run = tracker.get("run")
@@ -496,6 +956,199 @@ def run_metrics_from_storage(path: Path) -> dict[str, Any]:
     }
 
 
+# Where the zdash_tracker datapack keeps ``storage zdash:tracker``.
+ZDASH_TRACKER_PATH = ("data", "contents", "tracker")
+ZDASH_TRACKER_PATH_TEXT = ".".join(ZDASH_TRACKER_PATH)
+
+
+def _extract_zdash_tracker(nbt_root: Any) -> tuple[list[dict[str, Any]] | None, dict[str, Any]] | None:
+    """Walk straight to the tracker compound and convert only what is read.
+
+    Returns ``(samples, tracker)`` in the same plain form the generic search
+    yields, or None when the file does not have the expected layout.
+    """
+    node = nbt_root
+    for key in ZDASH_TRACKER_PATH:
+        if not isinstance(node, dict) or key not in node:
+            return None
+        node = node[key]
+    if not isinstance(node, dict):
+        return None
+    tracker: dict[str, Any] = {}
+    samples: list[dict[str, Any]] | None = None
+    for key, value in node.items():
+        if str(key) == "samples" and isinstance(value, list):
+            converted = []
+            for item in value:
+                if not isinstance(item, dict):
+                    converted = None
+                    break
+                # Sample fields are integer tags; int() them without _to_plain's fallbacks.
+                converted.append(
+                    {str(k): int(v) if isinstance(v, int) else _to_plain(v) for k, v in item.items()}
+                )
+            if converted is not None and all({"x", "y", "z"}.issubset(c.keys()) for c in converted):
+                samples = converted
+                tracker["samples"] = samples
+                continue
+        tracker[str(key)] = _to_plain(value)
+    if samples is None:
+        # A "samples" list the generic search would skip; it may find one elsewhere.
+        return None
+    return samples, tracker
+
+
+class StorageSnapshot:
+    """One decoded ``command_storage_*.dat``: samples and tracker subtree, parsed once.
+
+    Node classification, rotation and run metrics are all derived from the same
+    plain-Python tree instead of gunzipping and NBT-parsing the file per question.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        size: int,
+        mtime_ns: int,
+        *,
+        samples: Sequence[dict[str, Any]] | None,
+        samples_path: str | None,
+        tracker: dict[str, Any] | None,
+        tracker_path: str | None,
+    ) -> None:
+        self.path = path
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.samples = samples
+        self.samples_path = samples_path
+        self.tracker = tracker
+        self.tracker_path = tracker_path
+        self._arrays: SampleArrays | None = None
+
+    @classmethod
+    def from_nbt(cls, path: Path, size: int, mtime_ns: int, nbt_root: Any) -> StorageSnapshot:
+        extracted = _extract_zdash_tracker(nbt_root)
+        if extracted is not None:
+            samples, tracker = extracted
+            return cls(
+                path,
+                size,
+                mtime_ns,
+                samples=samples,
+                samples_path=f"{ZDASH_TRACKER_PATH_TEXT}.samples",
+                tracker=tracker,
+                tracker_path=ZDASH_TRACKER_PATH_TEXT,
+            )
+        # Unknown layout (other namespace, older pack): generic search.
+        plain = _to_plain(nbt_root)
+        samples, samples_path = _search_samples(plain)
+        tracker, tracker_path = _search_tracker(plain)
+        return cls(
+            path,
+            size,
+            mtime_ns,
+            samples=samples,
+            samples_path=samples_path,
+            tracker=tracker,
+            tracker_path=tracker_path,
+        )
+
+    @classmethod
+    def from_file(cls, path: Path) -> StorageSnapshot:
+        stat = path.stat()
+        try:
+            streamed = _stream_zdash_tracker(gzip.decompress(path.read_bytes()))
+        except (OSError, EOFError, ValueError, IndexError, struct.error):
+            # Truncated mid-write or not gzip: let nbtlib report it as before.
+            streamed = None
+        if streamed is not None:
+            samples, tracker = streamed
+            return cls(
+                path,
+                stat.st_size,
+                stat.st_mtime_ns,
+                samples=samples,
+                samples_path=f"{ZDASH_TRACKER_PATH_TEXT}.samples",
+                tracker=tracker,
+                tracker_path=ZDASH_TRACKER_PATH_TEXT,
+            )
+        with gzip.open(path, "rb") as f:
+            nbt_file = nbtlib.File.parse(f)
+        return cls.from_nbt(path, stat.st_size, stat.st_mtime_ns, nbt_file)
+
+    @property
+    def arrays(self) -> SampleArrays | None:
+        if self._arrays is None:
+            self._arrays = _sample_arrays(self.samples)
+        return self._arrays
+
+    def classify(self, window_ticks: int = 600) -> dict[str, int]:
+        return _classify_node(self.samples or [], window_ticks=window_ticks, arrays=self.arrays)
+
+    def dominant_node(self, window_ticks: int = 600) -> tuple[str | None, dict[str, int]]:
+        return _dominant_node(self.samples, window_ticks, self.arrays)
+
+    def rotation(self, window_ticks: int = 600) -> str:
+        return _rotation(self.samples, window_ticks, self.arrays)
+
+    def run_metrics(self) -> dict[str, Any]:
+        # Built fresh per call: callers may mutate the returned event lists.
+        return _run_metrics(self.tracker, self.samples)
+
+    def run_finalized(self) -> bool | None:
+        """The zdash_tracker end_run handshake, as saved in this file.
+
+        True once the latest started run (``meta.run_seq``) has ``run.seq``
+        equal to it and ``run.finalized`` set; None for datapacks that predate
+        the handshake.
+        """
+        tracker = self.tracker or {}
+        meta = tracker.get("meta") if isinstance(tracker.get("meta"), dict) else {}
+        run = tracker.get("run") if isinstance(tracker.get("run"), dict) else {}
+        run_seq = meta.get("run_seq")
+        if not isinstance(run_seq, int) or "seq" not in run:
+            return None
+        return run_seq > 0 and run.get("seq") == run_seq and bool(run.get("finalized", 0))
+
+
+_SNAPSHOT_CACHE_SIZE = 8
+_snapshot_cache: OrderedDict[tuple[str, int, int], StorageSnapshot] = OrderedDict()
+_snapshot_cache_lock = threading.Lock()
+
+
+def load_storage_snapshot(path: Path) -> StorageSnapshot | None:
+    """Decode ``path`` once per (path, size, mtime); unchanged files come from cache."""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    key = (str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+    with _snapshot_cache_lock:
+        cached = _snapshot_cache.get(key)
+        if cached is not None:
+            _snapshot_cache.move_to_end(key)
+            return cached
+    snapshot = StorageSnapshot.from_file(path)
+    after = path.stat()
+    if (snapshot.size, snapshot.mtime_ns, after.st_size, after.st_mtime_ns) != key[1:] * 2:
+        # Rewritten while we were reading: hand it out but do not cache it.
+        return snapshot
+    with _snapshot_cache_lock:
+        _snapshot_cache[key] = snapshot
+        while len(_snapshot_cache) > _SNAPSHOT_CACHE_SIZE:
+            _snapshot_cache.popitem(last=False)
+    return snapshot
+
+
+def storage_run_finalized(path: Path) -> bool | None:
+    """``StorageSnapshot.run_finalized`` for ``path``; False while unreadable (mid-write)."""
+    try:
+        snapshot = load_storage_snapshot(path)
+    except Exception:
+        return False
+    return snapshot.run_finalized() if snapshot is not None else False
+
+
 def parse_storage_file(
     path: Path,
     limit: int | None = None,
@@ -507,11 +1160,8 @@ def parse_storage_file(
         print(f"File not found: {path}")
         return 2
 
-    with gzip.open(path, "rb") as f:
-        nbt_file = nbtlib.File.parse(f)
-
-    root = nbt_file
-    samples, samples_path = _find_samples(root)
+    snapshot = StorageSnapshot.from_file(path)
+    samples, samples_path = snapshot.samples, snapshot.samples_path
     if samples is None:
         print("No samples list found in this file.")
         print("Tip: ensure your storage key contains a `samples` list with {x,y,z,gt} entries.")
@@ -551,59 +1201,197 @@ def parse_storage_file(
     return 0
 
 
-def _bedrock_y_at(world_dir: Path, x: int, z: int) -> int | None:
-    if anvil is None:
-        return None
-    region_dir = world_dir / "DIM1" / "region"
-    if not region_dir.exists():
-        return None
-    cx = x // 16
-    cz = z // 16
-    rx = cx // 32
-    rz = cz // 32
-    region_path = region_dir / f"r.{rx}.{rz}.mca"
-    if not region_path.exists():
-        return None
+def _unpack_heightmap(longs: Any, data_version: int) -> list[int] | None:
+    """Decode a 256-entry, 9-bit Heightmaps long array (value = highest block y + 1)."""
     try:
-        region = anvil.Region.from_file(str(region_path))
-        local_cx = cx - (rx * 32)
-        local_cz = cz - (rz * 32)
-        chunk = region.get_chunk(local_cx, local_cz)
+        words = [int(v) & 0xFFFFFFFFFFFFFFFF for v in longs]
     except Exception:
         return None
-    lx = x & 15
-    lz = z & 15
-    for y in range(255, -1, -1):
+    bits = 9
+    mask = (1 << bits) - 1
+    values: list[int] = []
+    if data_version >= 2529:
+        # 20w17a+: entries never straddle two longs (7 per long).
+        per_long = 64 // bits
+        for word in words:
+            for i in range(per_long):
+                if len(values) == 256:
+                    break
+                values.append((word >> (i * bits)) & mask)
+    else:
+        for i in range(256):
+            bit = i * bits
+            index, offset = divmod(bit, 64)
+            if index >= len(words):
+                return None
+            value = words[index] >> offset
+            if offset + bits > 64 and index + 1 < len(words):
+                value |= words[index + 1] << (64 - offset)
+            values.append(value & mask)
+    return values if len(values) == 256 else None
+
+
+class EndTowerReader:
+    """Bedrock heights from a world's End region files, each region and chunk decoded once.
+
+    Column queries skip every section whose palette has no bedrock and start at
+    the chunk's WORLD_SURFACE heightmap instead of y=255; a plain top-down scan
+    is only used for chunks without palettes or heightmaps.
+    """
+
+    def __init__(self, world_dir: Path) -> None:
+        self.region_dir = world_dir / "DIM1" / "region"
+        self._regions: dict[tuple[int, int], Any | None] = {}
+        self._chunks: dict[tuple[int, int], Any | None] = {}
+        self._surface: dict[tuple[int, int], list[int] | None] = {}
+        self._bedrock_sections: dict[tuple[int, int], list[int] | None] = {}
+
+    def _region(self, rx: int, rz: int) -> Any | None:
+        key = (rx, rz)
+        if key not in self._regions:
+            region_path = self.region_dir / f"r.{rx}.{rz}.mca"
+            region = None
+            if anvil is not None and region_path.exists():
+                try:
+                    region = anvil.Region.from_file(str(region_path))
+                except Exception:
+                    region = None
+            self._regions[key] = region
+        return self._regions[key]
+
+    def _chunk(self, cx: int, cz: int) -> Any | None:
+        key = (cx, cz)
+        if key not in self._chunks:
+            chunk = None
+            region = self._region(cx // 32, cz // 32)
+            if region is not None:
+                try:
+                    chunk = region.get_chunk(cx - (cx // 32) * 32, cz - (cz // 32) * 32)
+                except Exception:
+                    chunk = None
+            self._chunks[key] = chunk
+        return self._chunks[key]
+
+    def _chunk_surface(self, key: tuple[int, int], chunk: Any) -> list[int] | None:
+        if key not in self._surface:
+            surface = None
+            try:
+                longs = chunk.data["Heightmaps"]["WORLD_SURFACE"]
+                surface = _unpack_heightmap(longs, int(getattr(chunk, "version", 0) or 0))
+            except Exception:
+                surface = None
+            self._surface[key] = surface
+        return self._surface[key]
+
+    def _chunk_bedrock_sections(self, key: tuple[int, int], chunk: Any) -> list[int] | None:
+        # Section Y indices (highest first) whose palette contains bedrock;
+        # None when the chunk format has no palettes to consult.
+        if key not in self._bedrock_sections:
+            found: list[int] = []
+            has_palettes = True
+            try:
+                for section in chunk.data["Sections"]:
+                    palette = section.get("Palette")
+                    if palette is None:
+                        # Pre-1.13 "Blocks" arrays (or unknown layouts): no palette to consult.
+                        has_palettes = "BlockStates" not in section and "Blocks" not in section
+                        if not has_palettes:
+                            break
+                        continue
+                    if any(str(entry.get("Name", "")).endswith("bedrock") for entry in palette):
+                        # anvil-parser hands out NBT tags (TAG_Byte has no __int__).
+                        found.append(int(section["Y"].value))
+            except Exception:
+                has_palettes = False
+            self._bedrock_sections[key] = sorted(found, reverse=True) if has_palettes else None
+        return self._bedrock_sections[key]
+
+    @staticmethod
+    def _is_bedrock(chunk: Any, lx: int, y: int, lz: int) -> bool:
         try:
             block = chunk.get_block(lx, y, lz)
         except Exception:
-            continue
+            return False
         block_id = getattr(block, "id", None) or getattr(block, "name", None) or str(block)
-        if "bedrock" in str(block_id):
-            return y
-    return None
+        return "bedrock" in str(block_id)
 
+    def bedrock_y_at(self, x: int, z: int) -> int | None:
+        cx = x // 16
+        cz = z // 16
+        chunk = self._chunk(cx, cz)
+        if chunk is None:
+            return None
+        key = (cx, cz)
+        lx = x & 15
+        lz = z & 15
+        top = 255
+        surface = self._chunk_surface(key, chunk)
+        if surface is not None:
+            top = surface[lz * 16 + lx] - 1
+            if top < 0:
+                return None
+        sections = self._chunk_bedrock_sections(key, chunk)
+        if sections is None:
+            spans = [(top, 0)]
+        else:
+            spans = [(min(top, sy * 16 + 15), sy * 16) for sy in sections if sy * 16 <= top]
+        for high, low in spans:
+            for y in range(high, low - 1, -1):
+                if self._is_bedrock(chunk, lx, y, lz):
+                    return y
+        return None
+
+    def bedrock_y_near(self, x: int, z: int, radius: int) -> int | None:
+        best = None
+        for dx in range(-radius, radius + 1):
+            for dz in range(-radius, radius + 1):
+                y = self.bedrock_y_at(x + dx, z + dz)
+                if y is None:
+                    continue
+                if best is None or y > best:
+                    best = y
+        return best
+
+
+def world_seed_from_level_dat(world_dir: Path) -> str | None:
+    """World seed from ``level.dat`` (WorldGenSettings.seed on 1.16+, RandomSeed before)."""
+    level_dat = world_dir / "level.dat"
+    if not level_dat.exists():
+        return None
+    try:
+        with gzip.open(level_dat, "rb") as f:
+            plain = _to_plain(nbtlib.File.parse(f))
+    except Exception:
+        return None
+    if not isinstance(plain, dict):
+        return None
+    data = plain.get("Data")
+    if not isinstance(data, dict):
+        nested = plain.get("")
+        data = nested.get("Data") if isinstance(nested, dict) else None
+    if not isinstance(data, dict):
+        return None
+    gen = data.get("WorldGenSettings")
+    seed = gen.get("seed") if isinstance(gen, dict) else None
+    if seed is None:
+        seed = data.get("RandomSeed")
+    return str(int(seed)) if isinstance(seed, (int, float)) else None
 
-def _bedrock_y_near(world_dir: Path, x: int, z: int, radius: int) -> int | None:
-    best = None
-    for dx in range(-radius, radius + 1):
-        for dz in range(-radius, radius + 1):
-            y = _bedrock_y_at(world_dir, x + dx, z + dz)
-            if y is None:
-                continue
-            if best is None or y > best:
-                best = y
-    return best
+
+TOWER_NODE_COLUMNS = {
+    "back_diag": (-34, 24),
+    "front_diag": (33, -25),
+    "back_straight": (-42, -1),
+    "front_straight": (42, 0),
+}
 
 
 def bedrock_by_node(world_dir: Path, radius: int = 2) -> dict[str, int | None]:
-    nodes = {
-        "back_diag": (-34, 24),
-        "front_diag": (33, -25),
-        "back_straight": (-42, -1),
-        "front_straight": (42, 0),
-    }
-    return {name: _bedrock_y_near(world_dir, x, z, radius=radius) for name, (x, z) in nodes.items()}
+    nodes = TOWER_NODE_COLUMNS
+    if anvil is None or not (world_dir / "DIM1" / "region").exists():
+        return {name: None for name in nodes}
+    reader = EndTowerReader(world_dir)
+    return {name: reader.bedrock_y_near(x, z, radius=radius) for name, (x, z) in nodes.items()}
 
 
 def main() -> int:
@@ -641,18 +1429,13 @@ def main() -> int:
     if world_dir is not None:
         print("----")
         print(f"World: {world_dir}")
-        nodes = {
-            "back_diag": (-34, 24),
-            "front_diag": (33, -25),
-            "back_straight": (-42, -1),
-            "front_straight": (42, 0),
-        }
         if anvil is None:
             print("Bedrock lookup: skipped (install anvil-parser).")
         else:
             print("Bedrock Y at node coords:")
-            for name, (x, z) in nodes.items():
-                y = _bedrock_y_near(world_dir, x, z, radius=args.bedrock_radius)
+            reader = EndTowerReader(world_dir)
+            for name, (x, z) in TOWER_NODE_COLUMNS.items():
+                y = reader.bedrock_y_near(x, z, radius=args.bedrock_radius)
                 print(f"{name} @ ({x}, {z}) r={args.bedrock_radius} -> y={y}")
     return result
 
@@ -0,0 +1,379 @@
+from __future__ import annotations
+
+import sqlite3
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from app.database import Database
+from app.metrics import (
+    ATTEMPT_SOURCE_CTX,
+    ROTATION_FILTER_CTX,
+    _compute_current_session_start_utc,
+    _scope_where,
+    compute_session_progression,
+)
+from app.tower_heights import get_cached_tower_heights, store_tower_heights
+
+
+class DatabaseTestCase(unittest.TestCase):
+    """Gives each test a fresh database file in a temporary directory."""
+
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.db = Database(Path(self.tempdir.name) / "test.db")
+
+    def tearDown(self) -> None:
+        self.db.close()
+        self.tempdir.cleanup()
+
+
+class TestWriteQueue(DatabaseTestCase):
+    def test_concurrent_writers_are_serialized(self) -> None:
+        def worker(prefix: str) -> None:
+            for i in range(50):
+                self.db.set_state(f"{prefix}.{i}", str(i))
+
+        threads = [threading.Thread(target=worker, args=(f"t{n}",)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(self.db.state.items("t")), 200)
+        # set_state is write-behind; wait for the queued upserts before reading SQL.
+        self.db.flush()
+        row = self.db.query_one("SELECT COUNT(*) AS n FROM ingest_state WHERE key LIKE 't%'")
+        self.assertEqual(row["n"], 200)
+
+    def test_failed_job_does_not_poison_group(self) -> None:
+        ok = self.db.submit("INSERT INTO ingest_state (key, value) VALUES ('a', '1')")
+        bad = self.db.submit("INSERT INTO no_such_table VALUES (1)")
+        self.assertGreater(ok.result(), 0)
+        with self.assertRaises(sqlite3.OperationalError):
+            bad.result()
+        self.assertEqual(self.db.get_state("a"), "1")
+
+    def test_transaction_rolls_back_and_reads_own_writes(self) -> None:
+        with self.assertRaises(RuntimeError):
+            with self.db.transaction():
+                self.db.set_state("pending", "x")
+                self.assertEqual(self.db.get_state("pending"), "x")
+                raise RuntimeError("boom")
+        self.assertIsNone(self.db.get_state("pending"))
+
+    def test_pooled_reads_run_while_a_transaction_is_open(self) -> None:
+        self.db.set_state("seen", "committed")
+        results: list[str | None] = []
+        with self.db.transaction():
+            self.db.set_state("seen", "uncommitted")
+            reader = threading.Thread(target=lambda: results.append(self.db.get_state("seen")))
+            reader.start()
+            reader.join(timeout=5)
+        self.assertEqual(results, ["committed"])
+        with self.db.reader():
+            self.assertEqual(self.db.get_state("seen"), "uncommitted")
+
+
+class TestStateStore(DatabaseTestCase):
+    def test_cache_follows_commits_from_every_write_path(self) -> None:
+        self.db.set_states({"n": "7", "f": "0.5", "flag": "on", "list": '["a"]', "bad": "x"})
+        self.assertEqual(self.db.state.get_int("n"), 7)
+        self.assertEqual(self.db.state.get_float("f"), 0.5)
+        self.assertTrue(self.db.state.get_bool("flag"))
+        self.assertEqual(self.db.state.get_json("list"), ["a"])
+        self.assertEqual(self.db.state.get_int("bad", -1), -1)
+        self.db.flush()
+        row = self.db.query_one("SELECT value FROM ingest_state WHERE key = 'n'")
+        self.assertEqual(row["value"], "7")
+
+        self.db.execute("DELETE FROM ingest_state WHERE key = 'n'")
+        self.assertIsNone(self.db.get_state("n"))
+        self.db.run_write(lambda conn: Database.write_state(conn, {"job": "1"}))
+        self.assertEqual(self.db.get_state("job"), "1")
+        bad = self.db.submit_write(lambda conn: (Database.write_state(conn, {"lost": "1"}), 1 / 0))
+        with self.assertRaises(ZeroDivisionError):
+            bad.result()
+        self.assertIsNone(self.db.get_state("lost"))
+
+    def test_subscribers_get_one_notification_per_commit(self) -> None:
+        seen: list[dict[str, str | None]] = []
+        unsubscribe = self.db.state.subscribe(lambda changes: seen.append(dict(changes)))
+        self.db.set_states({"a": "1", "b": "2"}).result()
+        self.db.execute("DELETE FROM ingest_state WHERE key = 'a'")
+        with self.assertRaises(RuntimeError):
+            with self.db.transaction():
+                self.db.set_state("c", "3")
+                raise RuntimeError("boom")
+        unsubscribe()
+        self.db.set_state("d", "4").result()
+        self.assertEqual(seen, [{"a": "1", "b": "2"}, {"a": None}])
+
+    def test_unchanged_values_do_not_copy_the_cache(self) -> None:
+        self.db.set_states({"a": "1", "b": "2"}).result()
+        snapshot = self.db.state._values
+        self.db.set_states({"a": "1"}).result()
+        self.db.execute("UPDATE ingest_state SET value = value")
+        self.assertIs(self.db.state._values, snapshot)
+        self.db.set_state("a", "3").result()
+        self.assertIsNot(self.db.state._values, snapshot)
+        self.assertEqual(snapshot["a"], "1")
+        self.assertEqual(self.db.get_state("a"), "3")
+
+    def test_older_commit_does_not_roll_back_a_queued_value(self) -> None:
+        entered = {"a": threading.Event(), "b": threading.Event()}
+        release = {"a": threading.Event(), "b": threading.Event()}
+        write_state = Database.write_state
+
+        def slow_write_state(conn: sqlite3.Connection, values: dict[str, str]) -> None:
+            value = values.get("k", "")
+            if value in entered:
+                entered[value].set()
+                release[value].wait(5)
+            write_state(conn, values)
+
+        with mock.patch.object(Database, "write_state", staticmethod(slow_write_state)):
+            first = self.db.set_state("k", "a")
+            self.assertTrue(entered["a"].wait(5))
+            # Queued while the writer is inside the first job: a separate group commit.
+            second = self.db.set_state("k", "b")
+            self.assertEqual(self.db.get_state("k"), "b")
+            release["a"].set()
+            first.result()
+            self.assertTrue(entered["b"].wait(5))
+            self.assertEqual(self.db.get_state("k"), "b")
+            release["b"].set()
+            second.result()
+        self.assertEqual(self.db.get_state("k"), "b")
+        self.assertEqual(self.db.query_one("SELECT value FROM ingest_state WHERE key = 'k'")["value"], "b")
+
+
+class TestTowerHeightCache(DatabaseTestCase):
+    def test_round_trip_and_partial_reads_are_not_cached(self) -> None:
+        heights = {"back_diag": 103, "front_diag": 76, "back_straight": 91, "front_straight": 85}
+        self.assertTrue(store_tower_heights(self.db, "-123", 4, heights, source_world="Random Speedrun #1"))
+        self.assertEqual(get_cached_tower_heights(self.db, "-123", 4), heights)
+        self.assertIsNone(get_cached_tower_heights(self.db, "-123", 2))
+
+        self.assertFalse(store_tower_heights(self.db, "456", 4, {**heights, "front_diag": None}))
+        self.assertIsNone(get_cached_tower_heights(self.db, "456", 4))
+
+
+class TestAttemptDimensions(DatabaseTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        at = "2000-01-01T00:00:00+00:00"
+        for zero_type in ("Front Diagonal CW", "Back Straight CCW", "Back Diagonal ccw", None):
+            self.db.execute(
+                "INSERT INTO attempts (started_at_utc, zero_type, attempt_source, created_at) VALUES (?, ?, 'mpk', ?)",
+                (at, zero_type, at),
+            )
+
+    def test_generated_columns_follow_zero_type(self) -> None:
+        rows = self.db.query_all("SELECT side, rotation, is_straight FROM attempts ORDER BY id")
+        self.assertEqual(
+            [tuple(row) for row in rows],
+            [("Front", "cw", 0), ("Back", "ccw", 1), ("Back", "ccw", 0), ("Unknown", "unknown", 0)],
+        )
+
+    def test_scope_filters_search_an_index(self) -> None:
+        token = ROTATION_FILTER_CTX.set("ccw")
+        try:
+            where, params = _scope_where(front_back="Back")
+        finally:
+            ROTATION_FILTER_CTX.reset(token)
+        row = self.db.query_one(f"SELECT COUNT(*) AS n FROM attempts{where}", tuple(params))
+        self.assertEqual(row["n"], 2)
+        plan = " ".join(
+            str(r["detail"]) for r in self.db.query_all(f"EXPLAIN QUERY PLAN SELECT id FROM attempts{where}", tuple(params))
+        )
+        self.assertIn("SEARCH attempts USING INDEX idx_attempts_", plan)
+
+
+class TestTargetStats(DatabaseTestCase):
+    def _stats(self) -> list[tuple]:
+        return [
+            tuple(row)
+            for row in self.db.query_all(
+                """
+                SELECT tower_name, side, o_level, attempts, successes, failures,
+                       ROUND(success_time_sum, 6), success_time_count, last_attempt_id
+                FROM target_stats
+                ORDER BY tower_name, side, o_level
+                """
+            )
+        ]
+
+    def test_triggers_track_attempt_changes_and_match_rebuild(self) -> None:
+        at = "2000-01-01T00:00:00+00:00"
+        rows = [
+            ("success", 30.0, "Front Diagonal CW", "M-85", 55),
+            ("fail", None, "Front Diagonal CW", "M-85", 55),
+            ("success", 40.0, "Back Diagonal CCW", None, None),
+            ("in_progress", None, "Front Diagonal CW", "M-85", 55),
+        ]
+        for status, seconds, zero_type, tower, o_level in rows:
+            self.db.execute(
+                """
+                INSERT INTO attempts (
+                    started_at_utc, status, success_time_seconds, zero_type, tower_name, o_level,
+                    attempt_source, created_at
+                )
+                VALUES (?, ?, ?, ?, ?, ?, 'mpk', ?)
+                """,
+                (at, status, seconds, zero_type, tower, o_level, at),
+            )
+        self.assertEqual(
+            self._stats(),
+            [(None, "Back", None, 1, 1, 0, 40.0, 1, 3), ("M-85", "Front", 55, 3, 1, 1, 30.0, 1, 2)],
+        )
+
+        self.db.execute("UPDATE attempts SET status = 'success', success_time_seconds = 20.0 WHERE id = 4")
+        self.db.execute("UPDATE attempts SET tower_name = 'T-100' WHERE id = 3")
+        self.db.execute("DELETE FROM attempts WHERE id = 2")
+        expected = [("M-85", "Front", 55, 2, 2, 0, 50.0, 2, 4), ("T-100", "Back", None, 1, 1, 0, 40.0, 1, 3)]
+        self.assertEqual(self._stats(), expected)
+
+        self.db.execute("DELETE FROM attempts WHERE id = 4")
+        self.assertEqual(self._stats()[0][-1], 1)
+        self.assertEqual(self.db.rebuild_target_stats(), {"rows": 2, "attempts": 2})
+        self.assertEqual(self._stats(), [("M-85", "Front", 55, 1, 1, 0, 30.0, 1, 1), expected[1]])
+
+
+class TestSessions(DatabaseTestCase):
+    def _insert(self, started_at_utc: str, source: str = "mpk", status: str = "fail") -> int:
+        return self.db.execute(
+            """
+            INSERT INTO attempts (started_at_utc, status, attempt_source, created_at)
+            VALUES (?, ?, ?, ?)
+            """,
+            (started_at_utc, status, source, started_at_utc),
+        )
+
+    def _current_session_start(self, source: str) -> str | None:
+        token = ATTEMPT_SOURCE_CTX.set(source)
+        try:
+            return _compute_current_session_start_utc(self.db)
+        finally:
+            ATTEMPT_SOURCE_CTX.reset(token)
+
+    def _session_ids(self) -> list[int]:
+        return [int(r["session_id"]) for r in self.db.query_all("SELECT session_id FROM attempts ORDER BY id")]
+
+    def test_sessions_split_on_gap_per_source_and_match_rebuild(self) -> None:
+        self._insert("2000-01-01T10:00:00+00:00")
+        self._insert("2000-01-01T10:30:00+00:00", source="practice")
+        self._insert("2000-01-01T11:00:00+00:00")
+        self._insert("2000-01-01T12:00:01+00:00")
+        self._insert("2000-01-01T12:10:00+00:00")
+        first, practice, _, second, _ = self._session_ids()
+        self.assertEqual(self._session_ids(), [first, practice, first, second, second])
+        self.assertEqual(len({first, practice, second}), 3)
+        latest = self.db.query_one("SELECT * FROM sessions WHERE id = ?", (second,))
+        self.assertEqual(
+            (latest["started_at_utc"], latest["last_started_at_utc"]),
+            ("2000-01-01T12:00:01+00:00", "2000-01-01T12:10:00+00:00"),
+        )
+
+        self.db.execute("DELETE FROM attempts WHERE attempt_source = 'practice'")
+        self.assertIsNone(self.db.query_one("SELECT id FROM sessions WHERE id = ?", (practice,)))
+
+        def shape() -> list[tuple]:
+            rows = self.db.query_all(
+                """
+                SELECT s.started_at_utc, s.last_started_at_utc, COUNT(a.id) AS n
+                FROM sessions s JOIN attempts a ON a.session_id = s.id
+                GROUP BY s.id
+                ORDER BY s.started_at_utc
+                """
+            )
+            return [tuple(r) for r in rows]
+
+        before = shape()
+        self.assertEqual(self.db.rebuild_sessions(), {"sessions": 2, "combined_sessions": 2, "attempts": 4})
+        self.assertEqual(shape(), before)
+
+    def test_only_finished_attempts_open_or_extend_sessions(self) -> None:
+        self._insert("2000-01-01T12:00:00+00:00")
+        self._insert("2000-01-01T12:10:00+00:00")
+        pending = self._insert("2000-01-01T15:00:00+00:00", status="in_progress")
+        self._insert("2000-01-01T15:05:00+00:00", status="flyaway")
+        self.assertEqual(self._current_session_start("mpk"), "2000-01-01T12:00:00+00:00")
+        self.assertEqual(self._current_session_start("all"), "2000-01-01T12:00:00+00:00")
+
+        self.db.execute("UPDATE attempts SET status = 'success' WHERE id = ?", (pending,))
+        self.assertEqual(self._current_session_start("mpk"), "2000-01-01T15:00:00+00:00")
+        self.db.execute("UPDATE attempts SET status = 'in_progress' WHERE id = ?", (pending,))
+        self.assertEqual(self._current_session_start("mpk"), "2000-01-01T12:00:00+00:00")
+        self.assertEqual(self.db.query_one("SELECT COUNT(*) AS n FROM sessions")["n"], 2)
+
+    def test_unscoped_sessions_merge_interleaved_sources(self) -> None:
+        self._insert("2000-01-01T10:00:00+00:00", source="practice")
+        self._insert("2000-01-01T10:50:00+00:00")
+        self._insert("2000-01-01T11:40:00+00:00", source="practice")
+        self._insert("2000-01-01T12:10:00+00:00")
+        self.assertEqual(self._current_session_start("mpk"), "2000-01-01T12:10:00+00:00")
+        self.assertEqual(self._current_session_start("all"), "2000-01-01T10:00:00+00:00")
+
+        token = ATTEMPT_SOURCE_CTX.set("all")
+        try:
+            progression = compute_session_progression(self.db)
+        finally:
+            ATTEMPT_SOURCE_CTX.reset(token)
+        self.assertEqual([row["attempts"] for row in progression], [4])
+        before = self.db.query_all("SELECT session_id, combined_session_id FROM attempts ORDER BY id")
+        self.db.rebuild_sessions()
+        after = self.db.query_all("SELECT session_id, combined_session_id FROM attempts ORDER BY id")
+        self.assertEqual(len({row["combined_session_id"] for row in after}), 1)
+        self.assertEqual(
+            [len({row[col] for row in before}) for col in ("session_id", "combined_session_id")],
+            [len({row[col] for row in after}) for col in ("session_id", "combined_session_id")],
+        )
+
+
+class TestSchemaMigrations(DatabaseTestCase):
+    def _reopen(self) -> None:
+        self.db.close()
+        self.db = Database(Path(self.tempdir.name) / "test.db")
+
+    def test_backfills_run_once_per_database(self) -> None:
+        self.assertGreater(len(self.db.schema_report["applied"]), 0)
+        version = self.db.schema_report["version"]
+        at = "2000-01-01T00:00:00+00:00"
+        self.db.execute(
+            """
+            INSERT INTO attempts (started_at_utc, attempt_seed_mode, attempt_source, created_at)
+            VALUES (?, 'legacy', 'mpk', ?)
+            """,
+            (at, at),
+        )
+
+        self._reopen()
+        self.assertEqual(self.db.schema_report["applied"], [])
+        self.assertEqual(self.db.schema_report["version"], version)
+        row = self.db.query_one("SELECT attempt_seed_mode FROM attempts")
+        self.assertEqual(row["attempt_seed_mode"], "legacy")
+
+    def test_unknown_mpk_towers_are_named_from_standing_height(self) -> None:
+        at = "2000-01-01T00:00:00+00:00"
+        for standing_height in (85, 60):
+            self.db.execute(
+                """
+                INSERT INTO attempts (started_at_utc, tower_name, standing_height, attempt_source, created_at)
+                VALUES (?, 'Unknown', ?, 'mpk', ?)
+                """,
+                (at, standing_height, at),
+            )
+        # A database written before the repair step existed.
+        version = self.db.schema_report["version"]
+        self.db.run_write(lambda conn: conn.execute(f"PRAGMA user_version = {version - 2}"))
+
+        self._reopen()
+        self.assertEqual(self.db.schema_report["applied"], ["name_unknown_mpk_towers", "segment_finished_sessions"])
+        rows = self.db.query_all("SELECT tower_name FROM attempts ORDER BY id")
+        self.assertEqual([row["tower_name"] for row in rows], ["M-85", "Unknown"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import threading
+import unittest
+
+from app.ingest_jobs import IngestJob, IngestJobQueue
+
+
+class TestIngestJobQueue(unittest.TestCase):
+    def setUp(self) -> None:
+        self.queue = IngestJobQueue(name="test-ingest")
+        self.queue.start()
+
+    def tearDown(self) -> None:
+        self.queue.stop()
+        self.queue.join(timeout=2.0)
+
+    def test_duplicate_keys_collapse_while_pending(self) -> None:
+        release = threading.Event()
+        ran: list[str] = []
+
+        def slow(job: IngestJob) -> str:
+            with job.stage("wait"):
+                release.wait(timeout=5)
+            ran.append(job.key)
+            return "inserted"
+
+        self.assertTrue(self.queue.submit("world-a", slow))
+        self.assertFalse(self.queue.submit("world-a", slow))
+        self.assertTrue(self.queue.submit("world-b", slow))
+        self.assertFalse(self.queue.submit("world-b", slow))
+        release.set()
+        self.assertTrue(self.queue.wait_idle(timeout=5))
+
+        self.assertEqual(ran, ["world-a", "world-b"])
+        status = self.queue.status()
+        self.assertEqual(status["queue_depth"], 0)
+        self.assertEqual(status["completed"], 2)
+        self.assertEqual(status["recent"][0]["key"], "world-b")
+        self.assertEqual(status["recent"][0]["result"], "inserted")
+        self.assertIn("wait", status["recent"][0]["stages"])
+
+    def test_failing_job_is_recorded_and_worker_keeps_running(self) -> None:
+        def boom(job: IngestJob) -> str:
+            raise ValueError("bad storage")
+
+        self.queue.submit("world-a", boom)
+        self.queue.submit("world-b", lambda job: "inserted")
+        self.assertTrue(self.queue.wait_idle(timeout=5))
+
+        status = self.queue.status()
+        self.assertEqual((status["failed"], status["completed"]), (1, 1))
+        failed = status["recent"][1]
+        self.assertEqual(failed["status"], "failed")
+        self.assertEqual(failed["error"], "ValueError: bad storage")
+
+
+if __name__ == "__main__":
+    unittest.main()
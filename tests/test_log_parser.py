@@ -4,9 +4,9 @@ import tempfile
 import unittest
 from pathlib import Path
 
-from app.attempt_tracker import AttemptTracker
+from app.attempt_tracker import ZDASH_CONTEXT_WINDOW, AttemptTracker
 from app.database import Database
-from app.log_parser import parse_log_line
+from app.log_parser import LogDispatcher, LogEvent, parse_log_line
 from app.metrics import compute_summary
 
 
@@ -28,6 +28,29 @@ class TestLogParser(unittest.TestCase):
         self.assertFalse(parsed.is_chat)
         self.assertIsNone(parsed.chat_message)
 
+    def test_dispatcher_filters_by_declared_interest(self) -> None:
+        dispatcher = LogDispatcher([AttemptTracker.LOG_INTEREST])
+        wanted = [
+            "[21:07:24] [Render thread/INFO]: [CHAT] [ZDASH] Tower: Tall Boy (103)",
+            "[21:07:24] [Render thread/INFO]: [CHAT] 17.60s 1st Bed Placed",
+            "[21:07:24] [Render thread/INFO]: [CHAT] DRAGON KILLED!",
+            "[21:07:24] [Render thread/INFO]: [CHAT] ",
+            "[21:07:24] [Render thread/INFO]: StateOutput State: waiting",
+            "[21:07:24] [Server thread/INFO]: Stopping!",
+        ]
+        ignored = [
+            "[21:07:24] [Render thread/INFO]: [CHAT] <player> gg",
+            "[21:09:37] [Server thread/INFO]: Saving chunks for level 'ServerLevel[Zero Practice]'",
+            "[21:09:37] [Worker-Main-7/DEBUG]: Chunk [12, -4] saved in 3ms",
+        ]
+        for raw in wanted:
+            self.assertTrue(dispatcher.wants_raw(raw), raw)
+            self.assertTrue(dispatcher.wants(parse_log_line(raw)), raw)
+        for raw in ignored:
+            self.assertFalse(dispatcher.wants(parse_log_line(raw)), raw)
+        # Chat lines are always parsed; other ignored lines skip LOG_LINE_RE.
+        self.assertEqual([dispatcher.wants_raw(raw) for raw in ignored], [True, False, False])
+
 
 class TestAttemptTracker(unittest.TestCase):
     def setUp(self) -> None:
@@ -212,6 +235,91 @@ class TestAttemptTracker(unittest.TestCase):
         self.assertNotIn("setup_reach_rate", summary)
         self.assertNotIn("success_rate_after_setup", summary)
 
+    def test_restarted_tracker_hydrates_context_from_rebuilt_ring(self) -> None:
+        self._push_zdash_context("Tall Boy (103)", "Front Diagonal CW")
+        self.tracker = AttemptTracker(self.db)
+        self.assertEqual([c.zero_type for c in self.tracker.recent_zdash], [None, "Front Diagonal CW"])
+        self._push_chat("17.60s 1st Bed Placed")
+
+        row = self.db.query_one("SELECT * FROM attempts ORDER BY id DESC LIMIT 1")
+        assert row is not None
+        self.assertEqual(row["tower_name"], "Tall Boy")
+        self.assertEqual(row["tower_code"], "103")
+        self.assertEqual(row["zero_type"], "Front Diagonal CW")
+
+    def test_other_zdash_chatter_does_not_evict_context(self) -> None:
+        self._push_zdash_context("Tall Boy (103)", "Front Diagonal CW")
+        self._push_chat("[ZDASH]\tTower: Short Boy (76)")
+        self._push_chat("[zdash] Type: Back Straight CW")
+        for i in range(ZDASH_CONTEXT_WINDOW + 5):
+            self._push_chat(f"[ZDASH] Leniency: {i}")
+        self.assertEqual(len(self.tracker.recent_zdash), 3)
+        restarted = AttemptTracker(self.db)
+        self.assertEqual(restarted.recent_zdash, self.tracker.recent_zdash)
+        self.assertEqual(
+            [(c.tower_name, c.zero_type) for c in restarted.recent_zdash],
+            [("Tall Boy", None), (None, "Front Diagonal CW"), ("Short Boy", None)],
+        )
+
+    def test_envelope_timestamp_is_used_without_lookup(self) -> None:
+        stamp = "2026-03-01T12:00:00+00:00"
+        lines = [
+            "[21:00:00] [Render thread/INFO]: [CHAT] [ZDASH] Tower: Tall Boy (103)",
+            "[21:00:00] [Render thread/INFO]: [CHAT] [ZDASH] Type: Front Diagonal CW",
+            "[21:00:01] [Render thread/INFO]: [CHAT] 17.60s 1st Bed Placed",
+            "[21:00:02] [Render thread/INFO]: [CHAT] Dragon Killed!",
+        ]
+        # Stored rows carry a different timestamp; only the envelope's may be used.
+        event_ids = self.db.insert_raw_events(
+            [("2000-01-01T00:00:00+00:00", None, None, None, None, 1, None, line, 0) for line in lines]
+        )
+        for event_id, line in zip(event_ids, lines):
+            self.tracker.handle_event(LogEvent(event_id, stamp, None, parse_log_line(line)))
+
+        row = self.db.query_one("SELECT * FROM attempts ORDER BY id DESC LIMIT 1")
+        assert row is not None
+        self.assertEqual(row["status"], "success")
+        self.assertEqual(row["started_at_utc"], stamp)
+        self.assertEqual(row["ended_at_utc"], stamp)
+
+
+class TestRawEventRetention(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.db = Database(Path(self.tempdir.name) / "test.db")
+
+    def tearDown(self) -> None:
+        self.db.close()
+        self.tempdir.cleanup()
+
+    def _insert(self, ingested_at: str, raw_line: str, chat_message: str | None = None) -> int:
+        is_chat = 0 if chat_message is None else 1
+        return self.db.insert_raw_events(
+            [(ingested_at, None, None, None, None, is_chat, chat_message, raw_line, 0)]
+        )[0]
+
+    def test_compaction_keeps_referenced_and_recent_events(self) -> None:
+        old = "2020-01-01T00:00:00+00:00"
+        referenced = self._insert(old, "first bed")
+        spam_ids = [self._insert(old, f"spam {i} " + "x" * 200) for i in range(2000)]
+        chat = self._insert(old, "[CHAT] [ZDASH] Tower: Tall Boy (103)", "[ZDASH] Tower: Tall Boy (103)")
+        recent = self._insert("2999-01-01T00:00:00+00:00", "recent")
+        self.db.execute(
+            "INSERT INTO attempts (started_event_id, started_at_utc, created_at) VALUES (?, ?, ?)",
+            (referenced, old, old),
+        )
+
+        report = self.db.compact_raw_log_events(keep_days=7, block_rows=500)
+
+        self.assertEqual(report["deleted_events"], len(spam_ids))
+        self.assertEqual(report["archived_blocks"], 4)
+        self.assertGreater(report["reclaimed_bytes"], 0)
+        kept = [int(r["id"]) for r in self.db.query_all("SELECT id FROM raw_log_events ORDER BY id")]
+        self.assertEqual(kept, [referenced, chat, recent])
+        first_block = self.db.read_raw_log_archive_block(1)
+        self.assertEqual(first_block[0]["id"], spam_ids[0])
+        self.assertTrue(first_block[0]["raw_line"].startswith("spam 0 "))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from typing import Any
+from unittest import mock
+
+from app.database import Database
+from app.log_parser import LogInterest, ParsedLogLine, parse_log_line
+from app.log_notify import open_change_waiter
+from app.log_watcher import LogWatcher
+
+
+class _RecordingTracker:
+    def __init__(self) -> None:
+        self.events: list[tuple[str, int, Any]] = []
+
+    def handle_chat_event(self, event_id: int, chat_message: str, clock_time: str | None) -> None:
+        self.events.append(("chat", event_id, chat_message))
+
+    def handle_log_event(self, event_id: int, parsed: ParsedLogLine) -> None:
+        self.events.append(("log", event_id, parsed.body))
+
+
+class _InterestedTracker(_RecordingTracker):
+    LOG_INTEREST = LogInterest(chat_prefixes=("Damage:",), body_contains_lower=("stopping!",))
+
+
+class TestLogWatcher(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        root = Path(self.tempdir.name)
+        self.db = Database(root / "test.db")
+        self.log_path = root / "latest.log"
+        self.tracker = _RecordingTracker()
+        self.watcher = LogWatcher(
+            log_path=self.log_path,
+            poll_seconds=0.01,
+            db=self.db,
+            tracker=self.tracker,
+            batch_max_lines=2,
+        )
+
+    def tearDown(self) -> None:
+        self.db.close()
+        self.tempdir.cleanup()
+
+    def _append(self, text: str) -> None:
+        with self.log_path.open("a", encoding="utf-8", newline="") as handle:
+            handle.write(text)
+
+    def test_batches_lines_and_commits_position(self) -> None:
+        self._append(
+            "[21:00:00] [Render thread/INFO]: [CHAT] Damage: 40\n"
+            "[21:00:01] [Server thread/INFO]: Saving chunks for level 'ServerLevel[W]'/minecraft:the_end\n"
+            "[21:00:02] [Render thread/INFO]: [CHAT] Dragon Killed!\n"
+        )
+        self.assertEqual(self.watcher.poll_once(), 3)
+
+        rows = self.db.query_all("SELECT id, file_offset, is_chat FROM raw_log_events ORDER BY id")
+        self.assertEqual([int(r["is_chat"]) for r in rows], [1, 0, 1])
+        self.assertEqual([e[1] for e in self.tracker.events], [int(r["id"]) for r in rows])
+        self.assertEqual([e[0] for e in self.tracker.events], ["chat", "log", "chat"])
+        self.assertEqual(
+            self.db.get_state("log_reader.file_position"),
+            str(self.log_path.stat().st_size),
+        )
+
+        self._append("[21:00:03] [Render thread/INFO]: [CHAT] Time: 29.60s\n")
+        self.assertEqual(self.watcher.poll_once(), 1)
+        self.assertEqual(self.tracker.events[-1][2], "Time: 29.60s")
+        last = self.db.query_one("SELECT file_offset FROM raw_log_events ORDER BY id DESC LIMIT 1")
+        assert last is not None
+        self.assertLess(int(rows[-1]["file_offset"]), int(last["file_offset"]))
+
+    def test_lines_outside_the_interest_are_stored_unparsed(self) -> None:
+        tracker = _InterestedTracker()
+        watcher = LogWatcher(log_path=self.log_path, poll_seconds=0.01, db=self.db, tracker=tracker)
+        self._append(
+            "[21:00:00] [Render thread/INFO]: [CHAT] Damage: 40\n"
+            "[21:00:01] [Worker-Main-7/DEBUG]: Chunk [12, -4] saved in 3ms\n"
+            "[21:00:02] [Server thread/INFO]: Stopping!\n"
+        )
+        with mock.patch("app.log_watcher.parse_log_line", wraps=parse_log_line) as parse:
+            self.assertEqual(watcher.poll_once(), 3)
+        self.assertEqual(parse.call_count, 2)
+
+        rows = self.db.query_all("SELECT id, clock_time, is_chat, raw_line FROM raw_log_events ORDER BY id")
+        self.assertEqual([r["clock_time"] for r in rows], ["21:00:00", None, "21:00:02"])
+        self.assertTrue(rows[1]["raw_line"].startswith("[21:00:01] [Worker-Main-7/DEBUG]"))
+        self.assertEqual(
+            tracker.events,
+            [("chat", int(rows[0]["id"]), "Damage: 40"), ("log", int(rows[2]["id"]), "Stopping!")],
+        )
+
+    def test_transaction_rolls_back_batch_and_position(self) -> None:
+        with self.assertRaises(RuntimeError):
+            with self.db.transaction():
+                self.db.insert_raw_events(
+                    [("2026-01-01T00:00:00+00:00", None, None, None, None, 0, None, "x", 0)]
+                )
+                self.db.set_state("log_reader.file_position", "99")
+                raise RuntimeError("boom")
+        row = self.db.query_one("SELECT COUNT(*) AS n FROM raw_log_events")
+        assert row is not None
+        self.assertEqual(int(row["n"]), 0)
+        self.assertIsNone(self.db.get_state("log_reader.file_position"))
+
+    def test_partial_trailing_line_is_held_back(self) -> None:
+        self._append("[21:00:00] [Render thread/INFO]: [CHAT] Damage: 4")
+        self.assertEqual(self.watcher.poll_once(), 0)
+        self._append("0\r\n[21:00:01] [Render thread/INFO]: [CHAT] Dragon")
+        self.assertEqual(self.watcher.poll_once(), 1)
+        self.assertEqual(self.tracker.events[-1][2], "Damage: 40")
+        self._append(" Killed!\n")
+        self.assertEqual(self.watcher.poll_once(), 1)
+        self.assertEqual(self.tracker.events[-1][2], "Dragon Killed!")
+        rows = self.db.query_all("SELECT file_offset FROM raw_log_events ORDER BY id")
+        offsets = [int(r["file_offset"]) for r in rows]
+        self.assertEqual(offsets, [0, len("[21:00:00] [Render thread/INFO]: [CHAT] Damage: 40\r\n")])
+
+    def test_mmap_catch_up_matches_buffered_read(self) -> None:
+        lines = [f"[21:00:00] [Server thread/INFO]: line {i} \u00e9" for i in range(500)]
+        self._append("\n".join(lines) + "\npartial")
+        self.watcher.mmap_catchup_bytes = 1
+        self.assertEqual(self.watcher.poll_once(), 500)
+        self.assertEqual(self.watcher.last_catchup["lines"], 500)
+        rows = self.db.query_all("SELECT raw_line, file_offset FROM raw_log_events ORDER BY id")
+        self.assertEqual([r["raw_line"] for r in rows], lines)
+        expected_offsets = []
+        offset = 0
+        for line in lines:
+            expected_offsets.append(offset)
+            offset += len(line.encode("utf-8")) + 1
+        self.assertEqual([int(r["file_offset"]) for r in rows], expected_offsets)
+        self.assertEqual(self.db.get_state("log_reader.file_position"), str(offset))
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "inotify backend is Linux-only")
+    def test_inotify_backend_wakes_on_append(self) -> None:
+        self._append("")
+        waiter = open_change_waiter(self.log_path, poll_seconds=5.0, rescan_seconds=5.0)
+        try:
+            self.assertEqual(waiter.backend, "inotify")
+            self._append("[21:00:00] [Render thread/INFO]: [CHAT] Damage: 40\n")
+            started = time.monotonic()
+            self.assertTrue(waiter.wait())
+            self.assertLess(time.monotonic() - started, 1.0)
+        finally:
+            waiter.close()
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "inotify backend is Linux-only")
+    def test_polling_fallback_upgrades_once_the_log_directory_exists(self) -> None:
+        log_path = Path(self.tempdir.name) / "logs" / "latest.log"
+        waiter = open_change_waiter(log_path, poll_seconds=0.01, rescan_seconds=0.02)
+        try:
+            self.assertEqual(waiter.backend, "poll")
+            waiter.wait()
+            time.sleep(0.03)
+            waiter.wait()
+            self.assertTrue(waiter.alive)
+            log_path.parent.mkdir()
+            time.sleep(0.03)
+            waiter.wait()
+            self.assertFalse(waiter.alive)
+        finally:
+            waiter.close()
+        waiter = open_change_waiter(log_path, poll_seconds=0.01, rescan_seconds=0.02)
+        try:
+            self.assertEqual(waiter.backend, "inotify")
+        finally:
+            waiter.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+from pathlib import Path
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from app.database import Database
+from app.ingest_jobs import IngestJob, IngestJobQueue
+from app.log_parser import parse_log_line
+
+try:
+    from app.mpk_attempt_tracker import MpkAttemptTracker
+except ModuleNotFoundError:  # nbtlib is an optional dependency of the MPK path
+    MpkAttemptTracker = None
+
+
+@unittest.skipIf(MpkAttemptTracker is None, "nbtlib not installed")
+class TestMpkAttemptStore(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.db = Database(Path(self.tempdir.name) / "test.db")
+        self.tracker = MpkAttemptTracker(self.db, Path(self.tempdir.name) / "saves")
+        self.event_id = self.db.insert_raw_events(
+            [("2000-01-01T00:00:00+00:00", None, None, None, None, 0, None, "Stopping!", 0)]
+        )[0]
+
+    def tearDown(self) -> None:
+        self.db.close()
+        self.tempdir.cleanup()
+
+    def _attempt_values(self) -> tuple:
+        at = "2000-01-01T00:00:00+00:00"
+        return (
+            self.event_id, at, None, at, None, "success", None, 30.0, "M-85", "85", "Front Diagonal CW",
+            64, 2, None, 40, 2, 2, 0, 1, 0, 40, 2, 30, "set_seed", 60, 0, 0, None, None, None,
+            "Random Speedrun #1", at,
+        )
+
+    def _state(self) -> dict[str, str]:
+        return {
+            self.tracker.state_last_world_key: "Random Speedrun #1",
+            **self.tracker._ingest_diag_state(reason="inserted", world_name="Random Speedrun #1"),
+        }
+
+    def test_attempt_beds_and_state_commit_together(self) -> None:
+        beds = [(self.event_id, i, 10 + i, "setup", 0, "2000-01-01T00:00:00+00:00") for i in range(20)]
+        attempt_id = self.tracker._store_attempt(self._attempt_values(), beds, self._state())
+        count = self.db.query_one("SELECT COUNT(*) AS n FROM attempt_beds WHERE attempt_id = ?", (attempt_id,))
+        self.assertEqual(int(count["n"]), 20)
+        self.assertEqual(self.db.get_state("mpk.last_ingested_world"), "Random Speedrun #1")
+        self.assertEqual(self.db.get_state("mpk.ingest.last_reason"), "inserted")
+
+    def test_failed_bed_insert_leaves_no_partial_attempt(self) -> None:
+        beds = [(self.event_id, 0, None, "setup", 0, "2000-01-01T00:00:00+00:00")]
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.tracker._store_attempt(self._attempt_values(), beds, self._state())
+        self.assertIsNone(self.db.query_one("SELECT id FROM attempts"))
+        self.assertIsNone(self.db.get_state("mpk.last_ingested_world"))
+
+    def test_tower_name_falls_back_to_standing_height(self) -> None:
+        self.assertEqual(self.tracker._tower_name_from_height(88, 85), "M-88")
+        self.assertEqual(self.tracker._tower_name_from_height(None, 85), "M-85")
+        self.assertEqual(self.tracker._tower_name_from_height(None, 60), "Unknown")
+        self.assertEqual(self.tracker._tower_name_from_height(None), "Unknown")
+
+    def test_cached_tower_heights_skip_region_parsing(self) -> None:
+        heights = {"back_diag": 103, "front_diag": 76, "back_straight": 91, "front_straight": 85}
+        world = Path(self.tempdir.name) / "saves" / "Random Speedrun #1"
+        with mock.patch("app.mpk_attempt_tracker.bedrock_by_node", return_value=heights) as parse:
+            job = IngestJob(key=world.name)
+            self.assertEqual(self.tracker._tower_heights(world, "-123", "set_seed", job), heights)
+            self.assertEqual(parse.call_count, 1)
+            self.assertIn("bedrock", job.stages)
+
+            job = IngestJob(key=world.name)
+            self.assertEqual(self.tracker._tower_heights(world, "-123", "full_random", job), heights)
+            self.assertEqual(parse.call_count, 1)
+            self.assertNotIn("bedrock", job.stages)
+
+
+@unittest.skipIf(MpkAttemptTracker is None, "nbtlib not installed")
+class TestQueuedIngestOrdering(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.db = Database(Path(self.tempdir.name) / "test.db")
+        self.queue = IngestJobQueue()
+        self.queue.start()
+
+    def tearDown(self) -> None:
+        self.queue.stop()
+        self.queue.join(timeout=2.0)
+        self.db.close()
+        self.tempdir.cleanup()
+
+    def _rotate(self, tracker: MpkAttemptTracker) -> None:
+        tracker.active_world_name = "Random Speedrun #2"
+        tracker._handle_seed_rotation_on_run_start(
+            parse_log_line("[21:00:00] [Render thread/INFO]: Loaded StandardSettings on World Join")
+        )
+
+    def test_target_selection_waits_for_the_previous_world_ingest(self) -> None:
+        tracker = MpkAttemptTracker(self.db, Path(self.tempdir.name) / "saves", ingest_queue=self.queue)
+        started = threading.Event()
+        ingested: list[str] = []
+
+        def slow_ingest(job: IngestJob) -> str:
+            started.set()
+            time.sleep(0.2)
+            ingested.append(job.key)
+            return "inserted"
+
+        self.queue.submit("Random Speedrun #1", slow_ingest)
+        tracker._last_ingest_key = "Random Speedrun #1"
+        self.assertTrue(started.wait(5))
+        seen: list[list[str]] = []
+
+        def select(db: Database, **kwargs: object) -> dict[str, object]:
+            seen.append(list(ingested))
+            return {"pick": None}
+
+        with mock.patch("app.mpk_attempt_tracker.select_next_mpk_target", select):
+            self._rotate(tracker)
+        self.assertEqual(seen, [["Random Speedrun #1"]])
+
+    def test_selection_gives_up_after_the_wait_limit(self) -> None:
+        tracker = MpkAttemptTracker(
+            self.db, Path(self.tempdir.name) / "saves", ingest_queue=self.queue, ingest_wait_seconds=0.05
+        )
+        release = threading.Event()
+        self.queue.submit("Random Speedrun #1", lambda job: release.wait(5) and "inserted")
+        tracker._last_ingest_key = "Random Speedrun #1"
+        try:
+            with mock.patch("app.mpk_attempt_tracker.select_next_mpk_target", return_value={"pick": None}) as select:
+                self._rotate(tracker)
+            self.assertEqual(select.call_count, 1)
+            self.assertEqual(self.db.get_state("mpk.ingest.last_reason"), "selection_ingest_wait_timeout")
+        finally:
+            release.set()
+
+
+@unittest.skipIf(MpkAttemptTracker is None, "nbtlib not installed")
+class TestStorageReadiness(unittest.TestCase):
+    def test_finalized_storage_skips_the_stability_wait(self) -> None:
+        from scripts.bench import _write_synthetic_storage
+
+        with tempfile.TemporaryDirectory() as tmp:
+            db = Database(Path(tmp) / "test.db")
+            try:
+                tracker = MpkAttemptTracker(db, Path(tmp) / "saves", storage_wait_seconds=5.0)
+                path = Path(tmp) / "command_storage_zdash.dat"
+                _write_synthetic_storage(path, samples=300, damage_events=3)
+                started = time.monotonic()
+                self.assertEqual(tracker._wait_for_storage(path), "finalized")
+                self.assertLess(time.monotonic() - started, 1.0)
+            finally:
+                db.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
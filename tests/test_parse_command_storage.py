@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+from pathlib import Path
+import random
+import unittest
+
+try:
+    import scripts.parse_command_storage as pcs
+except ModuleNotFoundError:  # nbtlib is an optional dependency of the MPK path
+    pcs = None
+
+
+def _random_samples(rng: random.Random, count: int) -> list[dict[str, int]]:
+    samples = []
+    gt = rng.randrange(0, 10_000)
+    for _ in range(count):
+        gt += rng.choice((1, 1, 1, 2, 5))
+        samples.append(
+            {
+                "x": rng.randrange(-60_000, 60_000),
+                "y": rng.randrange(40_000, 110_000),
+                "z": rng.randrange(-60_000, 60_000),
+                "gt": gt,
+            }
+        )
+    return samples
+
+
+@unittest.skipIf(pcs is None, "nbtlib not installed")
+class TestPathClassification(unittest.TestCase):
+    @unittest.skipIf(pcs is None or pcs.np is None, "numpy not installed")
+    def test_vectorized_matches_python_loops(self) -> None:
+        rng = random.Random(1234)
+        for _ in range(40):
+            samples = _random_samples(rng, rng.randrange(pcs.VECTORIZE_MIN_SAMPLES, 3000))
+            window = rng.choice((20, 600, 10_000))
+            arrays = pcs.SampleArrays(samples)
+            self.assertEqual(
+                pcs._classify_node_vectorized(arrays, window_ticks=window),
+                pcs._classify_node_python(samples, window_ticks=window),
+            )
+            self.assertAlmostEqual(
+                pcs._net_angle_vectorized(arrays, window),
+                pcs._net_angle_python(samples, window),
+                places=9,
+            )
+
+    def test_short_runs_use_the_loops(self) -> None:
+        samples = [{"x": 20_000, "y": 0, "z": 0, "gt": 1}, {"x": 0, "y": 0, "z": 20_000, "gt": 2}]
+        self.assertEqual(pcs._dominant_node(samples, 600)[0], "front_straight")
+        self.assertEqual(pcs._rotation(samples, 600), "ccw")
+
+
+def _random_explosions(rng: random.Random) -> tuple[list[dict[str, int]], list[dict[str, int]]]:
+    span = rng.choice((60, 400, 3000))
+    explode = [
+        {"gt": rng.randrange(0, span), "explode_beds": rng.randrange(0, 3), "explode_anchors": rng.randrange(0, 3)}
+        for _ in range(rng.randrange(0, 40))
+    ]
+    damage = [
+        {"gt": rng.randrange(0, span + 400), "hp_diff_scaled": rng.choice((50, 100, 300, 900, rng.randrange(1, 4000)))}
+        for _ in range(rng.randrange(0, 60))
+    ]
+    explode.sort(key=lambda e: e["gt"])
+    damage.sort(key=lambda e: e["gt"])
+    return explode, damage
+
+
+@unittest.skipIf(pcs is None, "nbtlib not installed")
+class TestDamageAttribution(unittest.TestCase):
+    def test_indexed_matcher_matches_scan(self) -> None:
+        rng = random.Random(4321)
+        for _ in range(500):
+            explode, damage = _random_explosions(rng)
+            windows = rng.choice(({}, {"tight_bed_window_ticks": 0, "bed_window_ticks": 5, "anchor_window_ticks": 5}))
+            self.assertEqual(
+                pcs._attribute_damage_from_events(explode, damage, **windows),
+                pcs._attribute_damage_from_events_scan(explode, damage, **windows),
+            )
+
+
+@unittest.skipIf(pcs is None, "nbtlib not installed")
+class TestStorageExtraction(unittest.TestCase):
+    def _storage_root(self, samples: list[dict[str, int]], namespace: str = "contents"):
+        from nbtlib import Compound, File, Int, List, Long, String
+
+        tracker = Compound(
+            {
+                "meta": Compound({"version": String("1.4.0")}),
+                "run": Compound(
+                    {
+                        "start_gt": Long(samples[0]["gt"]),
+                        "damage_events": List[Compound]([Compound({"gt": Long(5), "hp_diff_scaled": Int(300)})]),
+                    }
+                ),
+                "samples": List[Compound](
+                    Compound({"x": Int(s["x"]), "y": Int(s["y"]), "z": Int(s["z"]), "gt": Long(s["gt"])})
+                    for s in samples
+                ),
+            }
+        )
+        return File({"data": Compound({namespace: Compound({"tracker": tracker})}), "DataVersion": Int(2230)})
+
+    def test_path_extraction_matches_generic_search(self) -> None:
+        root = self._storage_root(_random_samples(random.Random(7), 50))
+        snapshot = pcs.StorageSnapshot.from_nbt(Path("x.dat"), 0, 0, root)
+        plain = pcs._to_plain(root)
+        self.assertEqual((snapshot.samples, snapshot.samples_path), pcs._search_samples(plain))
+        self.assertEqual((snapshot.tracker, snapshot.tracker_path), pcs._search_tracker(plain))
+
+    def test_unknown_layout_falls_back_to_search(self) -> None:
+        root = self._storage_root(_random_samples(random.Random(8), 5), namespace="other")
+        snapshot = pcs.StorageSnapshot.from_nbt(Path("x.dat"), 0, 0, root)
+        self.assertEqual(snapshot.samples_path, "data.other.tracker.samples")
+        self.assertEqual(len(snapshot.samples or []), 5)
+
+    def test_run_finalized_handshake(self) -> None:
+        from nbtlib import Byte, Int
+
+        root = self._storage_root(_random_samples(random.Random(10), 5))
+        snapshot = pcs.StorageSnapshot.from_nbt(Path("x.dat"), 0, 0, root)
+        self.assertIsNone(snapshot.run_finalized())  # datapack without the handshake
+
+        tracker = root["data"]["contents"]["tracker"]
+        tracker["meta"]["run_seq"] = Int(2)
+        tracker["run"]["seq"] = Int(1)
+        tracker["run"]["finalized"] = Byte(1)
+        self.assertFalse(pcs.StorageSnapshot.from_nbt(Path("x.dat"), 0, 0, root).run_finalized())
+        tracker["run"]["seq"] = Int(2)
+        self.assertTrue(pcs.StorageSnapshot.from_nbt(Path("x.dat"), 0, 0, root).run_finalized())
+
+    def test_streaming_reader_matches_nbtlib(self) -> None:
+        import gzip
+        import tempfile
+
+        from nbtlib import Compound, Int, List, Long, String
+
+        root = self._storage_root(_random_samples(random.Random(9), 300))
+        run = root["data"]["contents"]["tracker"]["run"]
+        # Mixed layouts inside one list fall back to per-element decoding.
+        run["explode_events"] = List[Compound](
+            [
+                Compound({"gt": Long(3), "explode_beds": Int(1)}),
+                Compound({"gt": Long(4), "explode_beds": Int(1), "explode_anchors": Int(2)}),
+            ]
+        )
+        run["label"] = String("12")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "command_storage_zdash.dat"
+            with gzip.open(path, "wb") as f:
+                root.write(f)
+            snapshot = pcs.StorageSnapshot.from_file(path)
+        expected = pcs.StorageSnapshot.from_nbt(path, 0, 0, root)
+        self.assertIsInstance(snapshot.samples, pcs.CompoundColumns)
+        self.assertIsInstance(snapshot.tracker["run"]["damage_events"], pcs.CompoundColumns)
+        self.assertIsInstance(snapshot.tracker["run"]["explode_events"], list)
+        self.assertEqual(list(snapshot.samples), expected.samples)
+        self.assertEqual(snapshot.tracker, expected.tracker)
+        self.assertEqual(snapshot.run_metrics(), expected.run_metrics())
+        self.assertEqual(snapshot.dominant_node(), expected.dominant_node())
+
+
+
+@unittest.skipIf(pcs is None or pcs.anvil is None, "anvil-parser not installed")
+class TestEndTowerReader(unittest.TestCase):
+    def setUp(self) -> None:
+        import tempfile
+
+        self.tempdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    def _world(self, *, heightmaps: bool) -> tuple[Path, dict[str, int]]:
+        from scripts.bench import _write_synthetic_end_world
+
+        world_dir = Path(self.tempdir.name) / "world"
+        return world_dir, _write_synthetic_end_world(world_dir, heightmaps=heightmaps)
+
+    def _probe_count(self, reader: "pcs.EndTowerReader", x: int, z: int) -> tuple[int | None, int]:
+        from unittest import mock
+
+        with mock.patch.object(pcs.EndTowerReader, "_is_bedrock", side_effect=pcs.EndTowerReader._is_bedrock) as probe:
+            y = reader.bedrock_y_at(x, z)
+        return y, probe.call_count
+
+    def test_palette_path_scans_only_bedrock_sections(self) -> None:
+        world_dir, caps = self._world(heightmaps=False)
+        x, z = pcs.TOWER_NODE_COLUMNS["front_diag"]
+        reader = pcs.EndTowerReader(world_dir)
+        key = (x // 16, z // 16)
+        self.assertIsNone(reader._chunk_surface(key, reader._chunk(*key)))
+        self.assertEqual(reader._chunk_bedrock_sections(key, reader._chunk(*key)), [caps["front_diag"] // 16])
+        y, probes = self._probe_count(reader, x, z)
+        self.assertEqual(y, caps["front_diag"])
+        # Top of the bedrock section down to the cap, not y=255 down.
+        self.assertEqual(probes, 16 - caps["front_diag"] % 16)
+
+    def test_heightmap_path_starts_at_the_surface(self) -> None:
+        world_dir, caps = self._world(heightmaps=True)
+        x, z = pcs.TOWER_NODE_COLUMNS["back_diag"]
+        y, probes = self._probe_count(pcs.EndTowerReader(world_dir), x, z)
+        self.assertEqual(y, caps["back_diag"])
+        self.assertEqual(probes, 1)
+        self.assertEqual(pcs.bedrock_by_node(world_dir, radius=2), caps)
+
+
+if __name__ == "__main__":
+    unittest.main()
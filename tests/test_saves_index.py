@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+import tempfile
+import unittest
+
+from app.saves_index import SavesIndex
+
+
+class TestSavesIndex(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.saves = Path(self._tmp.name) / "saves"
+        self.saves.mkdir()
+        for i, name in enumerate(("Random Speedrun #1", "Random Speedrun #2", "Random Speedrun #3")):
+            (self.saves / name).mkdir()
+            os.utime(self.saves / name, (1_000_000 + i, 1_000_000 + i))
+        os.utime(self.saves, (1_000_000, 1_000_000))
+        self.index = SavesIndex(self.saves)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _touch_saves_dir(self, seconds: int) -> None:
+        os.utime(self.saves, (1_000_000 + seconds, 1_000_000 + seconds))
+
+    def test_latest_follows_log_and_only_rescans_on_dir_change(self) -> None:
+        self.assertEqual(self.index.latest().name, "Random Speedrun #3")
+        self.index.note_world("Random Speedrun #1")
+        self.assertEqual(self.index.latest().name, "Random Speedrun #1")
+        self.assertEqual(self.index.scans, 1)
+
+        (self.saves / "Random Speedrun #4").mkdir()
+        self._touch_saves_dir(10)
+        self.assertEqual(self.index.latest().name, "Random Speedrun #4")
+        self.assertEqual(self.index.scans, 2)
+        self.index.latest()
+        self.assertEqual(self.index.scans, 2)
+
+    def test_prune_moves_only_old_prunable_worlds(self) -> None:
+        archive = Path(self._tmp.name) / "archive"
+        report = self.index.prune(
+            keep=1,
+            archive_dir=archive,
+            is_prunable={"Random Speedrun #1", "Random Speedrun #3"}.__contains__,
+        )
+        self.assertEqual(report["archived"], 1)
+        self.assertEqual(report["kept_not_prunable"], 1)
+        self.assertTrue((archive / "Random Speedrun #1").is_dir())
+        self.assertTrue((self.saves / "Random Speedrun #3").is_dir())
+        self.assertEqual(sorted(p.name for p in self.saves.iterdir()), ["Random Speedrun #2", "Random Speedrun #3"])
+
+
+if __name__ == "__main__":
+    unittest.main()